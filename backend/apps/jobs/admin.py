@@ -0,0 +1,67 @@
+"""
+Административный интерфейс для приложения jobs.
+
+Позволяет просматривать состояние фоновых задач и перезапускать проваленные.
+"""
+
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    """
+    Административный интерфейс для модели Job.
+
+    Задачи доступны только для просмотра; проваленные задачи можно
+    вернуть в очередь действием «Перезапустить».
+    """
+
+    list_display = (
+        "id",
+        "name",
+        "queue",
+        "status",
+        "priority",
+        "attempts",
+        "max_attempts",
+        "run_at",
+        "finished_at",
+    )
+    list_filter = ("status", "queue")
+    search_fields = ("name",)
+    ordering = ("-id",)
+    actions = ("retry_jobs",)
+    readonly_fields = (
+        "name",
+        "queue",
+        "args",
+        "kwargs",
+        "priority",
+        "status",
+        "attempts",
+        "max_attempts",
+        "run_at",
+        "locked_by",
+        "locked_at",
+        "last_error",
+        "result",
+        "created_at",
+        "finished_at",
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description="Перезапустить выбранные задачи")
+    def retry_jobs(self, request, queryset):
+        count = queryset.exclude(status=Job.Status.RUNNING).update(
+            status=Job.Status.QUEUED,
+            attempts=0,
+            run_at=timezone.now(),
+            finished_at=None,
+            locked_by="",
+        )
+        self.message_user(request, f"Возвращено в очередь задач: {count}")
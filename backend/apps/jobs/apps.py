@@ -0,0 +1,17 @@
+"""
+Конфигурация приложения jobs.
+
+Приложение реализует очередь фоновых задач в Postgres. Функции задач
+объявляются в модулях jobs.py приложений и регистрируются при запуске.
+"""
+
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class JobsConfig(AppConfig):
+    name = "apps.jobs"
+    verbose_name = "Фоновые задачи"
+
+    def ready(self):
+        autodiscover_modules("jobs")
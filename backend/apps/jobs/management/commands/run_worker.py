@@ -0,0 +1,65 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from ...worker import Worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Запускает воркер очереди фоновых задач.\n\n"
+        "Запуск:\n  python manage.py run_worker --queue default --concurrency 8\n"
+        "В Docker:\n  docker-compose up worker"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--queue",
+            action="append",
+            dest="queues",
+            help="Очередь для обработки (можно указать несколько раз)",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=None,
+            help="Количество потоков или процессов",
+        )
+        parser.add_argument(
+            "--pool",
+            choices=["thread", "process"],
+            default=None,
+            help="Тип пула исполнителей",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Максимальное количество задач за одну выборку",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Завершиться, когда очередь опустеет",
+        )
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            queues=options["queues"],
+            concurrency=options["concurrency"],
+            pool=options["pool"],
+            batch_size=options["batch_size"],
+            burst=options["burst"],
+        )
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: worker.stop())
+        self.stdout.write(
+            f"Воркер {worker.worker_id}: очереди {', '.join(worker.queues)}, "
+            f"{worker.concurrency} × {worker.pool}"
+        )
+        stats = worker.run()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Выполнено задач: {stats['processed']}, ошибок: {stats['failed']}"
+            )
+        )
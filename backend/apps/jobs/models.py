@@ -0,0 +1,86 @@
+from django.db import models
+
+
+class Job(models.Model):
+    """
+    Модель фоновой задачи в очереди.
+
+    Воркер выбирает готовые к запуску задачи через SELECT ... FOR UPDATE
+    SKIP LOCKED в порядке приоритета и времени запуска. После ошибки задача
+    возвращается в очередь с отложенным run_at, пока не исчерпаны попытки.
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", "В очереди"
+        RUNNING = "running", "Выполняется"
+        SUCCEEDED = "succeeded", "Выполнена"
+        FAILED = "failed", "Ошибка"
+
+    name = models.CharField(
+        max_length=200, db_index=True, help_text="Имя зарегистрированной функции"
+    )
+    queue = models.CharField(max_length=50, default="default", help_text="Имя очереди")
+    args = models.JSONField(default=list, blank=True, help_text="Позиционные аргументы")
+    kwargs = models.JSONField(
+        default=dict, blank=True, help_text="Именованные аргументы"
+    )
+    priority = models.SmallIntegerField(
+        default=0, help_text="Приоритет (задачи с большим значением выполняются раньше)"
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.QUEUED,
+        help_text="Состояние задачи",
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0, help_text="Количество выполненных попыток"
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        default=5, help_text="Максимальное количество попыток"
+    )
+    run_at = models.DateTimeField(
+        help_text="Время, не раньше которого задача запускается"
+    )
+    locked_by = models.CharField(
+        max_length=100, blank=True, help_text="Идентификатор воркера"
+    )
+    locked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Время взятия задачи или последней отметки воркера",
+    )
+    last_error = models.TextField(blank=True, help_text="Трассировка последней ошибки")
+    result = models.JSONField(null=True, blank=True, help_text="Результат выполнения")
+    created_at = models.DateTimeField(
+        auto_now_add=True, help_text="Дата и время постановки в очередь"
+    )
+    finished_at = models.DateTimeField(
+        null=True, blank=True, help_text="Дата и время завершения"
+    )
+
+    class Meta:
+        verbose_name = "Фоновая задача"
+        verbose_name_plural = "Фоновые задачи"
+        indexes = [
+            models.Index(
+                "queue",
+                models.F("priority").desc(),
+                "run_at",
+                condition=models.Q(status="queued"),
+                name="jobs_job_ready_idx",
+            ),
+            models.Index(
+                fields=["locked_at"],
+                condition=models.Q(status="running"),
+                name="jobs_job_running_idx",
+            ),
+            models.Index(
+                fields=["finished_at"],
+                condition=models.Q(status__in=["succeeded", "failed"]),
+                name="jobs_job_finished_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
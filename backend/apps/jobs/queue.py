@@ -0,0 +1,438 @@
+"""
+Очередь фоновых задач в Postgres.
+
+Задачи объявляются декоратором @job в модулях jobs.py приложений
+и ставятся в очередь вызовом .delay() — в той же транзакции, что и данные,
+поэтому воркер увидит задачу только после фиксации. Воркер
+(python manage.py run_worker) забирает задачи пакетами через
+SELECT ... FOR UPDATE SKIP LOCKED, так что несколько воркеров
+не блокируют друг друга и не получают одну задачу дважды.
+
+Пока задача выполняется, воркер раз в HEARTBEAT_SECONDS обновляет её
+locked_at (heartbeat_jobs). Задача считается зависшей и возвращается
+в очередь, только если отметки не было дольше LOCK_TIMEOUT_SECONDS,
+то есть воркер умер, а не просто выполняет долгую задачу.
+"""
+
+import json
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+# Ключ advisory-блокировки Postgres для планирования периодических задач
+PERIODIC_LOCK_KEY = 0x4A4F4250
+
+_registry = {}
+
+
+def get_queue_settings():
+    """
+    Возвращает настройки очереди с подставленными значениями по умолчанию.
+
+    Returns:
+        dict: Настройки из JOB_QUEUE
+    """
+    options = {
+        "CONCURRENCY": 4,
+        "POOL": "thread",
+        "BATCH_SIZE": 100,
+        "POLL_INTERVAL_SECONDS": 1.0,
+        "MAX_ATTEMPTS": 5,
+        "RETRY_BACKOFF_SECONDS": 10,
+        "RETRY_BACKOFF_MAX_SECONDS": 3600,
+        "LOCK_TIMEOUT_SECONDS": 600,
+        "HEARTBEAT_SECONDS": 30,
+        "KEEP_FINISHED_HOURS": 168,
+    }
+    options.update(getattr(settings, "JOB_QUEUE", {}))
+    return options
+
+
+class JobFunction:
+    """
+    Зарегистрированная функция фоновой задачи.
+
+    Прямой вызов выполняет функцию синхронно, delay() ставит её в очередь.
+    """
+
+    def __init__(self, func, name, queue, priority, max_attempts, every=None):
+        self.func = func
+        self.name = name
+        self.queue = queue
+        self.priority = priority
+        self.max_attempts = max_attempts
+        self.every = every
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        """
+        Ставит задачу в очередь с параметрами по умолчанию.
+
+        Returns:
+            Job: Созданная задача
+        """
+        return self.enqueue(args, kwargs)
+
+    def enqueue(self, args=(), kwargs=None, **options):
+        """
+        Ставит задачу в очередь с переопределёнными параметрами.
+
+        Args:
+            args (tuple): Позиционные аргументы (должны сериализоваться в JSON)
+            kwargs (dict): Именованные аргументы
+            **options: queue, priority, run_at, delay, max_attempts
+
+        Returns:
+            Job: Созданная задача
+        """
+        options.setdefault("queue", self.queue)
+        options.setdefault("priority", self.priority)
+        options.setdefault("max_attempts", self.max_attempts)
+        return enqueue(self.name, args, kwargs, **options)
+
+
+def job(
+    func=None,
+    *,
+    name=None,
+    queue="default",
+    priority=0,
+    max_attempts=None,
+    every=None,
+):
+    """
+    Регистрирует функцию как фоновую задачу.
+
+    Пример:
+        @job(queue="media", priority=5)
+        def render_preview(comment_id):
+            ...
+
+        render_preview.delay(comment.pk)
+
+    Args:
+        func: Функция задачи
+        name (str): Имя задачи (по умолчанию модуль и имя функции)
+        queue (str): Очередь по умолчанию
+        priority (int): Приоритет по умолчанию
+        max_attempts (int): Количество попыток (по умолчанию из JOB_QUEUE)
+        every (int): Период в секундах для задач без аргументов, которые
+            воркер ставит в очередь сам (см. schedule_periodic_jobs)
+
+    Returns:
+        JobFunction: Зарегистрированная функция
+    """
+
+    def register(func):
+        job_name = name or f"{func.__module__}.{func.__qualname__}"
+        wrapper = JobFunction(func, job_name, queue, priority, max_attempts, every)
+        _registry[job_name] = wrapper
+        return wrapper
+
+    return register(func) if func is not None else register
+
+
+def get_job_function(name):
+    """
+    Возвращает зарегистрированную функцию задачи по имени.
+
+    Raises:
+        LookupError: Если задача с таким именем не зарегистрирована
+    """
+    try:
+        return _registry[name]
+    except KeyError:
+        raise LookupError(f"Фоновая задача {name} не зарегистрирована")
+
+
+def _build_job(
+    name,
+    args=(),
+    kwargs=None,
+    queue="default",
+    priority=0,
+    run_at=None,
+    delay=None,
+    max_attempts=None,
+):
+    get_job_function(name)
+    run_at = run_at or timezone.now()
+    if delay:
+        run_at += timedelta(seconds=delay)
+    return Job(
+        name=name,
+        queue=queue,
+        args=list(args),
+        kwargs=kwargs or {},
+        priority=priority,
+        run_at=run_at,
+        max_attempts=max_attempts or get_queue_settings()["MAX_ATTEMPTS"],
+    )
+
+
+def enqueue(name, args=(), kwargs=None, **options):
+    """
+    Ставит задачу в очередь.
+
+    Args:
+        name (str): Имя зарегистрированной задачи
+        args (tuple): Позиционные аргументы
+        kwargs (dict): Именованные аргументы
+        **options: queue, priority, run_at, delay (секунды), max_attempts
+
+    Returns:
+        Job: Созданная задача
+    """
+    new_job = _build_job(name, args, kwargs, **options)
+    new_job.save()
+    return new_job
+
+
+def bulk_enqueue(name, calls, batch_size=1000, **options):
+    """
+    Ставит в очередь много задач одной функции пакетными INSERT.
+
+    Args:
+        name (str): Имя зарегистрированной задачи
+        calls (iterable): Пары (args, kwargs)
+        batch_size (int): Количество строк в одном INSERT
+        **options: Общие параметры задач
+
+    Returns:
+        int: Количество созданных задач
+    """
+    jobs = [_build_job(name, args, kwargs, **options) for args, kwargs in calls]
+    Job.objects.bulk_create(jobs, batch_size=batch_size)
+    return len(jobs)
+
+
+def schedule_periodic_jobs():
+    """
+    Ставит в очередь периодические задачи, у которых наступил срок.
+
+    Следующий запуск планируется через период после предыдущего, если
+    в очереди нет невыполненного экземпляра задачи. Воркеры вызывают
+    функцию при обслуживании очереди, а advisory-блокировка транзакции
+    не даёт нескольким воркерам поставить одну задачу дважды.
+
+    Returns:
+        int: Количество поставленных задач
+    """
+    periodic = [func for func in _registry.values() if func.every]
+    if not periodic:
+        return 0
+    now = timezone.now()
+    scheduled = 0
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [PERIODIC_LOCK_KEY])
+        for func in periodic:
+            jobs = Job.objects.filter(name=func.name)
+            pending = [Job.Status.QUEUED, Job.Status.RUNNING]
+            if jobs.filter(status__in=pending).exists():
+                continue
+            last_run = jobs.order_by("-run_at").values_list("run_at", flat=True)
+            last_run = last_run.first()
+            run_at = now
+            if last_run is not None:
+                run_at = max(now, last_run + timedelta(seconds=func.every))
+            func.enqueue(run_at=run_at)
+            scheduled += 1
+    return scheduled
+
+
+def fetch_jobs(worker_id, queues, limit):
+    """
+    Забирает готовые задачи и помечает их выполняемыми.
+
+    Строки блокируются через FOR UPDATE SKIP LOCKED, поэтому параллельные
+    воркеры получают разные задачи, не дожидаясь друг друга.
+
+    Args:
+        worker_id (str): Идентификатор воркера
+        queues (list): Очереди, из которых выбираются задачи
+        limit (int): Максимальное количество задач
+
+    Returns:
+        list: Задачи Job со статусом running
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.Status.QUEUED, queue__in=queues, run_at__lte=now)
+            .order_by("-priority", "run_at")
+            .only("id", "name", "args", "kwargs", "attempts", "max_attempts")[:limit]
+        )
+        if jobs:
+            Job.objects.filter(pk__in=[j.pk for j in jobs]).update(
+                status=Job.Status.RUNNING,
+                locked_by=worker_id,
+                locked_at=now,
+                attempts=F("attempts") + 1,
+            )
+    for fetched in jobs:
+        fetched.attempts += 1
+    return jobs
+
+
+def heartbeat_jobs(worker_id, job_ids):
+    """
+    Продлевает блокировку выполняемых воркером задач.
+
+    Args:
+        worker_id (str): Идентификатор воркера
+        job_ids (list): Идентификаторы выполняемых задач
+
+    Returns:
+        int: Количество обновлённых задач
+    """
+    if not job_ids:
+        return 0
+    return Job.objects.filter(
+        pk__in=job_ids, status=Job.Status.RUNNING, locked_by=worker_id
+    ).update(locked_at=timezone.now())
+
+
+def _json_result(value):
+    try:
+        json.dumps(value)
+    except (TypeError, ValueError):
+        return repr(value)
+    return value
+
+
+def complete_jobs(worker_id, results):
+    """
+    Помечает задачи выполненными.
+
+    Задачи без результата обновляются одним запросом. Обновляются только
+    задачи, заблокированные этим воркером: если задачу вернули в очередь
+    как зависшую и её взял другой воркер, поздний результат отбрасывается.
+
+    Args:
+        worker_id (str): Идентификатор воркера
+        results (dict): Идентификатор задачи -> результат
+    """
+    now = timezone.now()
+    done = Job.objects.filter(status=Job.Status.RUNNING, locked_by=worker_id)
+    empty = [pk for pk, value in results.items() if value is None]
+    if empty:
+        done.filter(pk__in=empty).update(
+            status=Job.Status.SUCCEEDED, finished_at=now, locked_by=""
+        )
+    for pk, value in results.items():
+        if value is not None:
+            done.filter(pk=pk).update(
+                status=Job.Status.SUCCEEDED,
+                finished_at=now,
+                locked_by="",
+                result=_json_result(value),
+            )
+
+
+def retry_delay(attempts):
+    """
+    Возвращает задержку перед повторной попыткой (экспоненциально со случайной добавкой).
+
+    Args:
+        attempts (int): Количество выполненных попыток
+
+    Returns:
+        float: Задержка в секундах
+    """
+    options = get_queue_settings()
+    base = options["RETRY_BACKOFF_SECONDS"] * 2 ** max(attempts - 1, 0)
+    base = min(base, options["RETRY_BACKOFF_MAX_SECONDS"])
+    return base + random.uniform(0, base / 10)
+
+
+def fail_job(worker_id, failed, error):
+    """
+    Обрабатывает ошибку задачи: планирует повтор или помечает её проваленной.
+
+    Как и complete_jobs, не трогает задачу, заблокированную другим воркером.
+
+    Args:
+        worker_id (str): Идентификатор воркера
+        failed (Job): Задача, полученная из fetch_jobs
+        error (str): Текст ошибки
+    """
+    now = timezone.now()
+    jobs = Job.objects.filter(
+        pk=failed.pk, status=Job.Status.RUNNING, locked_by=worker_id
+    )
+    if failed.attempts < failed.max_attempts:
+        jobs.update(
+            status=Job.Status.QUEUED,
+            run_at=now + timedelta(seconds=retry_delay(failed.attempts)),
+            locked_by="",
+            last_error=error,
+        )
+    else:
+        jobs.update(
+            status=Job.Status.FAILED, finished_at=now, locked_by="", last_error=error
+        )
+
+
+def requeue_stale_jobs(timeout=None):
+    """
+    Возвращает в очередь задачи, зависшие в статусе running.
+
+    Такое случается, если воркер был убит во время выполнения: живой воркер
+    обновляет locked_at своих задач (heartbeat_jobs), поэтому долгие задачи
+    не возвращаются. Задачи с исчерпанными попытками помечаются проваленными.
+
+    Args:
+        timeout (timedelta): Время без отметки воркера, после которого
+            задача считается зависшей
+
+    Returns:
+        int: Количество обработанных задач
+    """
+    if timeout is None:
+        timeout = timedelta(seconds=get_queue_settings()["LOCK_TIMEOUT_SECONDS"])
+    now = timezone.now()
+    stale = Job.objects.filter(status=Job.Status.RUNNING, locked_at__lt=now - timeout)
+    error = "Воркер не завершил задачу за отведённое время"
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.Status.FAILED, finished_at=now, locked_by="", last_error=error
+    )
+    requeued = stale.update(
+        status=Job.Status.QUEUED, run_at=now, locked_by="", last_error=error
+    )
+    return failed + requeued
+
+
+def purge_finished_jobs(max_age=None, batch_size=5000):
+    """
+    Удаляет завершённые задачи старше срока хранения.
+
+    Args:
+        max_age (timedelta): Срок хранения завершённых задач
+        batch_size (int): Количество строк в одном DELETE
+
+    Returns:
+        int: Количество удалённых задач
+    """
+    if max_age is None:
+        max_age = timedelta(hours=get_queue_settings()["KEEP_FINISHED_HOURS"])
+    finished = Job.objects.filter(
+        status__in=[Job.Status.SUCCEEDED, Job.Status.FAILED],
+        finished_at__lt=timezone.now() - max_age,
+    )
+    total = 0
+    while True:
+        ids = list(finished.values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return total
+        total += Job.objects.filter(pk__in=ids).delete()[0]
@@ -0,0 +1,169 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from apps.jobs.models import Job
+from apps.jobs.queue import (
+    bulk_enqueue,
+    complete_jobs,
+    fail_job,
+    fetch_jobs,
+    heartbeat_jobs,
+    job,
+    purge_finished_jobs,
+    requeue_stale_jobs,
+    schedule_periodic_jobs,
+)
+from apps.jobs.worker import Worker
+
+calls = []
+
+
+@job(name="tests.record", queue="tests")
+def record(value):
+    calls.append(value)
+    return value * 2
+
+
+@job(name="tests.explode", queue="tests", max_attempts=2)
+def explode():
+    raise RuntimeError("boom")
+
+
+@pytest.mark.django_db
+def test_fetch_jobs_by_priority_without_duplicates():
+    low = record.enqueue([1], priority=0)
+    high = record.enqueue([2], priority=10)
+    record.enqueue([3], delay=3600)
+
+    first = fetch_jobs("w1", ["tests"], 1)
+    second = fetch_jobs("w2", ["tests"], 10)
+
+    assert [j.pk for j in first] == [high.pk]
+    assert [j.pk for j in second] == [low.pk]
+    assert fetch_jobs("w3", ["tests"], 10) == []
+    high.refresh_from_db()
+    assert high.status == Job.Status.RUNNING
+    assert high.attempts == 1
+    assert high.locked_by == "w1"
+
+
+@pytest.mark.django_db
+def test_enqueue_unknown_job():
+    from apps.jobs.queue import enqueue
+
+    with pytest.raises(LookupError):
+        enqueue("tests.missing")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_worker_runs_jobs_and_retries_failures(settings):
+    settings.JOB_QUEUE = {"RETRY_BACKOFF_SECONDS": 0, "RETRY_BACKOFF_MAX_SECONDS": 0}
+    calls.clear()
+    bulk_enqueue("tests.record", [((i,), {}) for i in range(50)], queue="tests")
+    failing = explode.delay()
+
+    stats = Worker(
+        queues=["tests"], concurrency=4, batch_size=16, poll_interval=0, burst=True
+    ).run()
+
+    assert sorted(calls) == list(range(50))
+    assert stats == {"processed": 50, "failed": 2}
+    assert Job.objects.filter(status=Job.Status.SUCCEEDED).count() == 50
+    assert Job.objects.get(name="tests.record", args=[7]).result == 14
+    failing.refresh_from_db()
+    assert failing.status == Job.Status.FAILED
+    assert failing.attempts == 2
+    assert "RuntimeError: boom" in failing.last_error
+
+
+@job(name="tests.periodic", queue="tests-periodic", every=3600)
+def periodic():
+    return None
+
+
+@pytest.mark.django_db
+def test_schedule_periodic_jobs_once_per_period():
+    schedule_periodic_jobs()
+    assert schedule_periodic_jobs() == 0
+    first = Job.objects.get(name="tests.periodic")
+    Job.objects.filter(pk=first.pk).update(
+        status=Job.Status.SUCCEEDED, finished_at=timezone.now()
+    )
+
+    schedule_periodic_jobs()
+    following = Job.objects.filter(name="tests.periodic").latest("run_at")
+    assert following.status == Job.Status.QUEUED
+    assert following.run_at == first.run_at + timedelta(hours=1)
+
+
+@pytest.mark.django_db
+def test_requeue_stale_and_purge_finished():
+    stale = record.delay(1)
+    fetch_jobs("dead", ["tests"], 1)
+    Job.objects.filter(pk=stale.pk).update(
+        locked_at=timezone.now() - timedelta(hours=1)
+    )
+    old = record.delay(2)
+    Job.objects.filter(pk=old.pk).update(
+        status=Job.Status.SUCCEEDED,
+        finished_at=timezone.now() - timedelta(days=30),
+    )
+
+    assert requeue_stale_jobs(timedelta(minutes=10)) == 1
+    stale.refresh_from_db()
+    assert stale.status == Job.Status.QUEUED
+    assert purge_finished_jobs(timedelta(days=7)) == 1
+    assert not Job.objects.filter(pk=old.pk).exists()
+
+
+@pytest.mark.django_db
+def test_late_completion_after_requeue_is_ignored():
+    late = record.delay(1)
+    [first_run] = fetch_jobs("stalled", ["tests"], 1)
+    Job.objects.filter(pk=late.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+    assert requeue_stale_jobs(timedelta(minutes=10)) == 1
+    Job.objects.filter(pk=late.pk).update(run_at=timezone.now())
+    assert [item.pk for item in fetch_jobs("fresh", ["tests"], 1)] == [late.pk]
+
+    # Зависший воркер завершает свою попытку после повторной выдачи задачи
+    complete_jobs("stalled", {late.pk: "stale"})
+    fail_job("stalled", first_run, "late error")
+    late.refresh_from_db()
+    assert late.status == Job.Status.RUNNING
+    assert late.locked_by == "fresh"
+    assert late.result is None
+    assert late.last_error != "late error"
+
+    complete_jobs("fresh", {late.pk: 2})
+    late.refresh_from_db()
+    assert late.status == Job.Status.SUCCEEDED
+    assert late.result == 2
+
+
+@job(name="tests.slow", queue="tests-slow")
+def slow():
+    import time
+
+    time.sleep(0.3)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_heartbeat_keeps_long_running_jobs_locked(settings):
+    settings.JOB_QUEUE = {"HEARTBEAT_SECONDS": 0}
+    long_running = slow.delay()
+    started = timezone.now()
+    Worker(queues=["tests-slow"], poll_interval=0.05, burst=True).run()
+    long_running.refresh_from_db()
+    assert long_running.status == Job.Status.SUCCEEDED
+    assert long_running.locked_at - started >= timedelta(seconds=0.2)
+
+    running = record.delay(1)
+    fetch_jobs("alive", ["tests"], 1)
+    Job.objects.filter(pk=running.pk).update(
+        locked_at=timezone.now() - timedelta(hours=1)
+    )
+    assert heartbeat_jobs("other", [running.pk]) == 0
+    assert heartbeat_jobs("alive", [running.pk]) == 1
+    assert requeue_stale_jobs(timedelta(minutes=10)) == 0
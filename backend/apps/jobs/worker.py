@@ -0,0 +1,212 @@
+"""
+Воркер очереди фоновых задач.
+
+Основной поток забирает задачи пакетами и передаёт их в пул потоков
+или процессов, а по завершении отмечает результаты пакетными UPDATE.
+Пул потоков подходит для задач, ждущих ввода-вывода, пул процессов —
+для задач, нагружающих процессор. Пока задачи выполняются, основной поток
+раз в HEARTBEAT_SECONDS продлевает их блокировку.
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+
+from django.db import close_old_connections
+
+from .queue import (
+    complete_jobs,
+    fail_job,
+    fetch_jobs,
+    get_job_function,
+    get_queue_settings,
+    heartbeat_jobs,
+    purge_finished_jobs,
+    requeue_stale_jobs,
+    schedule_periodic_jobs,
+)
+
+logger = logging.getLogger(__name__)
+
+MAINTENANCE_INTERVAL_SECONDS = 60
+
+
+class JobExecutionError(Exception):
+    """
+    Ошибка выполнения задачи с трассировкой, сформированной в исполнителе.
+
+    Трассировка передаётся строкой, чтобы её можно было вернуть из дочернего процесса.
+    """
+
+
+def execute_job(name, args, kwargs):
+    """
+    Выполняет зарегистрированную функцию задачи.
+
+    Функция выполняется в потоке или дочернем процессе пула.
+
+    Returns:
+        Результат функции
+
+    Raises:
+        JobExecutionError: Если функция завершилась исключением
+    """
+    close_old_connections()
+    try:
+        return get_job_function(name).func(*args, **kwargs)
+    except Exception:
+        raise JobExecutionError(traceback.format_exc())
+    finally:
+        close_old_connections()
+
+
+def _init_process():
+    import django
+
+    django.setup()
+
+
+class Worker:
+    """
+    Воркер, выполняющий задачи из указанных очередей.
+
+    Args:
+        queues (list): Очереди (по умолчанию ["default"])
+        concurrency (int): Количество потоков или процессов
+        pool (str): "thread" или "process"
+        batch_size (int): Максимальное количество задач за одну выборку
+        poll_interval (float): Пауза между выборками при пустой очереди
+        burst (bool): Завершиться, когда очередь опустеет
+    """
+
+    def __init__(
+        self,
+        queues=None,
+        concurrency=None,
+        pool=None,
+        batch_size=None,
+        poll_interval=None,
+        burst=False,
+    ):
+        options = get_queue_settings()
+        self.queues = list(queues or ["default"])
+        self.concurrency = concurrency or options["CONCURRENCY"]
+        self.pool = pool or options["POOL"]
+        self.batch_size = batch_size or options["BATCH_SIZE"]
+        self.poll_interval = (
+            options["POLL_INTERVAL_SECONDS"] if poll_interval is None else poll_interval
+        )
+        self.heartbeat_interval = options["HEARTBEAT_SECONDS"]
+        self.burst = burst
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.stopped = threading.Event()
+        self.processed = 0
+        self.failed = 0
+
+    def stop(self):
+        """
+        Прекращает выборку новых задач; уже взятые задачи будут завершены.
+        """
+        self.stopped.set()
+
+    def _make_executor(self):
+        if self.pool == "process":
+            import multiprocessing
+
+            return ProcessPoolExecutor(
+                max_workers=self.concurrency,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_process,
+            )
+        return ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="job"
+        )
+
+    def _maintenance(self):
+        try:
+            requeued = requeue_stale_jobs()
+            purged = purge_finished_jobs()
+            schedule_periodic_jobs()
+            if requeued or purged:
+                logger.info(
+                    "Возвращено зависших задач: %s, удалено завершённых: %s",
+                    requeued,
+                    purged,
+                )
+        except Exception:
+            logger.exception("Ошибка обслуживания очереди задач")
+
+    def _heartbeat(self, running):
+        try:
+            heartbeat_jobs(self.worker_id, [item.pk for item in running.values()])
+        except Exception:
+            logger.exception("Не удалось продлить блокировку задач")
+
+    def _collect(self, done, running):
+        results = {}
+        for future in done:
+            finished = running.pop(future)
+            try:
+                results[finished.pk] = future.result()
+            except Exception as exc:
+                error = str(exc) if isinstance(exc, JobExecutionError) else repr(exc)
+                logger.warning("Задача %s #%s: %s", finished.name, finished.pk, error)
+                fail_job(self.worker_id, finished, error)
+                self.failed += 1
+        if results:
+            complete_jobs(self.worker_id, results)
+            self.processed += len(results)
+
+    def run(self):
+        """
+        Запускает цикл выборки и выполнения задач до вызова stop().
+
+        Returns:
+            dict: Количество выполненных и проваленных попыток
+        """
+        # Одновременно берётся не больше задач, чем исполнители успеют начать
+        capacity = self.concurrency + self.batch_size
+        running = {}
+        last_maintenance = 0.0
+        last_heartbeat = time.monotonic()
+        with self._make_executor() as executor:
+            while True:
+                if time.monotonic() - last_maintenance > MAINTENANCE_INTERVAL_SECONDS:
+                    self._maintenance()
+                    last_maintenance = time.monotonic()
+                if (
+                    running
+                    and time.monotonic() - last_heartbeat > self.heartbeat_interval
+                ):
+                    self._heartbeat(running)
+                    last_heartbeat = time.monotonic()
+
+                fetched = []
+                limit = min(self.batch_size, capacity - len(running))
+                if not self.stopped.is_set() and limit > 0:
+                    fetched = fetch_jobs(self.worker_id, self.queues, limit)
+                    for item in fetched:
+                        future = executor.submit(
+                            execute_job, item.name, item.args, item.kwargs
+                        )
+                        running[future] = item
+
+                if not running:
+                    if self.stopped.is_set() or (self.burst and not fetched):
+                        break
+                    self.stopped.wait(self.poll_interval)
+                    continue
+
+                timeout = 0 if fetched and len(fetched) == limit else self.poll_interval
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                self._collect(done, running)
+        return {"processed": self.processed, "failed": self.failed}
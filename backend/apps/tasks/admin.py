@@ -6,26 +6,89 @@
 
 from django.contrib import admin
 
-from .models import Status, Priority, Task, Project, Comment
+from config.deletion import DeferredDeleteAdminMixin
+
+from .models import (
+    Status,
+    Priority,
+    Task,
+    Project,
+    Comment,
+    AttachmentUpload,
+    AttachmentBlob,
+    Tombstone,
+    ProjectTaskSummary,
+    ArchivedTask,
+    PendingDeletion,
+)
+from .archive import restore_task
+from .changelist import LargeTableAdminMixin, SearchListFilter
+
+
+class ProjectFilter(SearchListFilter):
+    title = "проект"
+    parameter_name = "project"
+    field = "project"
+    search_lookups = ("code__iexact",)
+    placeholder = "ID или код"
+
+
+class UserFilter(SearchListFilter):
+    search_lookups = ("email__iexact", "username__iexact")
+    placeholder = "ID, email или логин"
+
+
+class CreatorFilter(UserFilter):
+    title = "создатель"
+    parameter_name = "creator"
+    field = "creator"
+
+
+class AssigneeFilter(UserFilter):
+    title = "исполнитель"
+    parameter_name = "assignee"
+    field = "assignee"
+
+
+class AuthorFilter(UserFilter):
+    title = "автор"
+    parameter_name = "author"
+    field = "author"
+
+
+class CommentTaskFilter(SearchListFilter):
+    title = "задача"
+    parameter_name = "task"
+    field = "task"
+    search_lookups = ("issue_id",)
+    placeholder = "ID или номер задачи"
+
+    def matches(self, value):
+        # Номера задач хранятся в верхнем регистре: точное сравнение по индексу
+        return super().matches(value.upper())
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     """
     Административный интерфейс для модели Comment.
 
     Настройки отображения и управления комментариями в админ-панели.
+    Фильтры по задаче и автору принимают строку поиска, список
+    сортируется по первичному ключу.
     """
 
     list_display = ("id", "task", "author", "created_at", "updated_at")
-    list_filter = ("task", "author", "created_at", "updated_at")
-    search_fields = ("text", "author__username")
+    list_filter = (CommentTaskFilter, AuthorFilter, "created_at")
+    list_select_related = ("task__status", "author")
+    search_fields = ("text", "=author__email")
+    ordering = ("-id",)
     readonly_fields = ("created_at", "updated_at")
     raw_id_fields = ("task", "author")
 
 
 @admin.register(Project)
-class ProjectAdmin(admin.ModelAdmin):
+class ProjectAdmin(DeferredDeleteAdminMixin, admin.ModelAdmin):
     """
     Административный интерфейс для модели Project.
 
@@ -65,11 +128,12 @@ class PriorityAdmin(admin.ModelAdmin):
 
 
 @admin.register(Task)
-class TaskAdmin(admin.ModelAdmin):
+class TaskAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     """
     Административный интерфейс для модели Task.
 
     Настройки отображения и управления задачами в админ-панели.
+    Фильтры по проекту и пользователям принимают строку поиска.
     """
 
     list_display = (
@@ -84,9 +148,130 @@ class TaskAdmin(admin.ModelAdmin):
         "updated_at",
         "due_date",
     )
-    list_filter = ("project", "status", "priority", "creator", "assignee")
+    list_filter = (ProjectFilter, "status", "priority", CreatorFilter, AssigneeFilter)
+    list_select_related = ("project", "creator", "assignee", "status", "priority")
     search_fields = ("title", "description")
-    ordering = ("-created_at",)
+    ordering = ("-id",)
 
     raw_id_fields = ("creator", "assignee", "project")
     autocomplete_fields = ("status", "priority")
+
+
+@admin.register(AttachmentUpload)
+class AttachmentUploadAdmin(admin.ModelAdmin):
+    """
+    Административный интерфейс для модели AttachmentUpload.
+
+    Позволяет просматривать незавершённые загрузки вложений.
+    """
+
+    list_display = ("id", "filename", "task", "owner", "offset", "size", "updated_at")
+    search_fields = ("filename",)
+    readonly_fields = ("offset", "created_at", "updated_at")
+    raw_id_fields = ("task", "owner")
+
+
+@admin.register(AttachmentBlob)
+class AttachmentBlobAdmin(admin.ModelAdmin):
+    """
+    Административный интерфейс для модели AttachmentBlob.
+
+    Позволяет просматривать блобы хранилища вложений и их счётчики ссылок.
+    """
+
+    list_display = ("digest", "size", "ref_count", "created_at", "updated_at")
+    search_fields = ("digest",)
+    readonly_fields = ("digest", "size", "ref_count", "created_at", "updated_at")
+
+
+@admin.register(Tombstone)
+class TombstoneAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    """
+    Административный интерфейс для модели Tombstone.
+
+    Позволяет просматривать записи об удалённых задачах и комментариях.
+    """
+
+    list_display = ("id", "kind", "object_id", "task_id", "project_id", "deleted_at")
+    list_filter = ("kind",)
+    readonly_fields = (
+        "kind",
+        "object_id",
+        "task_id",
+        "project_id",
+        "creator_id",
+        "deleted_xid",
+        "deleted_at",
+    )
+
+
+@admin.register(ProjectTaskSummary)
+class ProjectTaskSummaryAdmin(admin.ModelAdmin):
+    """
+    Административный интерфейс для модели ProjectTaskSummary.
+
+    Сводка только просматривается: счётчики меняют сигналы задач и сверка.
+    """
+
+    list_display = ("id", "project", "status", "priority", "assignee", "count")
+    list_filter = ("status", "priority")
+    list_select_related = ("project", "status", "priority", "assignee")
+    raw_id_fields = ("project", "assignee")
+    readonly_fields = ("project", "status", "priority", "assignee", "count")
+
+
+@admin.register(ArchivedTask)
+class ArchivedTaskAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    """
+    Административный интерфейс для модели ArchivedTask.
+
+    Задачи архива только просматриваются и возвращаются действием restore_tasks.
+    """
+
+    list_display = ("id", "issue_id", "title", "project", "status", "archived_at")
+    list_filter = (ProjectFilter, "status")
+    list_select_related = ("project", "status")
+    search_fields = ("issue_id", "title")
+    raw_id_fields = ("creator", "assignee", "project")
+    actions = ["restore_tasks"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.action(description="Вернуть выбранные задачи из архива")
+    def restore_tasks(self, request, queryset):
+        count = 0
+        for archived in queryset:
+            restore_task(archived)
+            count += 1
+        self.message_user(request, f"Возвращено из архива задач: {count}")
+
+
+@admin.register(PendingDeletion)
+class PendingDeletionAdmin(admin.ModelAdmin):
+    """
+    Административный интерфейс для модели PendingDeletion.
+
+    Позволяет отслеживать ход фонового удаления проектов и пользователей.
+    """
+
+    list_display = ("id", "kind", "label", "state", "progress", "requested_at")
+    list_filter = ("kind", "state")
+    readonly_fields = (
+        "kind",
+        "object_id",
+        "label",
+        "requested_by",
+        "state",
+        "total_tasks",
+        "progress",
+        "requested_at",
+        "updated_at",
+        "finished_at",
+    )
+
+    def has_add_permission(self, request):
+        return False
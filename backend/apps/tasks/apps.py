@@ -10,3 +10,6 @@ from django.apps import AppConfig
 
 class TasksConfig(AppConfig):
     name = "apps.tasks"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,214 @@
+"""
+Холодный архив закрытых задач.
+
+Задачи, подходящие под правило архивации (статус из TASK_ARCHIVE_STATUS_IDS
+и нет изменений TASK_ARCHIVE_AFTER_DAYS дней), переносятся вместе
+с комментариями в таблицы ArchivedTask и ArchivedComment пакетами,
+каждый в своей короткой транзакции. Перенос выполняется запросами
+INSERT ... SELECT и DELETE без загрузки строк в Python и без сигналов
+удаления: вложения остаются на месте, а вместо сигналов пакет сам
+обновляет версии и сводку проектов, записи об удалении для синхронизации
+и журнал изменений.
+
+Поиск по issue_id (TaskViewSet.get_object) находит задачу в архиве,
+restore_task возвращает её в рабочую таблицу.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .history import record_table_changes
+from .models import (
+    ArchivedComment,
+    ArchivedTask,
+    Comment,
+    Project,
+    Task,
+    TaskChange,
+    Tombstone,
+)
+from .summary import move_table_summary
+
+XID = "pg_current_xact_id()::text::bigint"
+
+
+def _columns(model, exclude=()):
+    return [
+        field.column
+        for field in model._meta.concrete_fields
+        if field.name not in exclude
+    ]
+
+
+def archive_candidates():
+    """
+    Возвращает задачи, подходящие под правило архивации.
+
+    Задачи с незавершёнными загрузками вложений не архивируются.
+
+    Returns:
+        QuerySet: Задачи для переноса в архив
+    """
+    cutoff = timezone.now() - timedelta(days=settings.TASK_ARCHIVE_AFTER_DAYS)
+    return Task.objects.filter(
+        status_id__in=settings.TASK_ARCHIVE_STATUS_IDS,
+        updated_at__lt=cutoff,
+        attachment_uploads__isnull=True,
+    ).order_by("pk")
+
+
+def archive_tasks(task_ids):
+    """
+    Переносит задачи и их комментарии в архив.
+
+    Вызывается в транзакции, строки задач должны быть заблокированы.
+
+    Args:
+        task_ids (list): ID задач
+
+    Returns:
+        int: Количество перенесённых задач
+    """
+    if not task_ids:
+        return 0
+    task_table = Task._meta.db_table
+    comment_table = Comment._meta.db_table
+    task_columns = ", ".join(_columns(ArchivedTask, exclude=["archived_at"]))
+    comment_columns = ", ".join(_columns(ArchivedComment))
+    project_ids = Task.objects.filter(pk__in=task_ids).values_list(
+        "project_id", flat=True
+    )
+    # Блокировка строк проектов упорядочивает перенос со сверкой сводки
+    Project.bump_tasks_version(*set(project_ids))
+    move_table_summary(task_ids, task_table, -1)
+    record_table_changes(task_ids, task_table, TaskChange.Action.ARCHIVED)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {ArchivedTask._meta.db_table} ({task_columns}, archived_at) "
+            f"SELECT {task_columns}, now() FROM {task_table} WHERE id = ANY(%s)",
+            [task_ids],
+        )
+        cursor.execute(
+            f"INSERT INTO {ArchivedComment._meta.db_table} ({comment_columns}) "
+            f"SELECT {comment_columns} FROM {comment_table} WHERE task_id = ANY(%s)",
+            [task_ids],
+        )
+        cursor.execute(
+            f"INSERT INTO {Tombstone._meta.db_table} (kind, object_id, task_id, "
+            "project_id, creator_id, deleted_xid, deleted_at) "
+            f"SELECT %s, id, id, project_id, creator_id, {XID}, now() "
+            f"FROM {task_table} WHERE id = ANY(%s)",
+            [Tombstone.Kind.TASK, task_ids],
+        )
+        cursor.execute(
+            f"DELETE FROM {comment_table} WHERE task_id = ANY(%s)", [task_ids]
+        )
+        cursor.execute(f"DELETE FROM {task_table} WHERE id = ANY(%s)", [task_ids])
+        return cursor.rowcount
+
+
+def archive_batch(batch_size=None):
+    """
+    Переносит в архив один пакет задач в отдельной транзакции.
+
+    Строки выбираются через FOR UPDATE SKIP LOCKED, поэтому задачи,
+    которые сейчас редактируются, пропускаются до следующего запуска.
+
+    Args:
+        batch_size (int): Количество задач в пакете
+
+    Returns:
+        int: Количество перенесённых задач
+    """
+    batch_size = batch_size or settings.TASK_ARCHIVE_BATCH_SIZE
+    with transaction.atomic():
+        task_ids = list(
+            archive_candidates()
+            .select_for_update(skip_locked=True, of=("self",))
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        return archive_tasks(task_ids)
+
+
+def archive_closed_tasks(batch_size=None, max_batches=None):
+    """
+    Переносит в архив все подходящие задачи пакетами.
+
+    Args:
+        batch_size (int): Количество задач в пакете
+        max_batches (int): Максимальное число пакетов (None — без ограничения)
+
+    Returns:
+        dict: Количество перенесённых задач и пакетов и признак more:
+            последний пакет был полным, и подходящие задачи могли остаться
+    """
+    if not settings.TASK_ARCHIVE_AFTER_DAYS:
+        return {"archived": 0, "batches": 0, "more": False}
+    batch_size = batch_size or settings.TASK_ARCHIVE_BATCH_SIZE
+    archived = batches = moved = 0
+    while max_batches is None or batches < max_batches:
+        moved = archive_batch(batch_size)
+        archived += moved
+        batches += 1
+        if moved < batch_size:
+            break
+    return {"archived": archived, "batches": batches, "more": moved == batch_size}
+
+
+def restore_task(archived):
+    """
+    Возвращает задачу из архива вместе с комментариями.
+
+    Задача получает новый курсор синхронизации, а записи о её удалении
+    удаляются, поэтому клиенты получат её при следующем опросе changed_since.
+    Время обновления задачи сдвигается на текущее, чтобы она не попала
+    в архив при следующем запуске.
+
+    Args:
+        archived (ArchivedTask): Задача в архиве
+
+    Returns:
+        Task: Восстановленная задача
+    """
+    task_ids = [archived.pk]
+    archive_table = ArchivedTask._meta.db_table
+    comment_archive_table = ArchivedComment._meta.db_table
+    columns = _columns(ArchivedTask, exclude=["archived_at"])
+    task_columns = ", ".join(columns)
+    task_values = ", ".join("now()" if c == "updated_at" else c for c in columns)
+    comment_columns = ", ".join(_columns(ArchivedComment))
+    with transaction.atomic():
+        Project.bump_tasks_version(archived.project_id)
+        locked = ArchivedTask.objects.select_for_update().filter(pk=archived.pk)
+        if not locked.exists():
+            # Задачу уже вернули из архива параллельным запросом
+            return Task.objects.get(pk=archived.pk)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {Task._meta.db_table} ({task_columns}, change_xid) "
+                f"SELECT {task_values}, {XID} FROM {archive_table} "
+                "WHERE id = ANY(%s)",
+                [task_ids],
+            )
+            cursor.execute(
+                f"INSERT INTO {Comment._meta.db_table} ({comment_columns}, change_xid) "
+                f"SELECT {comment_columns}, {XID} FROM {comment_archive_table} "
+                "WHERE task_id = ANY(%s)",
+                [task_ids],
+            )
+            cursor.execute(
+                f"DELETE FROM {comment_archive_table} WHERE task_id = ANY(%s)",
+                [task_ids],
+            )
+            cursor.execute(
+                f"DELETE FROM {archive_table} WHERE id = ANY(%s)", [task_ids]
+            )
+        move_table_summary(task_ids, Task._meta.db_table, +1)
+        record_table_changes(task_ids, Task._meta.db_table, TaskChange.Action.RESTORED)
+        Tombstone.objects.filter(
+            kind=Tombstone.Kind.TASK, object_id=archived.pk
+        ).delete()
+    return Task.objects.get(pk=archived.pk)
@@ -0,0 +1,195 @@
+"""
+Списки административного интерфейса для больших таблиц.
+
+Стандартный список объектов в админке на таблицах с миллионами строк
+упирается в три места:
+- фильтры по связям (list_filter = ("project", "author")) выводят в боковой
+  панели каждый проект, пользователя или задачу
+- пагинатор выполняет точный COUNT(*) по всей выборке, а список
+  дополнительно считает строки без фильтров (show_full_result_count)
+- колонки со связанными объектами загружают их отдельными запросами
+
+Модуль предоставляет фильтр SearchListFilter, который вместо перечисления
+принимает строку поиска (ID, код, email) и находит связанные объекты
+по индексам, пагинатор EstimatedCountPaginator, берущий количество строк
+из оценок планировщика Postgres, и примесь LargeTableAdminMixin,
+собирающую эти настройки.
+"""
+
+import json
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.views.main import PAGE_VAR
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.http import QueryDict
+from django.utils.functional import cached_property
+
+
+def table_row_estimate(model, using="default"):
+    """
+    Возвращает оценку количества строк таблицы из статистики pg_class.
+
+    Для секционированной таблицы складываются оценки секций.
+
+    Args:
+        model: Модель Django
+        using (str): Алиас базы данных
+
+    Returns:
+        int | None: Оценка или None, если таблица ещё не анализировалась
+    """
+    table = model._meta.db_table
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT SUM(reltuples) FILTER (WHERE reltuples >= 0) FROM pg_class "
+            "WHERE oid = %s::regclass "
+            "OR oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = %s::regclass)",
+            [table, table],
+        )
+        estimate = cursor.fetchone()[0]
+    return None if estimate is None else int(estimate)
+
+
+def queryset_row_estimate(queryset):
+    """
+    Возвращает оценку количества строк выборки.
+
+    Выборка без условий оценивается по статистике таблицы, с условиями —
+    по плану запроса (EXPLAIN), без его выполнения.
+
+    Args:
+        queryset (QuerySet): Выборка
+
+    Returns:
+        int | None: Оценка или None, если оценить не удалось
+    """
+    if not queryset.query.has_filters():
+        return table_row_estimate(queryset.model, queryset.db)
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор, использующий оценку количества строк для больших выборок.
+
+    Если оценка меньше ADMIN_EXACT_COUNT_LIMIT, выполняется точный COUNT(*),
+    иначе количество страниц считается по оценке: номера последних страниц
+    приблизительны, зато список открывается без полного прохода по таблице.
+    """
+
+    @cached_property
+    def count(self):
+        if hasattr(self.object_list, "query"):
+            estimate = queryset_row_estimate(self.object_list)
+            if estimate is not None and estimate >= settings.ADMIN_EXACT_COUNT_LIMIT:
+                return estimate
+        return super().count
+
+
+class SearchListFilter(admin.SimpleListFilter):
+    """
+    Фильтр по связанному объекту, заданному строкой поиска.
+
+    В боковой панели выводится поле ввода вместо списка всех объектов.
+    Число ищется по ID, строка — по полям search_lookups связанной модели
+    (например, email__iexact); найденные ID подставляются в условие
+    field__in, поэтому большая таблица читается по индексу внешнего ключа.
+
+    Подклассы задают title, parameter_name, field, search_lookups
+    и подсказку placeholder.
+    """
+
+    template = "admin/tasks/search_filter.html"
+    field = None
+    search_lookups = ()
+    placeholder = "ID"
+    max_matches = 100
+
+    def lookups(self, request, model_admin):
+        model = model_admin.model
+        for part in self.field.split("__"):
+            model = model._meta.get_field(part).related_model
+        self.related_model = model
+        value = self.value()
+        if not value:
+            return []
+        matches = self.matches(value)
+        label = ", ".join(str(obj) for obj in matches[:3]) or "Не найдено"
+        return [(value, label)]
+
+    def has_output(self):
+        return True
+
+    def choices(self, changelist):
+        # Остальные параметры списка передаются формой фильтра скрытыми полями
+        query = QueryDict(
+            changelist.get_query_string(remove=[self.parameter_name, PAGE_VAR])[1:]
+        )
+        yield {
+            "selected": self.value() is None,
+            "query_string": changelist.get_query_string(remove=[self.parameter_name]),
+            "display": "Все",
+            "hidden": [
+                (name, value) for name, values in query.lists() for value in values
+            ],
+        }
+        for lookup, title in self.lookup_choices:
+            yield {
+                "selected": True,
+                "query_string": changelist.get_query_string(
+                    {self.parameter_name: lookup}
+                ),
+                "display": title,
+            }
+
+    def matches(self, value):
+        """
+        Находит связанные объекты по строке поиска.
+
+        Args:
+            value (str): Строка из поля фильтра
+
+        Returns:
+            list: Найденные объекты (не больше max_matches)
+        """
+        if not hasattr(self, "_matches"):
+            condition = Q()
+            if value.isdigit():
+                condition |= Q(pk=int(value))
+            for lookup in self.search_lookups:
+                condition |= Q(**{lookup: value})
+            self._matches = list(
+                self.related_model._default_manager.filter(condition)[
+                    : self.max_matches
+                ]
+            )
+        return self._matches
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if not value:
+            return queryset
+        ids = [obj.pk for obj in self.matches(value)]
+        return queryset.filter(**{f"{self.field}__in": ids})
+
+
+class LargeTableAdminMixin:
+    """
+    Примесь ModelAdmin для таблиц с миллионами строк.
+
+    Включает пагинатор по оценкам планировщика и отключает подсчёт строк
+    без фильтров и счётчики фильтров (facets).
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
@@ -0,0 +1,412 @@
+"""
+Фоновое удаление проектов и пользователей.
+
+Каскадное удаление средствами Django загружает в память все задачи
+и комментарии проекта (или пользователя) и отправляет сигналы по каждому
+объекту в рамках запроса. Вместо этого request_deletion только отмечает
+объект (deleting_at): менеджеры objects и представления перестают его
+показывать, пользователь теряет доступ к API. Затем фоновая задача
+удаляет зависимые строки пакетами по DELETION_BATCH_SIZE, каждый в своей
+короткой транзакции, запросами DELETE ... WHERE id = ANY(...) без загрузки
+строк в Python, и после каждого пакета обновляет прогресс PendingDeletion.
+Сам объект удаляется последним, когда зависимых строк не осталось.
+
+Вместо сигналов пакет сам уменьшает счётчики ссылок блобов вложений
+(файлы без ссылок удаляет сборщик мусора gc_attachments), удаляет файлы
+вложений вне хранилища блобов и незавершённые загрузки, обновляет сводку
+и версии проектов, счётчики комментариев, записи об удалении для
+синхронизации и журнал изменений.
+"""
+
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.utils import timezone
+
+from config.invalidation import invalidate, membership_key
+from config.thumbnails import forget_thumbnails, thumbnail_name
+
+from .history import record_table_changes
+from .models import (
+    ArchivedComment,
+    ArchivedTask,
+    AttachmentUpload,
+    Comment,
+    CurrentTransactionId,
+    PendingDeletion,
+    Project,
+    Task,
+    TaskChange,
+    Tombstone,
+    update_comment_stats,
+)
+from .storage import attachment_storage, change_ref_count, digest_from_name
+from .summary import apply_summary_deltas, move_table_summary
+from .uploads import discard_upload
+
+User = get_user_model()
+
+XID = CurrentTransactionId.template
+
+
+def hide_deleting(queryset, *paths):
+    """
+    Исключает строки, связанные с удаляемыми проектами или пользователями.
+
+    Args:
+        queryset (QuerySet): Исходный queryset
+        *paths (str): Пути к связанным проектам и пользователям
+            (например, "project", "task__creator")
+
+    Returns:
+        QuerySet: Отфильтрованный queryset
+    """
+    return queryset.filter(**{f"{path}__deleting_at__isnull": True for path in paths})
+
+
+def request_deletion(instance, requested_by=None):
+    """
+    Отмечает проект или пользователя как удаляемый и создаёт PendingDeletion.
+
+    Повторный запрос для уже отмеченного объекта возвращает существующее
+    удаление. Фоновую задачу purge_pending_deletion ставит вызывающий код.
+
+    Args:
+        instance (Project | User): Удаляемый объект
+        requested_by (User): Пользователь, запросивший удаление
+
+    Returns:
+        tuple: (PendingDeletion, True если удаление создано этим вызовом)
+    """
+    if isinstance(instance, Project):
+        kind, tasks = PendingDeletion.Kind.PROJECT, {"project": instance}
+    else:
+        kind, tasks = PendingDeletion.Kind.USER, {"creator": instance}
+    model = type(instance)
+    with transaction.atomic():
+        marked = model.all_objects.filter(
+            pk=instance.pk, deleting_at__isnull=True
+        ).update(deleting_at=timezone.now())
+        if marked:
+            # Отметка ставится UPDATE без сигналов, а удаляемый проект
+            # скрывается из проектов участников
+            if isinstance(instance, Project):
+                user_ids = instance.members.values_list("pk", flat=True)
+            else:
+                user_ids = [instance.pk]
+            invalidate(membership_key(pk) for pk in user_ids)
+        if not marked:
+            pending = PendingDeletion.objects.filter(
+                kind=kind, object_id=instance.pk
+            ).first()
+            if pending is not None:
+                return pending, False
+        pending = PendingDeletion.objects.create(
+            kind=kind,
+            object_id=instance.pk,
+            label=str(instance)[:255],
+            requested_by=requested_by,
+            total_tasks=Task.objects.filter(**tasks).count(),
+        )
+    return pending, True
+
+
+def _release_attachments(names):
+    """
+    Освобождает вложения удалённых комментариев.
+
+    Для блобов уменьшается счётчик ссылок, файлы вне хранилища блобов
+    удаляются вместе с превью после фиксации транзакции.
+
+    Returns:
+        int: Количество вложений
+    """
+    counts = Counter(name for name in names if name)
+    storage = attachment_storage()
+    for name, count in counts.items():
+        if digest_from_name(name):
+            change_ref_count(name, -count)
+            continue
+        files = [name] + [
+            thumbnail_name(name, size) for size in settings.THUMBNAIL_SIZES["preview"]
+        ]
+        transaction.on_commit(lambda files=files: [storage.delete(f) for f in files])
+        transaction.on_commit(lambda name=name: forget_thumbnails(storage, name))
+    return sum(counts.values())
+
+
+def _delete_comments(comment_ids, record):
+    """
+    Удаляет пакет комментариев.
+
+    Args:
+        comment_ids (list): ID комментариев
+        record (bool): Записать удаление каждого комментария (записи
+            для синхронизации, журнал, счётчик комментариев задачи).
+            Не нужно, если задачи комментариев удаляются следом.
+
+    Returns:
+        dict: Количество удалённых комментариев и освобождённых вложений
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {Comment._meta.db_table} WHERE id = ANY(%s) "
+            "RETURNING id, task_id, text, attachment",
+            [comment_ids],
+        )
+        rows = cursor.fetchall()
+    attachments = _release_attachments(row[3] for row in rows)
+    if record and rows:
+        tasks = Task.objects.in_bulk({row[1] for row in rows})
+        per_task = defaultdict(int)
+        tombstones = []
+        changes = []
+        for comment_id, task_id, text, _ in rows:
+            task = tasks[task_id]
+            per_task[task_id] += 1
+            tombstones.append(
+                Tombstone(
+                    kind=Tombstone.Kind.COMMENT,
+                    object_id=comment_id,
+                    task_id=task_id,
+                    project_id=task.project_id,
+                    creator_id=task.creator_id,
+                    deleted_xid=CurrentTransactionId(),
+                )
+            )
+            changes.append(
+                TaskChange(
+                    action=TaskChange.Action.DELETED,
+                    task_id=task_id,
+                    project_id=task.project_id,
+                    comment_id=comment_id,
+                    changes={"text": [text, None]},
+                )
+            )
+        Tombstone.objects.bulk_create(tombstones)
+        TaskChange.objects.bulk_create(changes)
+        for task_id, count in sorted(per_task.items()):
+            update_comment_stats(task_id, -count)
+        Project.bump_tasks_version(*{task.project_id for task in tasks.values()})
+    return {"comments": len(rows), "attachments": attachments}
+
+
+def _delete_tasks(task_ids, record):
+    """
+    Удаляет пакет задач вместе с оставшимися комментариями и загрузками.
+
+    Args:
+        task_ids (list): ID задач
+        record (bool): Уменьшить сводку и записать удаление в журнал.
+            Не нужно при удалении проекта: его сводка и журнал не читаются.
+
+    Returns:
+        dict: Количество удалённых строк
+    """
+    table = Task._meta.db_table
+    result = _delete_comments(
+        list(Comment.objects.filter(task_id__in=task_ids).values_list("pk", flat=True)),
+        record=False,
+    )
+    for upload in AttachmentUpload.objects.filter(task_id__in=task_ids):
+        discard_upload(upload)
+    project_ids = Task.objects.filter(pk__in=task_ids).values_list(
+        "project_id", flat=True
+    )
+    Project.bump_tasks_version(*set(project_ids))
+    if record:
+        move_table_summary(task_ids, table, -1)
+        record_table_changes(task_ids, table, TaskChange.Action.DELETED)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {Tombstone._meta.db_table} (kind, object_id, task_id, "
+            "project_id, creator_id, deleted_xid, deleted_at) "
+            f"SELECT %s, id, id, project_id, creator_id, {XID}, now() "
+            f"FROM {table} WHERE id = ANY(%s)",
+            [Tombstone.Kind.TASK, task_ids],
+        )
+        cursor.execute(f"DELETE FROM {table} WHERE id = ANY(%s)", [task_ids])
+        result["tasks"] = cursor.rowcount
+    return result
+
+
+def _unassign_tasks(task_ids, user_id):
+    """
+    Снимает удаляемого пользователя с задач (как SET_NULL при каскаде).
+    """
+    table = Task._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT project_id, status_id, priority_id, COUNT(*) FROM {table} "
+            "WHERE id = ANY(%s) GROUP BY project_id, status_id, priority_id",
+            [task_ids],
+        )
+        deltas = {}
+        for project_id, status_id, priority_id, count in cursor.fetchall():
+            deltas[(project_id, status_id, priority_id, user_id)] = -count
+            deltas[(project_id, status_id, priority_id, None)] = count
+        Project.bump_tasks_version(*{bucket[0] for bucket in deltas})
+        apply_summary_deltas(deltas)
+        cursor.execute(
+            f"INSERT INTO {TaskChange._meta.db_table} "
+            "(at, task_id, project_id, action, changes) "
+            "SELECT clock_timestamp(), id, project_id, %s, "
+            "jsonb_build_object('assignee', jsonb_build_array(assignee_id, NULL)) "
+            f"FROM {table} WHERE id = ANY(%s)",
+            [TaskChange.Action.UPDATED, task_ids],
+        )
+        cursor.execute(
+            f"UPDATE {table} SET assignee_id = NULL, change_xid = {XID} "
+            "WHERE id = ANY(%s)",
+            [task_ids],
+        )
+        return {"unassigned": cursor.rowcount}
+
+
+def _delete_archived_comments(comment_ids):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {ArchivedComment._meta.db_table} WHERE id = ANY(%s) "
+            "RETURNING attachment",
+            [comment_ids],
+        )
+        rows = cursor.fetchall()
+    return {
+        "archived_comments": len(rows),
+        "attachments": _release_attachments(row[0] for row in rows),
+    }
+
+
+def _delete_archived_tasks(task_ids):
+    result = _delete_archived_comments(
+        list(
+            ArchivedComment.objects.filter(task_id__in=task_ids).values_list(
+                "pk", flat=True
+            )
+        )
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {ArchivedTask._meta.db_table} WHERE id = ANY(%s)",
+            [task_ids],
+        )
+        result["archived_tasks"] = cursor.rowcount
+    return result
+
+
+def _unassign_archived_tasks(task_ids):
+    count = ArchivedTask.objects.filter(pk__in=task_ids).update(assignee=None)
+    return {"unassigned": count}
+
+
+def deletion_steps(pending):
+    """
+    Возвращает шаги удаления: пары (queryset зависимых строк, функция пакета).
+
+    Шаги выполняются по порядку, каждый — пока queryset не опустеет.
+
+    Args:
+        pending (PendingDeletion): Удаление
+
+    Returns:
+        list: Пары (QuerySet, callable(ids) -> dict счётчиков)
+    """
+    pk = pending.object_id
+    if pending.kind == PendingDeletion.Kind.PROJECT:
+        return [
+            (
+                Comment.objects.filter(task__project_id=pk),
+                lambda ids: _delete_comments(ids, record=False),
+            ),
+            (
+                Task.objects.filter(project_id=pk),
+                lambda ids: _delete_tasks(ids, record=False),
+            ),
+            (
+                ArchivedComment.objects.filter(task__project_id=pk),
+                _delete_archived_comments,
+            ),
+            (ArchivedTask.objects.filter(project_id=pk), _delete_archived_tasks),
+        ]
+    return [
+        (
+            Comment.objects.filter(task__creator_id=pk),
+            lambda ids: _delete_comments(ids, record=False),
+        ),
+        (
+            Comment.objects.filter(author_id=pk),
+            lambda ids: _delete_comments(ids, record=True),
+        ),
+        (
+            Task.objects.filter(creator_id=pk),
+            lambda ids: _delete_tasks(ids, record=True),
+        ),
+        (Task.objects.filter(assignee_id=pk), lambda ids: _unassign_tasks(ids, pk)),
+        (
+            ArchivedComment.objects.filter(author_id=pk),
+            _delete_archived_comments,
+        ),
+        (ArchivedTask.objects.filter(creator_id=pk), _delete_archived_tasks),
+        (ArchivedTask.objects.filter(assignee_id=pk), _unassign_archived_tasks),
+    ]
+
+
+def _finish(pending):
+    """
+    Удаляет сам объект, когда зависимых строк не осталось.
+    """
+    if pending.kind == PendingDeletion.Kind.PROJECT:
+        Project.all_objects.filter(pk=pending.object_id).delete()
+    else:
+        for upload in AttachmentUpload.objects.filter(owner_id=pending.object_id):
+            discard_upload(upload)
+        User.all_objects.filter(pk=pending.object_id).delete()
+    pending.state = PendingDeletion.State.DONE
+    pending.finished_at = timezone.now()
+    pending.save(update_fields=["state", "finished_at", "updated_at"])
+
+
+def purge_batches(pending_id, batch_size=None, max_batches=None):
+    """
+    Выполняет очередные пакеты удаления.
+
+    Каждый пакет выполняется в своей транзакции вместе с обновлением
+    прогресса; строка PendingDeletion блокируется, поэтому одно удаление
+    не обрабатывается параллельно двумя воркерами.
+
+    Args:
+        pending_id (int): ID PendingDeletion
+        batch_size (int): Количество строк в пакете
+        max_batches (int): Максимальное число пакетов (None — до завершения)
+
+    Returns:
+        bool: True, если удаление завершено
+    """
+    batch_size = batch_size or settings.DELETION_BATCH_SIZE
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        with transaction.atomic():
+            pending = (
+                PendingDeletion.objects.select_for_update()
+                .filter(pk=pending_id)
+                .first()
+            )
+            if pending is None or pending.state == PendingDeletion.State.DONE:
+                return True
+            for queryset, delete_batch in deletion_steps(pending):
+                ids = list(
+                    queryset.order_by().values_list("pk", flat=True)[:batch_size]
+                )
+                if ids:
+                    break
+            else:
+                _finish(pending)
+                return True
+            for key, count in delete_batch(ids).items():
+                pending.progress[key] = pending.progress.get(key, 0) + count
+            pending.state = PendingDeletion.State.RUNNING
+            pending.save(update_fields=["state", "progress", "updated_at"])
+        batches += 1
+    return False
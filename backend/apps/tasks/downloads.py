@@ -0,0 +1,284 @@
+"""
+Защищённая отдача вложений комментариев.
+
+Доступ к файлу проверяется по видимости задачи, после чего файл отдаёт:
+- nginx через заголовок X-Accel-Redirect (если задан MEDIA_ACCEL_REDIRECT_PREFIX)
+- Django через FileResponse, который gunicorn передаёт в сокет через sendfile
+
+Ссылки на скачивание подписываются, чтобы их можно было открывать
+в браузере без заголовка Authorization.
+"""
+
+import mimetypes
+import os
+import re
+from urllib.parse import quote, urlencode
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    JsonResponse,
+)
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date
+from django.views.decorators.http import require_http_methods
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from config.thumbnails import thumbnail_name
+
+from .deletion import hide_deleting
+from .models import Comment
+from .permissions import user_can_view_task
+
+User = get_user_model()
+
+DOWNLOAD_SALT = "apps.tasks.attachment-download"
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def sign_download(user, comment):
+    """
+    Создаёт подписанный токен скачивания вложения для пользователя.
+
+    Args:
+        user: Пользователь, которому выдаётся ссылка
+        comment (Comment | int): Комментарий с вложением или его ID
+
+    Returns:
+        str: Подписанный токен
+    """
+    comment_id = getattr(comment, "pk", comment)
+    return signing.dumps({"c": comment_id, "u": user.pk}, salt=DOWNLOAD_SALT)
+
+
+def comment_download_url(request, comment_id, variant=None):
+    """
+    Возвращает подписанную ссылку на скачивание вложения по ID комментария.
+
+    Args:
+        request: HTTP запрос (может быть None)
+        comment_id (int): ID комментария с вложением
+        variant (str): Вариант файла (preview — уменьшенная копия изображения)
+
+    Returns:
+        str: URL для скачивания
+    """
+    url = reverse("attachment-download", kwargs={"pk": comment_id})
+    params = {}
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        params["token"] = sign_download(user, comment_id)
+    if variant:
+        params["variant"] = variant
+    if params:
+        url = f"{url}?{urlencode(params)}"
+    if request is not None and hasattr(request, "build_absolute_uri"):
+        return request.build_absolute_uri(url)
+    return url
+
+
+def _resolve_user(request, pk):
+    """
+    Определяет пользователя по подписанному токену или JWT-заголовку.
+
+    Returns:
+        User | None: Пользователь или None, если аутентификация не удалась
+    """
+    token = request.GET.get("token")
+    if token:
+        try:
+            payload = signing.loads(
+                token,
+                salt=DOWNLOAD_SALT,
+                max_age=settings.MEDIA_DOWNLOAD_TOKEN_MAX_AGE,
+            )
+        except signing.BadSignature:
+            return None
+        if payload.get("c") != pk:
+            return None
+        return User.objects.filter(pk=payload.get("u"), is_active=True).first()
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except Exception:
+        return None
+    return result[0] if result else None
+
+
+def _parse_range(header, size):
+    """
+    Разбирает заголовок Range с одним диапазоном байт.
+
+    Args:
+        header (str): Значение заголовка Range
+        size (int): Размер файла
+
+    Returns:
+        tuple | None: (start, end) включительно, None если диапазон не задан
+            или содержит несколько частей
+
+    Raises:
+        ValueError: Если диапазон не удовлетворим
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        length = int(last)
+        if length == 0:
+            raise ValueError("Пустой суффиксный диапазон")
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("Диапазон за пределами файла")
+    return start, end
+
+
+class RangeFile:
+    """
+    Обёртка над открытым файлом, ограничивающая чтение диапазоном байт.
+
+    Метод fileno() позволяет gunicorn отправить диапазон через sendfile:
+    смещение берётся из текущей позиции файла, длина — из Content-Length.
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.file.seek(start)
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def serve_file(request, storage, name, filename=None, as_attachment=True):
+    """
+    Отдаёт файл из MEDIA_ROOT с заголовками кэширования и поддержкой Range.
+
+    Args:
+        request: HTTP запрос
+        storage: Файловое хранилище
+        name (str): Имя файла в хранилище
+        filename (str): Имя файла для Content-Disposition
+        as_attachment (bool): Предлагать сохранение файла вместо показа
+
+    Returns:
+        HttpResponse: Ответ с файлом, X-Accel-Redirect или 304/416
+    """
+    try:
+        path = storage.path(name)
+        stat = os.stat(path)
+    except (OSError, NotImplementedError, ValueError):
+        raise Http404("Файл не найден")
+
+    filename = filename or os.path.basename(name)
+    content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    etag = f'"{stat.st_size:x}-{int(stat.st_mtime):x}"'
+
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime)
+    )
+    if response is None:
+        prefix = settings.MEDIA_ACCEL_REDIRECT_PREFIX
+        if prefix:
+            response = HttpResponse(content_type=content_type)
+            response["X-Accel-Redirect"] = prefix.rstrip("/") + "/" + quote(name)
+        else:
+            response = _local_file_response(
+                request, path, stat.st_size, content_type, etag
+            )
+        response["Content-Disposition"] = content_disposition_header(
+            as_attachment, filename
+        )
+
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(stat.st_mtime)
+    patch_cache_control(response, private=True, max_age=settings.MEDIA_CACHE_MAX_AGE)
+    return response
+
+
+def _local_file_response(request, path, size, content_type, etag):
+    """
+    Формирует FileResponse для полного файла или запрошенного диапазона.
+
+    Диапазон учитывается, только если If-Range отсутствует или совпадает с ETag.
+    """
+    range_header = request.headers.get("Range", "")
+    if_range = request.headers.get("If-Range")
+    byte_range = None
+    if range_header and if_range in (None, etag):
+        try:
+            byte_range = _parse_range(range_header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+    if byte_range is None:
+        response = FileResponse(open(path, "rb"), content_type=content_type)
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = FileResponse(
+            RangeFile(open(path, "rb"), start, length),
+            content_type=content_type,
+            status=206,
+        )
+        response["Content-Length"] = length
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+@require_http_methods(["GET", "HEAD"])
+def attachment_download(request, pk):
+    """
+    Отдаёт вложение комментария пользователю, которому видна задача.
+
+    Аутентификация выполняется по подписанному токену из ссылки
+    (параметр token) или по JWT в заголовке Authorization. Параметр
+    variant=preview возвращает уменьшенную копию изображения для показа.
+    """
+    user = _resolve_user(request, pk)
+    if user is None:
+        return JsonResponse(
+            {"detail": "Учетные данные не были предоставлены."}, status=401
+        )
+    comment = (
+        hide_deleting(Comment.objects.select_related("task__project"), "task__project")
+        .filter(pk=pk)
+        .exclude(attachment="")
+        .exclude(attachment__isnull=True)
+        .first()
+    )
+    if comment is None or not user_can_view_task(user, comment.task):
+        raise Http404("Вложение не найдено")
+    storage = comment.attachment.storage
+    if request.GET.get("variant") == "preview":
+        size = settings.THUMBNAIL_SIZES["preview"][0]
+        name = thumbnail_name(comment.attachment.name, size)
+        return serve_file(request, storage, name, as_attachment=False)
+    return serve_file(
+        request, storage, comment.attachment.name, comment.attachment_name or None
+    )
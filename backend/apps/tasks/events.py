@@ -0,0 +1,374 @@
+"""
+Поток событий задач и комментариев (Server-Sent Events).
+
+Сохранение и удаление Task и создание Comment отправляют NOTIFY в канал
+task_events (см. signals.py), поэтому события доходят до клиентов,
+подключённых к любому процессу и узлу. В каждом процессе одно соединение
+LISTEN раздаёт события подписчикам с учётом видимости проектов.
+
+Эндпоинт GET /api/tasks/events/ рассчитан на ASGI (config/asgi.py): ожидающий
+клиент — это корутина с очередью, поэтому процесс держит тысячи соединений.
+Под WSGI (runserver) поток событий тоже работает, но занимает поток на клиента.
+
+EventSource не передаёт заголовки, а строка запроса попадает в журналы
+nginx и gunicorn, поэтому JWT в ней не принимается. Клиент получает
+короткоживущий подписанный билет POST /api/tasks/events/ticket/
+и подключается с ?ticket=.
+"""
+
+import asyncio
+import json
+import queue
+import threading
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.views.decorators.http import require_GET
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from config.invalidation import membership_key
+from config.notify import NotifyListener, notify
+
+from .models import Project
+
+User = get_user_model()
+
+CHANNEL = "task_events"
+TICKET_SALT = "apps.tasks.event-stream"
+
+
+def task_event(kind, task):
+    """
+    Формирует событие задачи.
+
+    Args:
+        kind (str): created, updated или deleted
+        task (Task): Задача
+
+    Returns:
+        dict: Событие
+    """
+    return {
+        "type": f"task.{kind}",
+        "id": task.pk,
+        "issue_id": task.issue_id,
+        "project_id": task.project_id,
+        "creator_id": task.creator_id,
+        "at": timezone.now().isoformat(),
+    }
+
+
+def comment_event(kind, comment):
+    """
+    Формирует событие комментария.
+
+    Args:
+        kind (str): created или deleted
+        comment (Comment): Комментарий
+
+    Returns:
+        dict: Событие
+    """
+    task = comment.task
+    return {
+        "type": f"comment.{kind}",
+        "id": comment.pk,
+        "task_id": task.pk,
+        "issue_id": task.issue_id,
+        "project_id": task.project_id,
+        "creator_id": task.creator_id,
+        "at": timezone.now().isoformat(),
+    }
+
+
+def publish(event):
+    """
+    Публикует событие; подписчики получат его после фиксации транзакции.
+
+    Args:
+        event (dict): Событие
+    """
+    notify(CHANNEL, json.dumps(event))
+
+
+class Subscriber:
+    """
+    Клиент потока событий.
+
+    События складываются в ограниченную очередь. Если клиент не успевает
+    их читать, очередь очищается и клиент получает событие resync,
+    после которого должен перезагрузить данные.
+
+    Args:
+        user: Пользователь
+        project_ids (set | None): Видимые проекты (None — все проекты)
+        loop: Цикл событий asyncio для ASGI-клиента, None для WSGI
+    """
+
+    def __init__(self, user, project_ids, loop=None):
+        self.user_id = user.pk
+        self.project_ids = project_ids
+        self.loop = loop
+        size = settings.TASK_EVENTS_QUEUE_SIZE
+        self.queue = asyncio.Queue(size) if loop else queue.Queue(size)
+
+    def push(self, event):
+        if self.loop is None:
+            self._put(event)
+        else:
+            self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except (asyncio.QueueFull, queue.Full):
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync"})
+
+
+class EventHub:
+    """
+    Раздаёт события из канала LISTEN подписчикам процесса.
+
+    Подписчики индексируются по проектам и пользователям, поэтому событие
+    обходит только тех, кому оно видно, а не все соединения процесса.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._global = set()
+        self._by_project = defaultdict(set)
+        self._by_user = defaultdict(set)
+        self._listener = None
+
+    def subscribe(self, subscriber):
+        with self._lock:
+            self._index(subscriber)
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = NotifyListener(
+                    [CHANNEL], self.dispatch, on_reconnect=self.resync
+                )
+                self._listener.start()
+
+    def stop(self):
+        """
+        Останавливает слушателя канала (при завершении процесса и в тестах).
+        """
+        with self._lock:
+            listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.stop()
+            listener.join()
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._unindex(subscriber)
+
+    def update_projects(self, subscriber, project_ids):
+        with self._lock:
+            self._unindex(subscriber)
+            subscriber.project_ids = project_ids
+            self._index(subscriber)
+
+    def _index(self, subscriber):
+        self._by_user[subscriber.user_id].add(subscriber)
+        if subscriber.project_ids is None:
+            self._global.add(subscriber)
+        for project_id in subscriber.project_ids or ():
+            self._by_project[project_id].add(subscriber)
+
+    def _unindex(self, subscriber):
+        self._global.discard(subscriber)
+        for index, key_set in (
+            (self._by_user, [subscriber.user_id]),
+            (self._by_project, subscriber.project_ids or ()),
+        ):
+            for key in key_set:
+                index[key].discard(subscriber)
+                if not index[key]:
+                    del index[key]
+
+    def recipients(self, event):
+        with self._lock:
+            result = set(self._global)
+            result.update(self._by_project.get(event.get("project_id"), ()))
+            result.update(self._by_user.get(event.get("creator_id"), ()))
+        return result
+
+    def dispatch(self, channel, payload):
+        event = json.loads(payload)
+        for subscriber in self.recipients(event):
+            subscriber.push(event)
+
+    def resync(self):
+        """
+        Просит всех клиентов перезагрузить данные после разрыва LISTEN.
+        """
+        with self._lock:
+            subscribers = set().union(*self._by_user.values())
+        for subscriber in subscribers:
+            subscriber.push({"type": "resync"})
+
+
+hub = EventHub()
+
+
+def visible_project_ids(user):
+    """
+    Возвращает проекты, события которых видны пользователю.
+
+    Список хранится в кэше и удаляется шиной инвалидации (config/invalidation.py)
+    при изменении состава участников, удалении проекта и изменении
+    пользователя.
+
+    Args:
+        user: Пользователь
+
+    Returns:
+        set | None: Идентификаторы проектов или None для администраторов
+    """
+    if user.is_superuser or user.is_staff:
+        return None
+    project_ids = cache.get_or_set(
+        membership_key(user.pk),
+        lambda: list(Project.objects.filter(members=user).values_list("id", flat=True)),
+    )
+    return set(project_ids)
+
+
+def sign_stream_ticket(user):
+    """
+    Создаёт подписанный билет подключения к потоку событий.
+
+    Args:
+        user: Пользователь, которому выдаётся билет
+
+    Returns:
+        str: Билет, действующий TASK_EVENTS_TICKET_MAX_AGE секунд
+    """
+    return signing.dumps({"u": user.pk}, salt=TICKET_SALT)
+
+
+def _authenticate(request):
+    """
+    Аутентифицирует клиента по билету из параметра ticket или JWT из заголовка.
+    """
+    ticket = request.GET.get("ticket")
+    if ticket:
+        try:
+            payload = signing.loads(
+                ticket,
+                salt=TICKET_SALT,
+                max_age=settings.TASK_EVENTS_TICKET_MAX_AGE,
+            )
+        except signing.BadSignature:
+            return None
+        return User.objects.filter(pk=payload.get("u"), is_active=True).first()
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except Exception:
+        return None
+    return result[0] if result else None
+
+
+class EventTicketView(APIView):
+    """
+    POST /api/tasks/events/ticket/ — билет для подключения к потоку событий.
+    """
+
+    def post(self, request):
+        """
+        Выдаёт билет текущему пользователю.
+
+        Args:
+            request: HTTP запрос с JWT в заголовке
+
+        Returns:
+            Response: Билет и срок его действия в секундах
+        """
+        return Response(
+            {
+                "ticket": sign_stream_ticket(request.user),
+                "expires_in": settings.TASK_EVENTS_TICKET_MAX_AGE,
+            }
+        )
+
+
+def format_event(event):
+    """
+    Форматирует событие в формате text/event-stream.
+    """
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+def _stream_sync(subscriber):
+    heartbeat = settings.TASK_EVENTS_HEARTBEAT_SECONDS
+    hub.subscribe(subscriber)
+    try:
+        yield f"retry: {settings.TASK_EVENTS_RETRY_MILLISECONDS}\n\n"
+        while True:
+            try:
+                yield format_event(subscriber.queue.get(timeout=heartbeat))
+            except queue.Empty:
+                yield ": ping\n\n"
+    finally:
+        hub.unsubscribe(subscriber)
+
+
+async def _stream_async(subscriber, user):
+    heartbeat = settings.TASK_EVENTS_HEARTBEAT_SECONDS
+    refresh = settings.TASK_EVENTS_PROJECTS_REFRESH_SECONDS
+    loop = asyncio.get_running_loop()
+    refreshed_at = loop.time()
+    hub.subscribe(subscriber)
+    try:
+        yield f"retry: {settings.TASK_EVENTS_RETRY_MILLISECONDS}\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                if loop.time() - refreshed_at > refresh:
+                    # Состав проектов пользователя мог измениться
+                    project_ids = await sync_to_async(visible_project_ids)(user)
+                    hub.update_projects(subscriber, project_ids)
+                    refreshed_at = loop.time()
+                continue
+            yield format_event(event)
+    finally:
+        hub.unsubscribe(subscriber)
+
+
+@require_GET
+async def task_events(request):
+    """
+    Поток событий задач и комментариев видимых пользователю проектов.
+
+    События: task.created, task.updated, task.deleted, comment.created,
+    comment.deleted и resync (клиенту нужно перезагрузить данные).
+    """
+    user = await sync_to_async(_authenticate)(request)
+    if user is None or not user.is_active:
+        return JsonResponse(
+            {"detail": "Учетные данные не были предоставлены."}, status=401
+        )
+    project_ids = await sync_to_async(visible_project_ids)(user)
+    if isinstance(request, ASGIRequest):
+        loop = asyncio.get_running_loop()
+        stream = _stream_async(Subscriber(user, project_ids, loop), user)
+    else:
+        stream = _stream_sync(Subscriber(user, project_ids))
+    response = StreamingHttpResponse(stream, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
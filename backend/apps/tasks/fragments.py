@@ -0,0 +1,169 @@
+"""
+Кэш сериализованных задач (фрагментов) для списков.
+
+Большинство задач не меняется между запросами списка, поэтому представление
+задачи хранится в кэше (TASK_FRAGMENT_CACHE, алиас из CACHES) и собирается
+в ответ без повторной сериализации. Список читается одним запросом по
+столбцам ключа, фрагменты — одним get_many, сериализуются только промахи.
+
+Ключ фрагмента включает:
+- ID, updated_at и change_xid задачи, а также счётчик комментариев,
+  время активности и внешние ключи: change_xid меняется при любой записи
+  задачи, в том числе атомарными UPDATE без updated_at
+- версию представления: REPRESENTATION_VERSION и форму TaskSerializer
+- cache_version проекта, создателя и исполнителя: версия пользователя
+  увеличивается при его изменении и изменении его должности, версия
+  проекта — при изменении проекта, состава участников и любого участника
+- хост запроса (абсолютные URL файлов) и часовой пояс
+
+Версии хранятся в строках проектов и пользователей и меняются UPDATE
+в той же транзакции, что и данные, поэтому устаревшие фрагменты перестают
+читаться во всех процессах сразу и не требуют явного удаления.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import models
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from config.identity import serializer_shape
+
+from .models import Project, Task
+
+User = get_user_model()
+
+# Увеличивается при изменении представления, не видном по форме сериализатора
+REPRESENTATION_VERSION = 1
+
+CACHE_PREFIX = "tasks:fragment"
+
+KEY_COLUMNS = (
+    "id",
+    "updated_at",
+    "change_xid",
+    "comment_count",
+    "last_activity_at",
+    "status",
+    "priority",
+    "creator",
+    "assignee",
+    "project",
+    "creator__cache_version",
+    "assignee__cache_version",
+    "project__cache_version",
+)
+
+
+def _digest(value):
+    return hashlib.md5(repr(value).encode()).hexdigest()
+
+
+def bump_cache_versions(user_ids=(), project_ids=()):
+    """
+    Увеличивает версии пользователей и проектов, делая устаревшими
+    фрагменты задач, в которых они встречаются.
+
+    Вместе с пользователями увеличиваются версии проектов, в которых они
+    участвуют: участники входят во фрагмент задачи через проект.
+
+    Args:
+        user_ids (Iterable | QuerySet): ID пользователей
+        project_ids (Iterable | QuerySet): ID проектов
+    """
+    bump = {"cache_version": models.F("cache_version") + 1}
+    rosters = Project.members.through.objects.filter(user_id__in=user_ids)
+    User.all_objects.filter(pk__in=user_ids).update(**bump)
+    Project.all_objects.filter(
+        models.Q(pk__in=project_ids) | models.Q(pk__in=rosters.values("project_id"))
+    ).update(**bump)
+
+
+class TaskFragmentCache:
+    """
+    Сериализатор списка задач с кэшем фрагментов.
+
+    Оборачивает CompiledSerializer: промахи сериализуются им (или обычным
+    TaskSerializer, если компиляция недоступна) и сохраняются в кэш.
+    Выборки других моделей (ArchivedTask) передаются без кэша.
+    """
+
+    def __init__(self, compiled):
+        self.compiled = compiled
+
+    @cached_property
+    def representation(self):
+        shape = serializer_shape(self.compiled.serializer_class())
+        return _digest((REPRESENTATION_VERSION, shape))
+
+    def key_prefix(self, context):
+        request = context.get("request")
+        host = request.build_absolute_uri("/") if request is not None else ""
+        scope = f"{self.representation}:{host}:{timezone.get_current_timezone_name()}"
+        return f"{CACHE_PREFIX}:{_digest(scope)}"
+
+    def cacheable(self, fragment):
+        """
+        Проверяет, можно ли сохранить фрагмент в кэш.
+
+        Уменьшенные копии аватара создаются в фоне после сохранения
+        пользователя без изменения его версии, поэтому фрагмент
+        с неполным набором копий не кэшируется.
+        """
+        sizes = len(settings.THUMBNAIL_SIZES["avatar"])
+        project = fragment.get("project") or {}
+        users = [fragment.get("creator"), fragment.get("assignee")]
+        for user in users + list(project.get("members", [])):
+            if user and user.get("avatar") and len(user["avatar_urls"]) < sizes:
+                return False
+        return True
+
+    def serialize(self, queryset, context):
+        """
+        Сериализует задачи, беря неизменившиеся из кэша фрагментов.
+
+        Args:
+            queryset (QuerySet): Выборка задач
+            context (dict): Контекст сериализатора
+
+        Returns:
+            list | None: Данные ответа или None, если быстрый путь недоступен
+        """
+        alias = settings.TASK_FRAGMENT_CACHE
+        if not alias or not isinstance(queryset, models.QuerySet):
+            return self.compiled.serialize(queryset, context)
+        if queryset.model is not Task:
+            return self.compiled.serialize(queryset, context)
+        cache = caches[alias]
+        prefix = self.key_prefix(context)
+        keys = [
+            (row[0], f"{prefix}:{row[0]}:{_digest(row)}")
+            for row in queryset.prefetch_related(None).values_list(*KEY_COLUMNS)
+        ]
+        found = cache.get_many([key for _, key in keys])
+        missing = {pk: key for pk, key in keys if key not in found}
+        fresh = {}
+        if missing:
+            misses = Task.objects.filter(pk__in=list(missing))
+            data = self.compiled.serialize(misses, context)
+            if data is None:
+                data = self.compiled.serializer_class(
+                    misses, many=True, context=context
+                ).data
+            fresh = {item["id"]: item for item in data}
+            cache.set_many(
+                {
+                    missing[pk]: item
+                    for pk, item in fresh.items()
+                    if pk in missing and self.cacheable(item)
+                }
+            )
+        result = []
+        for pk, key in keys:
+            item = found.get(key) or fresh.get(pk)
+            if item is not None:
+                result.append(item)
+        return result
@@ -0,0 +1,287 @@
+"""
+Журнал изменений задач и комментариев.
+
+Снимок отслеживаемых полей запоминается при загрузке объекта (post_init),
+а при сохранении разница со снимком считается в Python и записывается
+одной строкой TaskChange в той же транзакции. Автор изменения берётся
+из контекста запроса (HistoryActorMixin).
+
+Таблица журнала секционирована по месяцам: запросы по задаче или проекту
+за период читают индексы (task_id, at) и (project_id, at) только нужных
+секций, а старые секции удаляются целиком без DELETE. Секции создаются
+заранее фоновой задачей, строки вне созданных секций попадают в секцию
+по умолчанию.
+"""
+
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+
+from .models import TaskChange
+from .partitions import (
+    default_partition,
+    detach_partitions,
+    ensure_partitions,
+    month_start,
+)
+
+TABLE = TaskChange._meta.db_table
+
+TASK_FIELDS = (
+    "title",
+    "description",
+    "status",
+    "priority",
+    "assignee",
+    "project",
+    "due_date",
+)
+COMMENT_FIELDS = ("text", "attachment")
+
+_actor = ContextVar("task_history_actor", default=None)
+
+
+def _attnames(model, fields):
+    return {name: model._meta.get_field(name).attname for name in fields}
+
+
+def snapshot(instance, fields):
+    """
+    Запоминает значения отслеживаемых полей загруженного объекта.
+
+    Отложенные (не загруженные) поля пропускаются и в разнице не участвуют.
+
+    Args:
+        instance: Объект модели
+        fields (tuple): Имена отслеживаемых полей
+
+    Returns:
+        dict: Поле -> значение
+    """
+    values = instance.__dict__
+    result = {}
+    for name, attname in _attnames(type(instance), fields).items():
+        if attname in values:
+            value = values[attname]
+            # FieldFile хранит только имя файла
+            result[name] = value.name if hasattr(value, "name") else value
+    return result
+
+
+def diff(previous, current):
+    """
+    Сравнивает два снимка полей.
+
+    Args:
+        previous (dict): Снимок до сохранения
+        current (dict): Снимок после сохранения
+
+    Returns:
+        dict: Поле -> [было, стало] для изменившихся полей
+    """
+    return {
+        name: [previous[name], value]
+        for name, value in current.items()
+        if name in previous and previous[name] != value
+    }
+
+
+def set_actor(user):
+    """
+    Устанавливает автора изменений для текущего контекста.
+
+    Args:
+        user: Пользователь запроса
+
+    Returns:
+        Token: Токен для восстановления прежнего значения (reset_actor)
+    """
+    return _actor.set(user.pk if user is not None and user.is_authenticated else None)
+
+
+def reset_actor(token):
+    _actor.reset(token)
+
+
+def record_change(action, task_id, project_id, changes, comment_id=None, actor_id=None):
+    """
+    Добавляет запись в журнал изменений.
+
+    Args:
+        action (str): TaskChange.Action
+        task_id (int): ID задачи
+        project_id (int): ID проекта
+        changes (dict): Поле -> [было, стало]
+        comment_id (int): ID комментария
+        actor_id (int): ID автора (по умолчанию из контекста запроса)
+
+    Returns:
+        TaskChange: Созданная запись
+    """
+    return TaskChange.objects.create(
+        action=action,
+        task_id=task_id,
+        project_id=project_id,
+        comment_id=comment_id,
+        actor_id=_actor.get() or actor_id,
+        changes=changes,
+    )
+
+
+def record_table_changes(task_ids, table, action):
+    """
+    Добавляет в журнал по записи без изменённых полей для каждой задачи таблицы.
+
+    Используется при переносе и удалении задач запросами без сигналов.
+
+    Args:
+        task_ids (list): ID задач
+        table (str): Таблица, в которой сейчас находятся задачи
+        action (str): TaskChange.Action
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {TABLE} (at, task_id, project_id, actor_id, action, changes) "
+            f"SELECT clock_timestamp(), id, project_id, %s, %s, '{{}}' FROM {table} "
+            "WHERE id = ANY(%s)",
+            [_actor.get(), action, task_ids],
+        )
+
+
+class HistoryActorMixin:
+    """
+    Примесь ViewSet, делающая пользователя запроса автором изменений.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._history_actor_token = set_actor(request.user)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, "_history_actor_token", None)
+        if token is not None:
+            reset_actor(token)
+            self._history_actor_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class HistoryPagination(CursorPagination):
+    """
+    Постраничная выдача журнала от новых записей к старым.
+
+    Курсор по времени превращается в условие at < значение, поэтому каждая
+    страница читает индекс (task_id, at) или (project_id, at) только
+    в нужных секциях, независимо от глубины листания.
+    """
+
+    ordering = ("-at", "-id")
+    page_size = settings.TASK_HISTORY_PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+
+def filter_history(queryset, params):
+    """
+    Применяет к журналу параметры запроса.
+
+    Параметры:
+    - since, until — границы периода (ISO 8601)
+    - field — только записи, изменившие поле (например, status)
+    - action — тип изменения (created, updated, deleted)
+
+    Args:
+        queryset (QuerySet): Записи TaskChange
+        params (QueryDict): Параметры запроса
+
+    Returns:
+        QuerySet: Отфильтрованные записи
+
+    Raises:
+        ValidationError: Если дата не распознана
+    """
+    for param, lookup in (("since", "at__gte"), ("until", "at__lt")):
+        value = params.get(param)
+        if value:
+            moment = parse_datetime(value)
+            if moment is None:
+                raise ValidationError({param: "Ожидается дата и время в ISO 8601"})
+            if timezone.is_naive(moment):
+                moment = timezone.make_aware(moment)
+            queryset = queryset.filter(**{lookup: moment})
+    if params.get("field"):
+        queryset = queryset.filter(changes__has_key=params["field"])
+    if params.get("action"):
+        queryset = queryset.filter(action=params["action"])
+    return queryset
+
+
+def ensure_history_table():
+    """
+    Создаёт секционированную таблицу журнала, её индексы и секцию по умолчанию.
+
+    Вызывается после миграций приложения tasks (post_migrate).
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {TABLE} ("
+            "id bigserial NOT NULL, "
+            "at timestamptz NOT NULL DEFAULT now(), "
+            "task_id bigint NOT NULL, "
+            "project_id bigint NOT NULL, "
+            "comment_id bigint NULL, "
+            "actor_id bigint NULL, "
+            "action varchar(16) NOT NULL, "
+            "changes jsonb NOT NULL, "
+            "PRIMARY KEY (id, at)"
+            ") PARTITION BY RANGE (at)"
+        )
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {TABLE}_task_idx ON {TABLE} (task_id, at)"
+        )
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {TABLE}_project_idx "
+            f"ON {TABLE} (project_id, at)"
+        )
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {default_partition(TABLE)} "
+            f"PARTITION OF {TABLE} DEFAULT"
+        )
+    ensure_history_partitions()
+
+
+def ensure_history_partitions(months_ahead=None):
+    """
+    Создаёт секции журнала с текущего месяца на months_ahead месяцев вперёд.
+
+    Args:
+        months_ahead (int): Количество месяцев вперёд
+
+    Returns:
+        list: Имена созданных секций
+    """
+    if months_ahead is None:
+        months_ahead = settings.TASK_HISTORY_PARTITIONS_AHEAD
+    return ensure_partitions(TABLE, "at", months_ahead)
+
+
+def drop_history_partitions(retention_months=None):
+    """
+    Удаляет секции журнала старше срока хранения.
+
+    Args:
+        retention_months (int): Срок хранения в месяцах (0 — хранить всё)
+
+    Returns:
+        list: Имена удалённых секций
+    """
+    if retention_months is None:
+        retention_months = settings.TASK_HISTORY_RETENTION_MONTHS
+    if not retention_months:
+        return []
+    oldest = month_start(timezone.localdate(), -retention_months)
+    return detach_partitions(TABLE, oldest, drop=True)
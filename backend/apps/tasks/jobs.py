@@ -0,0 +1,110 @@
+"""
+Фоновые задачи приложения tasks.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from ..jobs.models import Job
+from ..jobs.queue import job
+from .archive import archive_closed_tasks
+from .deletion import purge_batches
+from .history import drop_history_partitions, ensure_history_partitions
+from .models import Comment, PendingDeletion
+from .partitions import ensure_partitions, is_partitioned
+from .summary import reconcile_all_summaries, reconcile_project_summary
+
+
+@job(queue="default", every=settings.TASK_SUMMARY_RECONCILE_SECONDS)
+def reconcile_task_summaries():
+    """
+    Периодически сверяет сводки задач всех проектов.
+    """
+    return reconcile_all_summaries()
+
+
+@job(queue="default", priority=5)
+def reconcile_project_summaries(project_ids):
+    """
+    Сверяет сводки задач указанных проектов.
+
+    Args:
+        project_ids (list): ID проектов
+    """
+    return sum(reconcile_project_summary(pk) for pk in project_ids)
+
+
+@job(queue="default", every=24 * 3600)
+def maintain_partitions():
+    """
+    Создаёт секции журнала изменений и комментариев на следующие месяцы
+    и удаляет устаревшие секции журнала.
+    """
+    created = ensure_history_partitions()
+    table = Comment._meta.db_table
+    if is_partitioned(table):
+        created += ensure_partitions(
+            table, "created_at", settings.COMMENT_PARTITIONS_AHEAD
+        )
+    return {"created": created, "dropped": drop_history_partitions()}
+
+
+@job(queue="default", every=settings.TASK_ARCHIVE_INTERVAL_SECONDS)
+def archive_tasks():
+    """
+    Переносит в архив закрытые задачи, давно не менявшиеся.
+
+    Как и purge_pending_deletion, за один запуск выполняется не больше
+    TASK_ARCHIVE_BATCHES_PER_JOB пакетов; если последний пакет был полным,
+    задача ставит себя в очередь снова.
+    """
+    result = archive_closed_tasks(max_batches=settings.TASK_ARCHIVE_BATCHES_PER_JOB)
+    if result["more"]:
+        archive_tasks.delay()
+    return result
+
+
+@job(queue="default", priority=5)
+def purge_pending_deletion(pending_id):
+    """
+    Удаляет зависимые строки удаляемого проекта или пользователя.
+
+    За один запуск выполняется не больше DELETION_BATCHES_PER_JOB пакетов,
+    затем задача ставит себя в очередь снова, чтобы не занимать воркер
+    надолго и не мешать другим задачам.
+
+    Args:
+        pending_id (int): ID PendingDeletion
+    """
+    done = purge_batches(pending_id, max_batches=settings.DELETION_BATCHES_PER_JOB)
+    if not done:
+        purge_pending_deletion.delay(pending_id)
+    return {"done": done}
+
+
+@job(queue="default", every=600)
+def resume_pending_deletions():
+    """
+    Возобновляет удаления, задача которых исчерпала попытки или потерялась.
+
+    Удаления, для которых purge_pending_deletion уже ждёт в очереди или
+    выполняется, пропускаются: иначе каждый запуск добавлял бы ещё одну
+    параллельную цепочку задач.
+    """
+    stalled = PendingDeletion.objects.exclude(state=PendingDeletion.State.DONE).filter(
+        updated_at__lt=timezone.now() - timedelta(minutes=10)
+    )
+    active = {
+        args[0]
+        for args in Job.objects.filter(
+            name=purge_pending_deletion.name,
+            status__in=[Job.Status.QUEUED, Job.Status.RUNNING],
+        ).values_list("args", flat=True)
+        if args
+    }
+    ids = [pk for pk in stalled.values_list("pk", flat=True) if pk not in active]
+    for pk in ids:
+        purge_pending_deletion.delay(pk)
+    return len(ids)
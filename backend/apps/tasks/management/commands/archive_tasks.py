@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...archive import archive_closed_tasks, restore_task
+from ...models import ArchivedTask
+
+
+class Command(BaseCommand):
+    help = (
+        "Переносит в архив закрытые задачи без изменений дольше "
+        "TASK_ARCHIVE_AFTER_DAYS дней или возвращает задачу из архива.\n\n"
+        "Запуск:\n  python manage.py archive_tasks --batch-size 500\n"
+        "  python manage.py archive_tasks --restore PRJ-42\n"
+        "В Docker:\n  docker-compose exec backend python manage.py archive_tasks"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, help="Количество задач в одной транзакции"
+        )
+        parser.add_argument(
+            "--max-batches", type=int, help="Максимальное количество пакетов"
+        )
+        parser.add_argument(
+            "--restore",
+            metavar="ISSUE_ID",
+            action="append",
+            help="Вернуть задачу из архива (можно указать несколько раз)",
+        )
+
+    def handle(self, *args, **options):
+        if options["restore"]:
+            for issue_id in options["restore"]:
+                archived = ArchivedTask.objects.filter(issue_id=issue_id).first()
+                if archived is None:
+                    raise CommandError(f"Задачи {issue_id} нет в архиве")
+                restore_task(archived)
+                self.stdout.write(f"Задача {issue_id} возвращена из архива")
+            return
+        result = archive_closed_tasks(options["batch_size"], options["max_batches"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Перенесено в архив задач: {result['archived']}, "
+                f"пакетов: {result['batches']}"
+            )
+        )
@@ -0,0 +1,83 @@
+import time
+from itertools import cycle, islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from config.compression import (
+    CompressionMiddleware,
+    available_codecs,
+    compress_stream,
+)
+from config.renderers import FastJSONRenderer
+
+from ...models import Task
+from ...serializers import TaskSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает размер и время сжатия ответа со списком задач "
+        "(TaskSerializer) доступными кодировками: сжатие целиком, потоковое "
+        "по частям и сжатое тело из кэша COMPRESSION_CACHE. Задачи берутся "
+        "из базы и повторяются до нужного количества, база не изменяется.\n\n"
+        "Запуск:\n  python manage.py benchmark_compression --count 5000\n"
+        "В Docker:\n  docker-compose exec backend python manage.py benchmark_compression"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--count", type=int, default=5000, help="Количество задач в ответе"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Повторов (берётся лучшее время)"
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=64 * 1024,
+            help="Размер части при потоковом сжатии",
+        )
+
+    def measure(self, run, repeat):
+        best, result = None, None
+        for _ in range(repeat):
+            started = time.process_time()
+            result = run()
+            elapsed = time.process_time() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    def handle(self, *args, **options):
+        tasks = list(
+            Task.objects.select_related(
+                "creator__position", "assignee__position", "project"
+            ).prefetch_related("project__members__position")[: options["count"]]
+        )
+        if not tasks:
+            raise CommandError("В базе нет задач, заполните её populate_test_data")
+        data = list(
+            islice(cycle(TaskSerializer(tasks, many=True).data), options["count"])
+        )
+        body = FastJSONRenderer().render(data)
+        size = options["chunk_size"]
+        chunks = [body[start : start + size] for start in range(0, len(body), size)]
+        middleware = CompressionMiddleware(lambda request: None)
+
+        self.stdout.write(f"Задач в ответе: {len(data)}, без сжатия {len(body)} байт")
+        for codec in available_codecs():
+            whole, compressed = self.measure(
+                lambda: codec.compress(body), options["repeat"]
+            )
+            streamed, parts = self.measure(
+                lambda: b"".join(compress_stream(codec, chunks)), options["repeat"]
+            )
+            middleware.compressed_body(codec, body)
+            cached, _ = self.measure(
+                lambda: middleware.compressed_body(codec, body), options["repeat"]
+            )
+            self.stdout.write(
+                f"{codec.name:<5} целиком {len(compressed):>9} байт "
+                f"(x{len(body) / len(compressed):4.1f}) cpu {whole * 1000:7.1f} мс; "
+                f"потоком {len(parts):>9} байт cpu {streamed * 1000:7.1f} мс; "
+                f"из кэша cpu {cached * 1000:6.1f} мс"
+            )
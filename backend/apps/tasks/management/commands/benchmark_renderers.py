@@ -0,0 +1,60 @@
+import time
+from itertools import cycle, islice
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from config import renderers
+
+from ...models import Task
+from ...serializers import TaskSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает время и размер ответа рендереров API на списке задач "
+        "(TaskSerializer). Задачи берутся из базы и повторяются до нужного "
+        "количества, база не изменяется.\n\n"
+        "Запуск:\n  python manage.py benchmark_renderers --count 5000\n"
+        "В Docker:\n  docker-compose exec backend python manage.py benchmark_renderers"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--count", type=int, default=5000, help="Количество задач в ответе"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Повторов (берётся лучшее время)"
+        )
+
+    def handle(self, *args, **options):
+        tasks = list(
+            Task.objects.select_related(
+                "creator__position", "assignee__position", "project"
+            ).prefetch_related("project__members__position")[: options["count"]]
+        )
+        if not tasks:
+            raise CommandError("В базе нет задач, заполните её populate_test_data")
+        data = list(
+            islice(cycle(TaskSerializer(tasks, many=True).data), options["count"])
+        )
+
+        renderer_classes = [JSONRenderer]
+        if renderers.orjson is not None:
+            renderer_classes.append(renderers.FastJSONRenderer)
+        if renderers.msgpack is not None:
+            renderer_classes.append(renderers.MessagePackRenderer)
+
+        self.stdout.write(f"Задач в ответе: {len(data)}")
+        for renderer_class in renderer_classes:
+            renderer = renderer_class()
+            best = None
+            for _ in range(options["repeat"]):
+                started = time.perf_counter()
+                body = renderer.render(data, renderer.media_type, {})
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            self.stdout.write(
+                f"{renderer_class.__name__:<22} {best * 1000:8.1f} мс "
+                f"{len(body):>10} байт"
+            )
@@ -0,0 +1,89 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from config.compiled import CompiledSerializer
+
+from ...models import Comment, Task
+from ...serializers import TaskSerializer
+from ...serializers_comment import CommentSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает сериализацию списков задач и комментариев обычным "
+        "сериализатором DRF и скомпилированным (CompiledSerializer), без карты "
+        "идентичности и с ней (GET-запрос): время процессора, общее время "
+        "и совпадение ответа. База не изменяется.\n\n"
+        "Запуск:\n  python manage.py benchmark_serializers --count 5000\n"
+        "В Docker:\n  docker-compose exec backend python manage.py benchmark_serializers"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--count", type=int, default=5000, help="Количество строк в списке"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=3, help="Повторов (берётся лучшее время)"
+        )
+
+    def handle(self, *args, **options):
+        cases = [
+            (
+                "tasks",
+                TaskSerializer,
+                Task.objects.select_related(
+                    "creator__position",
+                    "assignee__position",
+                    "status",
+                    "priority",
+                    "project",
+                ).prefetch_related("project__members__position"),
+            ),
+            (
+                "comments",
+                CommentSerializer,
+                Comment.objects.select_related("author__position", "task"),
+            ),
+        ]
+        render = JSONRenderer().render
+        for name, serializer_class, queryset in cases:
+            ids = list(queryset.values_list("pk", flat=True)[: options["count"]])
+            if not ids:
+                raise CommandError("В базе нет данных, заполните её populate_test_data")
+            queryset = queryset.filter(pk__in=ids)
+            compiled = CompiledSerializer(serializer_class)
+            variants = {
+                "drf": lambda ctx: serializer_class(
+                    queryset.all(), many=True, context=ctx
+                ).data,
+                "compiled": lambda ctx: compiled.serialize(queryset.all(), ctx),
+            }
+            bodies = {}
+            self.stdout.write(f"{name}: {len(ids)}")
+            runs = [
+                (f"{variant}{suffix}", run, shared)
+                for variant, run in variants.items()
+                for suffix, shared in (("", False), ("+map", True))
+            ]
+            for label, run, shared in runs:
+                best_cpu = best_wall = None
+                for _ in range(options["repeat"]):
+                    # Карта идентичности живёт в запросе, новый запрос — пустая карта
+                    ctx = {"request": APIRequestFactory().get("/")} if shared else {}
+                    cpu, wall = time.process_time(), time.perf_counter()
+                    data = run(ctx)
+                    cpu = time.process_time() - cpu
+                    wall = time.perf_counter() - wall
+                    best_cpu = cpu if best_cpu is None else min(best_cpu, cpu)
+                    best_wall = wall if best_wall is None else min(best_wall, wall)
+                bodies.setdefault(shared, set()).add(render(data))
+                self.stdout.write(
+                    f"  {label:<13} cpu {best_cpu * 1000:8.1f} мс, "
+                    f"всего {best_wall * 1000:8.1f} мс"
+                )
+            if any(len(rendered) != 1 for rendered in bodies.values()):
+                raise CommandError(f"{name}: ответы различаются")
+            self.stdout.write(self.style.SUCCESS("  ответы совпадают"))
@@ -0,0 +1,82 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from ...models import Comment
+from ...storage import BLOB_PREFIX, blob_name, file_digest
+
+
+class Command(BaseCommand):
+    help = (
+        "Переносит вложения из task_attachments/ в хранилище с дедупликацией\n"
+        "и сообщает объём освобождённого места.\n\n"
+        "Запуск:\n  python manage.py dedupe_attachments [--dry-run]"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только посчитать, сколько места освободится",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Количество комментариев, загружаемых за один запрос",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        storage = Comment.attachment.field.storage
+        comments = (
+            Comment.objects.exclude(attachment="")
+            .exclude(attachment__isnull=True)
+            .exclude(attachment__startswith=BLOB_PREFIX)
+            .only("id", "attachment", "attachment_name")
+            .order_by("id")
+        )
+
+        migrated = {}
+        seen_digests = set()
+        processed = missing = reclaimed = 0
+        for comment in comments.iterator(chunk_size=options["batch_size"]):
+            old_name = comment.attachment.name
+            new_name = migrated.get(old_name)
+            if new_name is None:
+                path = storage.path(old_name)
+                if not os.path.exists(path):
+                    missing += 1
+                    self.stdout.write(
+                        self.style.WARNING(f"× Файл не найден: {old_name}")
+                    )
+                    continue
+                size = os.path.getsize(path)
+                digest = file_digest(path)
+                duplicate = digest in seen_digests or storage.exists(blob_name(digest))
+                seen_digests.add(digest)
+                if duplicate:
+                    reclaimed += size
+                if dry_run:
+                    new_name = blob_name(digest)
+                else:
+                    new_name = storage.adopt_file(path, digest, size)
+                migrated[old_name] = new_name
+
+            processed += 1
+            if dry_run:
+                continue
+            comment.attachment_name = comment.attachment_name or os.path.basename(
+                old_name
+            )
+            comment.attachment.name = new_name
+            comment.save(update_fields=["attachment", "attachment_name"])
+
+        prefix = "[dry-run] " if dry_run else ""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefix}Обработано вложений: {processed}, уникальных файлов: "
+                f"{len(seen_digests)}, не найдено: {missing}, "
+                f"освобождено: {reclaimed} байт ({reclaimed / 1048576:.1f} МБ)"
+            )
+        )
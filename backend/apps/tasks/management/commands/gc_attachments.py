@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from ...storage import collect_garbage
+
+
+class Command(BaseCommand):
+    help = (
+        "Удаляет блобы вложений, на которые не осталось ссылок.\n\n"
+        "Запуск:\n  python manage.py gc_attachments --grace-hours 24"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-hours",
+            type=int,
+            default=None,
+            help="Период ожидания (по умолчанию ATTACHMENT_BLOB_GC_GRACE_HOURS)",
+        )
+
+    def handle(self, *args, **options):
+        grace = options["grace_hours"]
+        stats = collect_garbage(None if grace is None else timedelta(hours=grace))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Удалено блобов: {stats['deleted']}, "
+                f"освобождено: {stats['reclaimed_bytes']} байт"
+            )
+        )
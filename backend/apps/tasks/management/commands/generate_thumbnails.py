@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from config.thumbnails import generate_thumbnails, is_image_name
+
+from ...models import Comment
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Создаёт недостающие уменьшенные копии аватаров и изображений-вложений.\n\n"
+        "Запуск:\n  python manage.py generate_thumbnails"
+    )
+
+    def handle(self, *args, **options):
+        pending = []
+        users = User.objects.exclude(avatar="").exclude(avatar__isnull=True)
+        for user in users.only("id", "avatar").iterator():
+            pending.append(
+                generate_thumbnails(
+                    user.avatar.storage,
+                    user.avatar.name,
+                    settings.THUMBNAIL_SIZES["avatar"],
+                )
+            )
+
+        comments = (
+            Comment.objects.exclude(attachment="")
+            .exclude(attachment__isnull=True)
+            .only("id", "attachment", "attachment_name")
+        )
+        seen = set()
+        for comment in comments.iterator():
+            name = comment.attachment.name
+            if name in seen or not is_image_name(comment.attachment_name or name):
+                continue
+            seen.add(name)
+            pending.append(
+                generate_thumbnails(
+                    comment.attachment.storage,
+                    name,
+                    settings.THUMBNAIL_SIZES["preview"],
+                )
+            )
+
+        created = 0
+        for result in pending:
+            try:
+                if hasattr(result, "result"):
+                    result = result.result()
+            except Exception as exc:
+                self.stdout.write(self.style.WARNING(f"× {exc}"))
+                continue
+            created += len(result or [])
+        self.stdout.write(self.style.SUCCESS(f"Создано уменьшенных копий: {created}"))
@@ -0,0 +1,115 @@
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from ...models import (
+    Comment,
+    CurrentTransactionId,
+    Task,
+    Tombstone,
+    recount_comment_stats,
+)
+from ...partitions import (
+    detach_partition,
+    ensure_partitions,
+    is_partitioned,
+    partition_table,
+    partitions_before,
+)
+from ...storage import change_ref_count
+
+RECOUNT_BATCH_SIZE = 2000
+
+
+class Command(BaseCommand):
+    help = (
+        "Создаёт месячные секции таблицы комментариев, преобразует обычную "
+        "таблицу в секционированную (--convert) и отключает старые секции "
+        "для архивации (--detach-before).\n\n"
+        "Отключённая секция остаётся отдельной таблицей tasks_comment_pГГГГ_ММ: "
+        "её можно выгрузить (pg_dump -t) и удалить. В той же транзакции "
+        "освобождаются ссылки на блобы вложений, записываются удаления "
+        "комментариев для синхронизации и пересчитываются счётчики "
+        "комментариев затронутых задач.\n\n"
+        "Запуск:\n  python manage.py partition_comments --detach-before 2024-01\n"
+        "В Docker:\n  docker-compose exec backend python manage.py partition_comments"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=settings.COMMENT_PARTITIONS_AHEAD,
+            help="Сколько месяцев вперёд создать секции",
+        )
+        parser.add_argument(
+            "--convert",
+            action="store_true",
+            help="Секционировать существующую таблицу (блокирует её на время копирования)",
+        )
+        parser.add_argument(
+            "--detach-before",
+            metavar="ГГГГ-ММ",
+            help="Отключить секции месяцев раньше указанного",
+        )
+
+    def handle(self, *args, **options):
+        table = Comment._meta.db_table
+        if not is_partitioned(table):
+            if not options["convert"]:
+                raise CommandError(
+                    f"Таблица {table} не секционирована, запустите команду с --convert"
+                )
+            moved = partition_table(table, "created_at", options["months_ahead"])
+            self.stdout.write(f"Таблица секционирована, перенесено строк: {moved}")
+
+        created = ensure_partitions(table, "created_at", options["months_ahead"])
+        self.stdout.write(f"Создано секций: {len(created)}")
+
+        if options["detach_before"]:
+            try:
+                before = datetime.strptime(options["detach_before"], "%Y-%m").date()
+            except ValueError:
+                raise CommandError("Месяц указывается в формате ГГГГ-ММ")
+            for name in partitions_before(table, before):
+                task_ids = self.detach(table, name)
+                self.stdout.write(f"Отключена секция {name}, задач: {len(task_ids)}")
+
+        self.stdout.write(self.style.SUCCESS("Готово"))
+
+    def detach(self, table, name):
+        """
+        Отключает секцию комментариев и обновляет связанные с ними данные.
+
+        Всё выполняется в одной транзакции: при ошибке секция остаётся
+        подключённой, а счётчики ссылок, записи об удалении и счётчики
+        комментариев не меняются. Файлы вне хранилища блобов остаются
+        на месте вместе с выгружаемой таблицей секции.
+
+        Returns:
+            list: ID задач, комментарии которых были в секции
+        """
+        with transaction.atomic():
+            detach_partition(table, name)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT attachment, COUNT(*) FROM {name} "
+                    "WHERE attachment <> '' GROUP BY attachment"
+                )
+                for attachment, count in cursor.fetchall():
+                    change_ref_count(attachment, -count)
+                cursor.execute(
+                    f"INSERT INTO {Tombstone._meta.db_table} (kind, object_id, "
+                    "task_id, project_id, creator_id, deleted_xid, deleted_at) "
+                    "SELECT %s, c.id, c.task_id, t.project_id, t.creator_id, "
+                    f"{CurrentTransactionId.template}, now() FROM {name} c "
+                    f"JOIN {Task._meta.db_table} t ON t.id = c.task_id",
+                    [Tombstone.Kind.COMMENT],
+                )
+                cursor.execute(f"SELECT DISTINCT task_id FROM {name}")
+                task_ids = [row[0] for row in cursor.fetchall()]
+            for start in range(0, len(task_ids), RECOUNT_BATCH_SIZE):
+                recount_comment_stats(task_ids[start : start + RECOUNT_BATCH_SIZE])
+        return task_ids
@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from ...uploads import purge_stale_uploads
+
+
+class Command(BaseCommand):
+    help = (
+        "Удаляет незавершённые загрузки вложений, в которые давно не поступали данные.\n\n"
+        "Запуск:\n  python manage.py purge_stale_uploads --hours 24"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours",
+            type=int,
+            default=None,
+            help="Время простоя в часах (по умолчанию ATTACHMENT_UPLOAD_EXPIRE_HOURS)",
+        )
+
+    def handle(self, *args, **options):
+        max_age = timedelta(hours=options["hours"]) if options["hours"] else None
+        count = purge_stale_uploads(max_age)
+        self.stdout.write(self.style.SUCCESS(f"Удалено загрузок: {count}"))
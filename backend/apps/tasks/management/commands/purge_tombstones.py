@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ...sync import purge_tombstones
+
+
+class Command(BaseCommand):
+    help = (
+        "Удаляет записи об удалённых задачах и комментариях старше срока хранения "
+        "(SYNC_TOMBSTONE_RETENTION_DAYS).\n\n"
+        "Запуск:\n  python manage.py purge_tombstones\n"
+        "В Docker:\n  docker-compose exec backend python manage.py purge_tombstones"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help="Срок хранения в днях",
+        )
+
+    def handle(self, *args, **options):
+        days = options["days"] or settings.SYNC_TOMBSTONE_RETENTION_DAYS
+        deleted = purge_tombstones(timedelta(days=days))
+        self.stdout.write(self.style.SUCCESS(f"Удалено записей: {deleted}"))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from ...summary import reconcile_all_summaries, reconcile_project_summary
+
+
+class Command(BaseCommand):
+    help = (
+        "Сверяет сводку задач проектов (ProjectTaskSummary) с задачами "
+        "и исправляет разошедшиеся счётчики.\n\n"
+        "Запуск:\n  python manage.py reconcile_task_summary --project 1\n"
+        "В Docker:\n  docker-compose exec backend python manage.py reconcile_task_summary"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--project",
+            type=int,
+            action="append",
+            help="ID проекта (можно указать несколько раз, по умолчанию все)",
+        )
+
+    def handle(self, *args, **options):
+        if options["project"]:
+            fixed = sum(reconcile_project_summary(pk) for pk in options["project"])
+            checked = len(options["project"])
+        else:
+            result = reconcile_all_summaries()
+            checked, fixed = result["projects"], result["fixed_buckets"]
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Проверено проектов: {checked}, исправлено корзин: {fixed}"
+            )
+        )
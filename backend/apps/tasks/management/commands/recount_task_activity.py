@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from ...models import Task, recount_comment_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает comment_count и last_activity_at задач по комментариям "
+        "и исправляет разошедшиеся значения.\n\n"
+        "Запуск:\n  python manage.py recount_task_activity --batch-size 2000\n"
+        "В Docker:\n  docker-compose exec backend python manage.py recount_task_activity"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Количество задач в одной транзакции",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        ids = Task.objects.order_by("pk").values_list("pk", flat=True)
+        last_id = 0
+        checked = fixed = 0
+        while True:
+            batch = list(ids.filter(pk__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            fixed += recount_comment_stats(batch)
+            checked += len(batch)
+            last_id = batch[-1]
+        self.stdout.write(
+            self.style.SUCCESS(f"Проверено задач: {checked}, исправлено: {fixed}")
+        )
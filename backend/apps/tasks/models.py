@@ -1,5 +1,50 @@
+import os
+import uuid
+
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .storage import attachment_storage
+
+
+class CurrentTransactionId(models.Func):
+    """
+    Идентификатор текущей транзакции Postgres (pg_current_xact_id).
+
+    Записывается в строку тем же запросом, что и изменение, и служит
+    курсором синхронизации изменений (см. sync.py).
+    """
+
+    template = "pg_current_xact_id()::text::bigint"
+    output_field = models.BigIntegerField()
+
+
+def _stamp_change(instance, kwargs):
+    """
+    Отмечает строку идентификатором транзакции при сохранении.
+    """
+    instance.change_xid = CurrentTransactionId()
+    update_fields = kwargs.get("update_fields")
+    if update_fields is not None:
+        kwargs["update_fields"] = {*update_fields, "change_xid"}
+
+
+def _forget_change(instance):
+    # После сохранения в атрибуте осталось выражение: значение загрузится из БД
+    # при первом обращении
+    instance.__dict__.pop("change_xid", None)
+
+
+class ProjectManager(models.Manager):
+    """
+    Менеджер проектов, скрывающий проекты, ожидающие удаления.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleting_at__isnull=True)
 
 
 class Project(models.Model):
@@ -9,6 +54,10 @@ class Project(models.Model):
     Проект представляет собой контейнер для группировки связанных задач.
     Каждый проект имеет уникальное имя и код, а также может содержать
     множество участников (пользователей).
+
+    Удаляемый проект отмечается deleting_at и скрывается менеджером objects,
+    а его задачи удаляются в фоне (см. deletion.py). Менеджер all_objects
+    возвращает все проекты.
     """
 
     name = models.CharField(
@@ -34,6 +83,26 @@ class Project(models.Model):
         blank=True,
         help_text="Участники проекта",
     )
+    tasks_version = models.PositiveBigIntegerField(
+        default=0,
+        editable=False,
+        help_text="Версия данных задач проекта (ключ кэша статистики)",
+    )
+    cache_version = models.PositiveBigIntegerField(
+        default=0,
+        editable=False,
+        help_text="Версия проекта и состава участников (ключ кэша фрагментов задач)",
+    )
+    deleting_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True,
+        help_text="Время запроса удаления (проект скрыт и удаляется в фоне)",
+    )
+
+    objects = ProjectManager()
+    all_objects = models.Manager()
 
     class Meta:
         verbose_name = "Проект"
@@ -47,11 +116,36 @@ class Project(models.Model):
         """
         Переопределение метода save для автоматического преобразования
         кода проекта в верхний регистр при сохранении.
+
+        Версии и отметка удаления меняются только атомарным UPDATE
+        (bump_tasks_version, bump_cache_versions, request_deletion), поэтому
+        при обновлении проекта они не перезаписываются значениями из памяти.
         """
         if self.code:
             self.code = self.code.upper()
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in ("tasks_version", "cache_version", "deleting_at")
+            ]
         super().save(*args, **kwargs)
 
+    @classmethod
+    def bump_tasks_version(cls, *project_ids):
+        """
+        Увеличивает версию задач проектов, делая кэш их статистики устаревшим.
+
+        Args:
+            *project_ids (int): ID проектов
+        """
+        ids = {pk for pk in project_ids if pk}
+        if ids:
+            cls.all_objects.filter(pk__in=ids).update(
+                tasks_version=models.F("tasks_version") + 1
+            )
+
 
 class Status(models.Model):
     """
@@ -104,6 +198,8 @@ class Task(models.Model):
     пользователем и может быть назначена другому пользователю.
     """
 
+    archived = False
+
     issue_id = models.CharField(
         max_length=32,
         unique=True,
@@ -158,24 +254,75 @@ class Task(models.Model):
         related_name="tasks",
         help_text="Приоритет задачи",
     )
+    closed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Дата и время перевода задачи в закрытый статус",
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0, editable=False, help_text="Количество комментариев к задаче"
+    )
+    last_activity_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Дата и время последнего изменения задачи или комментария",
+    )
+    change_xid = models.BigIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True,
+        help_text="Транзакция последнего изменения (курсор синхронизации)",
+    )
 
     class Meta:
         verbose_name = "Задача"
         verbose_name_plural = "Задачи"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["-last_activity_at"], name="tasks_task_activity_idx"),
+            models.Index(
+                fields=["project", "status", "priority", "assignee"],
+                name="tasks_task_buckets_idx",
+            ),
+            models.Index(
+                fields=["project", "created_at"], name="tasks_task_created_idx"
+            ),
+            models.Index(fields=["project", "closed_at"], name="tasks_task_closed_idx"),
+            models.Index(fields=["-comment_count"], name="tasks_task_comments_idx"),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.status.name})"
 
+    def refresh_from_db(self, *args, **kwargs):
+        """
+        Перечитывает поля из базы и обновляет запомненные сигналами
+        post_init значения (сводка, журнал изменений, учёт вложений).
+        """
+        super().refresh_from_db(*args, **kwargs)
+        models.signals.post_init.send(sender=type(self), instance=self)
+
     def save(self, *args, **kwargs):
         """
         Переопределение метода save для автоматической генерации
-        уникального идентификатора задачи при создании.
+        уникального идентификатора задачи при создании, обновления
+        времени последней активности и времени закрытия.
         """
         if not self.issue_id:
             project_code = self.project.code
-            last_task = (
-                Task.objects.filter(project=self.project).order_by("-id").first()
+            # Номера задач из архива не выдаются повторно
+            last_task = max(
+                (
+                    model.objects.filter(project=self.project)
+                    .order_by("-id")
+                    .only("id", "issue_id")
+                    .first()
+                    for model in (Task, ArchivedTask)
+                ),
+                key=lambda task: task.pk if task else 0,
             )
             if last_task and last_task.issue_id and "-" in last_task.issue_id:
                 try:
@@ -185,7 +332,55 @@ class Task(models.Model):
             else:
                 last_number = 0
             self.issue_id = f"{project_code}-{last_number + 1}"
+        self.last_activity_at = timezone.now()
+        if self.status_id in settings.TASK_CLOSED_STATUS_IDS:
+            self.closed_at = self.closed_at or self.last_activity_at
+        else:
+            self.closed_at = None
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "last_activity_at", "closed_at"}
+        _stamp_change(self, kwargs)
         super().save(*args, **kwargs)
+        _forget_change(self)
+
+
+class AttachmentBlob(models.Model):
+    """
+    Модель блоба в хранилище вложений с дедупликацией.
+
+    Каждое уникальное содержимое хранится один раз под своим хэшем SHA-256.
+    Счётчик ref_count показывает, сколько комментариев ссылается на блоб;
+    блобы без ссылок удаляются сборщиком мусора.
+    """
+
+    digest = models.CharField(
+        max_length=64, unique=True, help_text="SHA-256 содержимого в hex"
+    )
+    size = models.BigIntegerField(help_text="Размер содержимого в байтах")
+    ref_count = models.IntegerField(
+        default=0, help_text="Количество комментариев, ссылающихся на блоб"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True, help_text="Дата и время первого сохранения"
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True, help_text="Дата и время последнего изменения счётчика"
+    )
+
+    class Meta:
+        verbose_name = "Блоб вложения"
+        verbose_name_plural = "Блобы вложений"
+        indexes = [
+            models.Index(
+                fields=["updated_at"],
+                condition=models.Q(ref_count__lte=0),
+                name="tasks_blob_unreferenced_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.digest[:12]} ({self.ref_count} ссылок)"
 
 
 class Comment(models.Model):
@@ -195,11 +390,16 @@ class Comment(models.Model):
     Позволяет пользователям оставлять комментарии к задачам и
     прикреплять файлы. Каждый комментарий связан с конкретной
     задачей и имеет автора.
+
+    Таблица секционируется по месяцам created_at (см. partitions.py),
+    первичный ключ в базе — (id, created_at), поэтому внешние ключи
+    на комментарии не допускаются.
     """
 
     task = models.ForeignKey(
         Task,
         on_delete=models.CASCADE,
+        db_index=False,
         related_name="comments",
         help_text="Задача, к которой относится комментарий",
     )
@@ -212,21 +412,519 @@ class Comment(models.Model):
     text = models.TextField(help_text="Текст комментария")
     attachment = models.FileField(
         upload_to="task_attachments/",
+        storage=attachment_storage,
         null=True,
         blank=True,
+        db_index=True,
         help_text="Прикрепленный файл",
     )
+    attachment_name = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text="Исходное имя прикреплённого файла",
+    )
     created_at = models.DateTimeField(
         auto_now_add=True, help_text="Дата и время создания комментария"
     )
     updated_at = models.DateTimeField(
         auto_now=True, help_text="Дата и время последнего обновления комментария"
     )
+    change_xid = models.BigIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True,
+        help_text="Транзакция последнего изменения (курсор синхронизации)",
+    )
 
     class Meta:
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
         ordering = ["created_at"]
+        indexes = [
+            # Комментарии задачи в порядке создания — без сортировки
+            models.Index(
+                fields=["task", "created_at"], name="tasks_comment_task_created_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"Комментарий #{self.id} к Задаче «{self.task.title}»"
+
+    def refresh_from_db(self, *args, **kwargs):
+        """
+        Перечитывает поля из базы и обновляет запомненные сигналами
+        post_init значения (сводка, журнал изменений, учёт вложений).
+        """
+        super().refresh_from_db(*args, **kwargs)
+        models.signals.post_init.send(sender=type(self), instance=self)
+
+    def save(self, *args, **kwargs):
+        """
+        Переопределение метода save для сохранения исходного имени
+        вложения: в хранилище файл лежит под хэшем содержимого.
+        """
+        if self.attachment and not self.attachment._committed:
+            self.attachment_name = os.path.basename(self.attachment.name)
+        _stamp_change(self, kwargs)
+        super().save(*args, **kwargs)
+        _forget_change(self)
+
+
+class AttachmentUpload(models.Model):
+    """
+    Модель незавершённой загрузки вложения по частям.
+
+    Хранит состояние возобновляемой загрузки: файл дописывается частями
+    в MEDIA_ROOT, а offset показывает, сколько байт уже принято. После
+    завершения загрузки файл прикрепляется к новому комментарию, а запись
+    о загрузке удаляется.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    task = models.ForeignKey(
+        Task,
+        on_delete=models.CASCADE,
+        related_name="attachment_uploads",
+        help_text="Задача, к комментарию которой будет прикреплён файл",
+    )
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="attachment_uploads",
+        help_text="Пользователь, выполняющий загрузку",
+    )
+    filename = models.CharField(max_length=255, help_text="Исходное имя файла")
+    size = models.BigIntegerField(help_text="Ожидаемый размер файла в байтах")
+    offset = models.BigIntegerField(default=0, help_text="Количество принятых байт")
+    sha256 = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="Ожидаемая контрольная сумма SHA-256 (необязательно)",
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True, help_text="Дата и время начала загрузки"
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True, help_text="Дата и время приёма последней части"
+    )
+
+    class Meta:
+        verbose_name = "Загрузка вложения"
+        verbose_name_plural = "Загрузки вложений"
+        ordering = ["created_at"]
+
+    def __str__(self):
+        return f"Загрузка «{self.filename}» ({self.offset}/{self.size})"
+
+    @property
+    def partial_name(self):
+        """
+        Возвращает путь частично загруженного файла относительно MEDIA_ROOT.
+
+        Returns:
+            str: Путь к временному файлу
+        """
+        return f"uploads/{self.id}.part"
+
+
+class ProjectTaskSummary(models.Model):
+    """
+    Модель сводки количества задач проекта.
+
+    Хранит число задач в каждой комбинации (проект, статус, приоритет,
+    исполнитель). Счётчики меняются дельтами в той же транзакции, что
+    и задача (см. summary.py), а расхождения исправляет периодическая сверка.
+    """
+
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name="task_summary",
+        help_text="Проект",
+    )
+    status = models.ForeignKey(
+        Status, on_delete=models.CASCADE, related_name="+", help_text="Статус"
+    )
+    priority = models.ForeignKey(
+        Priority, on_delete=models.CASCADE, related_name="+", help_text="Приоритет"
+    )
+    assignee = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="+",
+        help_text="Исполнитель (пусто — не назначена)",
+    )
+    count = models.IntegerField(default=0, help_text="Количество задач")
+
+    class Meta:
+        verbose_name = "Сводка задач проекта"
+        verbose_name_plural = "Сводки задач проектов"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["project", "status", "priority", "assignee"],
+                nulls_distinct=False,
+                name="tasks_summary_bucket_uniq",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.project_id}/{self.status_id}/{self.priority_id}/{self.assignee_id}: {self.count}"
+
+
+def recount_comment_stats(task_ids):
+    """
+    Пересчитывает счётчик комментариев и время активности задач по данным.
+
+    Исправляет только разошедшиеся строки.
+
+    Args:
+        task_ids (list): ID задач
+
+    Returns:
+        int: Количество исправленных задач
+    """
+    comments = Comment.objects.filter(task=models.OuterRef("pk")).order_by()
+    tasks = Task.objects.filter(pk__in=task_ids).annotate(
+        real_count=Coalesce(
+            models.Subquery(
+                comments.values("task")
+                .annotate(total=models.Count("id"))
+                .values("total")
+            ),
+            0,
+        ),
+        last_comment_at=models.Subquery(
+            comments.values("task")
+            .annotate(last=models.Max("created_at"))
+            .values("last")
+        ),
+    )
+    drifted = []
+    for task in tasks.only("id", "updated_at", "comment_count", "last_activity_at"):
+        activity = max(filter(None, [task.updated_at, task.last_comment_at]))
+        if (task.comment_count, task.last_activity_at) != (task.real_count, activity):
+            task.comment_count = task.real_count
+            task.last_activity_at = activity
+            task.change_xid = CurrentTransactionId()
+            drifted.append(task)
+    Task.objects.bulk_update(
+        drifted, ["comment_count", "last_activity_at", "change_xid"]
+    )
+    return len(drifted)
+
+
+def update_comment_stats(task_id, delta):
+    """
+    Изменяет счётчик комментариев задачи атомарным UPDATE.
+
+    При добавлении комментария время последней активности задачи
+    сдвигается на текущий момент.
+
+    Args:
+        task_id (int): ID задачи
+        delta (int): Изменение счётчика (+1 или -1)
+    """
+    values = {
+        "comment_count": Greatest(models.F("comment_count") + delta, 0),
+        "change_xid": CurrentTransactionId(),
+    }
+    if delta > 0:
+        values["last_activity_at"] = timezone.now()
+    Task.objects.filter(pk=task_id).update(**values)
+
+
+class Tombstone(models.Model):
+    """
+    Модель записи об удалённой задаче или комментарии.
+
+    Задачи и комментарии удаляются физически, поэтому для синхронизации
+    изменений по курсору (changed_since) удаление фиксируется отдельной
+    компактной записью. Записи старше срока хранения удаляются командой
+    purge_tombstones. При удалении задачи записи о её комментариях
+    не создаются: клиент удаляет их вместе с задачей.
+    """
+
+    class Kind(models.TextChoices):
+        TASK = "task", "Задача"
+        COMMENT = "comment", "Комментарий"
+
+    kind = models.CharField(
+        max_length=10, choices=Kind.choices, help_text="Тип удалённого объекта"
+    )
+    object_id = models.BigIntegerField(help_text="ID удалённого объекта")
+    task_id = models.BigIntegerField(
+        help_text="ID задачи (для комментария — родительской)"
+    )
+    project_id = models.BigIntegerField(help_text="ID проекта задачи")
+    creator_id = models.BigIntegerField(
+        null=True, help_text="ID создателя задачи (для проверки видимости)"
+    )
+    deleted_xid = models.BigIntegerField(help_text="Транзакция удаления")
+    deleted_at = models.DateTimeField(
+        auto_now_add=True, db_index=True, help_text="Дата и время удаления"
+    )
+
+    class Meta:
+        verbose_name = "Запись об удалении"
+        verbose_name_plural = "Записи об удалении"
+        indexes = [
+            models.Index(
+                fields=["kind", "deleted_xid"], name="tasks_tombstone_xid_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.object_id}"
+
+
+class ArchivedTask(models.Model):
+    """
+    Модель задачи в холодном архиве.
+
+    Закрытые задачи, давно не менявшиеся, переносятся сюда вместе
+    с комментариями (см. archive.py), чтобы таблица Task, её индексы
+    и очистка (vacuum) касались только рабочих задач. Поля совпадают
+    с Task, ID и issue_id сохраняются, поэтому задачу можно вернуть
+    из архива без изменений.
+    """
+
+    archived = True
+
+    issue_id = models.CharField(
+        max_length=32, unique=True, help_text="Идентификатор задачи (PROJECT-XXX)"
+    )
+    title = models.CharField(max_length=200, help_text="Название задачи")
+    description = models.TextField(blank=True, help_text="Описание задачи")
+    created_at = models.DateTimeField(help_text="Дата и время создания задачи")
+    updated_at = models.DateTimeField(help_text="Дата и время последнего обновления")
+    due_date = models.DateTimeField(
+        null=True, blank=True, help_text="Планируемая дата завершения задачи"
+    )
+    creator = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+        help_text="Пользователь, создавший задачу",
+    )
+    assignee = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        help_text="Исполнитель задачи",
+    )
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name="archived_tasks",
+        help_text="Проект задачи",
+    )
+    status = models.ForeignKey(
+        Status,
+        on_delete=models.SET_DEFAULT,
+        default=1,
+        related_name="+",
+        help_text="Статус задачи",
+    )
+    priority = models.ForeignKey(
+        Priority,
+        on_delete=models.SET_DEFAULT,
+        default=1,
+        related_name="+",
+        help_text="Приоритет задачи",
+    )
+    closed_at = models.DateTimeField(
+        null=True, blank=True, help_text="Дата и время закрытия задачи"
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0, help_text="Количество комментариев к задаче"
+    )
+    last_activity_at = models.DateTimeField(
+        null=True, blank=True, help_text="Дата и время последней активности"
+    )
+    archived_at = models.DateTimeField(
+        default=timezone.now, help_text="Дата и время переноса в архив"
+    )
+
+    class Meta:
+        verbose_name = "Задача в архиве"
+        verbose_name_plural = "Архив задач"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["project", "created_at"], name="tasks_archived_created_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.issue_id}: {self.title} (архив)"
+
+
+class ArchivedComment(models.Model):
+    """
+    Модель комментария задачи из холодного архива.
+
+    Вложение хранится именем файла: файл остаётся в хранилище вложений,
+    и счётчик ссылок блоба при архивации не меняется.
+    """
+
+    task = models.ForeignKey(
+        ArchivedTask,
+        on_delete=models.CASCADE,
+        related_name="comments",
+        help_text="Задача в архиве",
+    )
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+        help_text="Автор комментария",
+    )
+    text = models.TextField(help_text="Текст комментария")
+    attachment = models.CharField(
+        max_length=100,
+        null=True,
+        blank=True,
+        db_index=True,
+        help_text="Имя файла вложения",
+    )
+    attachment_name = models.CharField(
+        max_length=255, blank=True, help_text="Исходное имя прикреплённого файла"
+    )
+    created_at = models.DateTimeField(help_text="Дата и время создания комментария")
+    updated_at = models.DateTimeField(help_text="Дата и время обновления комментария")
+
+    class Meta:
+        verbose_name = "Комментарий в архиве"
+        verbose_name_plural = "Комментарии в архиве"
+        ordering = ["created_at"]
+
+    def __str__(self):
+        return f"Комментарий #{self.id} к задаче {self.task_id} (архив)"
+
+
+class TaskChange(models.Model):
+    """
+    Модель записи журнала изменений задачи.
+
+    Журнал только дополняется: при каждом сохранении задачи или комментария
+    с изменёнными полями добавляется одна строка с разницей значений
+    {"поле": [было, стало]}. Таблица секционирована по месяцам (at)
+    и создаётся вне миграций (см. history.py), поэтому модель неуправляемая,
+    а первичный ключ в базе составной (id, at).
+    """
+
+    class Action(models.TextChoices):
+        CREATED = "created", "Создание"
+        UPDATED = "updated", "Изменение"
+        DELETED = "deleted", "Удаление"
+        ARCHIVED = "archived", "Перенос в архив"
+        RESTORED = "restored", "Возврат из архива"
+
+    id = models.BigAutoField(primary_key=True)
+    at = models.DateTimeField(default=timezone.now, help_text="Время изменения")
+    task_id = models.BigIntegerField(help_text="ID задачи")
+    project_id = models.BigIntegerField(help_text="ID проекта задачи")
+    comment_id = models.BigIntegerField(
+        null=True, blank=True, help_text="ID комментария (для изменений комментария)"
+    )
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name="+",
+        help_text="Пользователь, внёсший изменение",
+    )
+    action = models.CharField(
+        max_length=16, choices=Action.choices, help_text="Тип изменения"
+    )
+    changes = models.JSONField(
+        default=dict,
+        encoder=DjangoJSONEncoder,
+        help_text="Изменённые поля: {поле: [было, стало]}",
+    )
+
+    class Meta:
+        managed = False
+        db_table = "tasks_taskchange"
+        verbose_name = "Изменение задачи"
+        verbose_name_plural = "Журнал изменений задач"
+
+    def __str__(self):
+        return f"{self.action} #{self.task_id} {self.at:%Y-%m-%d %H:%M}"
+
+
+class PendingDeletion(models.Model):
+    """
+    Модель фонового удаления проекта или пользователя.
+
+    Создаётся при запросе удаления вместе с отметкой deleting_at на объекте.
+    Фоновая задача удаляет зависимые строки пакетами и после каждого пакета
+    обновляет счётчики удалённых строк (progress), по которым клиент
+    отслеживает ход удаления.
+    """
+
+    class Kind(models.TextChoices):
+        PROJECT = "project", "Проект"
+        USER = "user", "Пользователь"
+
+    class State(models.TextChoices):
+        PENDING = "pending", "Ожидает"
+        RUNNING = "running", "Выполняется"
+        DONE = "done", "Завершено"
+
+    kind = models.CharField(
+        max_length=10, choices=Kind.choices, help_text="Тип удаляемого объекта"
+    )
+    object_id = models.BigIntegerField(help_text="ID удаляемого объекта")
+    label = models.CharField(
+        max_length=255, help_text="Название объекта на момент запроса"
+    )
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        help_text="Пользователь, запросивший удаление",
+    )
+    state = models.CharField(
+        max_length=10,
+        choices=State.choices,
+        default=State.PENDING,
+        help_text="Состояние удаления",
+    )
+    total_tasks = models.PositiveIntegerField(
+        default=0, help_text="Количество задач на момент запроса"
+    )
+    progress = models.JSONField(
+        default=dict, help_text="Количество удалённых строк по шагам"
+    )
+    requested_at = models.DateTimeField(
+        auto_now_add=True, help_text="Дата и время запроса"
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True, help_text="Дата и время последнего пакета"
+    )
+    finished_at = models.DateTimeField(
+        null=True, blank=True, help_text="Дата и время завершения"
+    )
+
+    class Meta:
+        verbose_name = "Фоновое удаление"
+        verbose_name_plural = "Фоновые удаления"
+        ordering = ["-requested_at"]
+        indexes = [
+            models.Index(
+                fields=["kind", "object_id"], name="tasks_deletion_object_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.label}"
@@ -0,0 +1,280 @@
+"""
+Секционирование таблиц Postgres по месяцам.
+
+Используется для таблиц, растущих быстрее остальных: журнала изменений
+(TaskChange.at) и комментариев (Comment.created_at). Каждый месяц хранится
+в отдельной секции <таблица>_pГГГГ_ММ, строки вне созданных секций
+попадают в секцию <таблица>_default. Старые секции отключаются
+(DETACH PARTITION) или удаляются целиком, без длинного DELETE.
+
+Django не умеет объявлять секционированные таблицы, поэтому обычная
+таблица, созданная миграцией, преобразуется функцией partition_table.
+"""
+
+from datetime import date
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+
+def month_start(day, offset=0):
+    """
+    Возвращает первое число месяца, сдвинутого на offset месяцев.
+
+    Args:
+        day (date): Любой день месяца
+        offset (int): Сдвиг в месяцах
+
+    Returns:
+        date: Первое число месяца
+    """
+    index = day.year * 12 + day.month - 1 + offset
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table, month):
+    return f"{table}_p{month:%Y_%m}"
+
+
+def default_partition(table):
+    return f"{table}_default"
+
+
+def is_partitioned(table):
+    """
+    Проверяет, секционирована ли таблица.
+
+    Args:
+        table (str): Имя таблицы
+
+    Returns:
+        bool: True для секционированной таблицы
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE relname = %s", [table])
+        row = cursor.fetchone()
+    return row is not None and row[0] == "p"
+
+
+def list_partitions(table):
+    """
+    Возвращает месячные секции таблицы.
+
+    Args:
+        table (str): Имя секционированной таблицы
+
+    Returns:
+        list: Пары (начало месяца, имя секции), по возрастанию
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass",
+            [table],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    prefix = f"{table}_p"
+    result = []
+    for name in names:
+        if name.startswith(prefix):
+            year, month = name[len(prefix) :].split("_")
+            result.append((date(int(year), int(month), 1), name))
+    return sorted(result)
+
+
+def create_month_partition(table, column, month):
+    """
+    Создаёт секцию месяца.
+
+    Если строки этого месяца уже попали в секцию по умолчанию (секция
+    не была создана вовремя), секция по умолчанию отключается, строки
+    переносятся в новую секцию, и секция по умолчанию подключается обратно.
+
+    Args:
+        table (str): Имя секционированной таблицы
+        column (str): Столбец ключа секционирования
+        month (date): Первое число месяца
+
+    Returns:
+        str: Имя секции
+    """
+    bounds = [month.isoformat(), month_start(month, 1).isoformat()]
+    name = partition_name(table, month)
+    default = default_partition(table)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT EXISTS (SELECT 1 FROM {default} "
+            f"WHERE {column} >= %s AND {column} < %s)",
+            bounds,
+        )
+        if not cursor.fetchone()[0]:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                "FOR VALUES FROM (%s) TO (%s)",
+                bounds,
+            )
+            return name
+        cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {default}")
+        cursor.execute(
+            f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)",
+            bounds,
+        )
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {default} "
+            f"WHERE {column} >= %s AND {column} < %s RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved",
+            bounds,
+        )
+        cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT")
+    return name
+
+
+def ensure_partitions(table, column, months_ahead, since=None):
+    """
+    Создаёт недостающие секции с месяца since по текущий + months_ahead.
+
+    Args:
+        table (str): Имя секционированной таблицы
+        column (str): Столбец ключа секционирования
+        months_ahead (int): Количество месяцев вперёд
+        since (date): Первый месяц (по умолчанию текущий)
+
+    Returns:
+        list: Имена созданных секций
+    """
+    today = timezone.localdate()
+    month = month_start(since or today)
+    last = month_start(today, months_ahead)
+    existing = {start for start, _ in list_partitions(table)}
+    created = []
+    while month <= last:
+        if month not in existing:
+            created.append(create_month_partition(table, column, month))
+        month = month_start(month, 1)
+    return created
+
+
+def partitions_before(table, before):
+    """
+    Возвращает имена секций месяцев раньше before.
+
+    Args:
+        table (str): Имя секционированной таблицы
+        before (date): Первый сохраняемый месяц
+
+    Returns:
+        list: Имена секций по возрастанию месяца
+    """
+    return [
+        name for month, name in list_partitions(table) if month < month_start(before)
+    ]
+
+
+def detach_partition(table, name, drop=False):
+    """
+    Отключает (или удаляет) одну секцию.
+
+    Отключение обычное, не CONCURRENTLY, поэтому его можно выполнить
+    в одной транзакции с обработкой строк секции.
+
+    Args:
+        table (str): Имя секционированной таблицы
+        name (str): Имя секции
+        drop (bool): Удалить секцию вместо отключения
+    """
+    with connection.cursor() as cursor:
+        if drop:
+            cursor.execute(f"DROP TABLE IF EXISTS {name}")
+        else:
+            cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {name}")
+
+
+def detach_partitions(table, before, drop=False):
+    """
+    Отключает (или удаляет) секции месяцев раньше before.
+
+    Отключённая секция остаётся обычной таблицей с тем же именем:
+    её можно выгрузить в архив (pg_dump -t) и удалить.
+
+    Args:
+        table (str): Имя секционированной таблицы
+        before (date): Первый сохраняемый месяц
+        drop (bool): Удалить секции вместо отключения
+
+    Returns:
+        list: Имена отключённых секций
+    """
+    detached = partitions_before(table, before)
+    for name in detached:
+        detach_partition(table, name, drop)
+    return detached
+
+
+def partition_table(table, column, months_ahead):
+    """
+    Преобразует обычную таблицу в секционированную по месяцам.
+
+    Таблица переименовывается, создаётся секционированная таблица с теми же
+    столбцами, значениями по умолчанию и identity, секции на весь диапазон
+    данных, строки копируются одним INSERT ... SELECT, после чего
+    пересоздаются индексы и внешние ключи, а первичный ключ расширяется
+    ключом секционирования: (id, column). Всё выполняется в одной транзакции
+    под эксклюзивной блокировкой, поэтому для больших таблиц преобразование
+    нужно запускать в окно обслуживания.
+
+    Входящих внешних ключей на таблицу быть не должно: уникальность только
+    по id в секционированной таблице невозможна.
+
+    Args:
+        table (str): Имя таблицы
+        column (str): Столбец ключа секционирования (NOT NULL)
+        months_ahead (int): Сколько месяцев вперёд создать секции
+
+    Returns:
+        int: Количество перенесённых строк
+    """
+    legacy = f"{table}_unpartitioned"
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT indexdef FROM pg_indexes WHERE tablename = %s "
+            "AND indexname NOT IN (SELECT conname FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype IN ('p', 'u'))",
+            [table, table],
+        )
+        indexes = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f'",
+            [table],
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute(f"SELECT MIN({column}) FROM {table}")
+        oldest = cursor.fetchone()[0]
+
+        cursor.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+        cursor.execute(
+            f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS "
+            f"INCLUDING IDENTITY) PARTITION BY RANGE ({column})"
+        )
+        cursor.execute(
+            f"CREATE TABLE {default_partition(table)} PARTITION OF {table} DEFAULT"
+        )
+        since = timezone.localdate(oldest) if oldest else None
+        ensure_partitions(table, column, months_ahead, since=since)
+        cursor.execute(f"INSERT INTO {table} SELECT * FROM {legacy}")
+        moved = cursor.rowcount
+        cursor.execute(f"DROP TABLE {legacy}")
+
+        cursor.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id, {column})")
+        # Имена индексов и ключей освободились при удалении старой таблицы
+        for indexdef in indexes:
+            cursor.execute(indexdef)
+        for name, definition in foreign_keys:
+            cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+        cursor.execute(
+            "SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)",
+            [table],
+        )
+    return moved
@@ -25,3 +25,24 @@ class IsAuthorOrAdmin(permissions.BasePermission):
         if request.user.is_superuser:
             return True
         return obj.author == request.user
+
+
+def user_can_view_task(user, task):
+    """
+    Проверяет, видна ли задача пользователю.
+
+    Правило совпадает с фильтрацией в TaskViewSet.get_queryset: администраторы
+    видят все задачи, остальные — задачи своих проектов и созданные ими.
+
+    Args:
+        user: Пользователь
+        task (Task): Задача
+
+    Returns:
+        bool: True, если пользователь может просматривать задачу
+    """
+    if user.is_superuser or user.is_staff:
+        return True
+    if task.creator_id == user.pk:
+        return True
+    return task.project.members.filter(pk=user.pk).exists()
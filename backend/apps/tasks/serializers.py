@@ -1,21 +1,36 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
-from .models import Task, Status, Priority, Project
+from config.deletion import IncludeDeletingUniqueMixin
+from config.fieldsets import SparseFieldsMixin
+from config.identity import IdentityMapMixin
+
+from .models import Task, Status, Priority, Project, TaskChange, PendingDeletion
 from ..users.serializers import UserSerializer
 
 User = get_user_model()
 
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(
+    IdentityMapMixin,
+    SparseFieldsMixin,
+    IncludeDeletingUniqueMixin,
+    serializers.ModelSerializer,
+):
     """
     Сериализатор для модели Project.
 
     Предоставляет сериализацию и десериализацию проектов с учетом:
     - Чтения списка участников проекта через UserSerializer
     - Записи участников проекта через список ID пользователей
+    - Выборочных полей и раскрытия связей (параметры fields и expand)
+    - Однократной сериализации проекта на запрос (карта идентичности)
+    - Проверки уникальности с учётом проектов, ожидающих удаления
     """
 
+    expandable_fields = ("members",)
+    prefetch_related_fields = {"members": "members"}
+
     members = UserSerializer(read_only=True, many=True)
     members_ids = serializers.PrimaryKeyRelatedField(
         queryset=User.objects.all(), many=True, write_only=True, source="members"
@@ -94,7 +109,7 @@ class PrioritySerializer(serializers.ModelSerializer):
         fields = ["id", "level"]
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Сериализатор для модели Task.
 
@@ -102,8 +117,17 @@ class TaskSerializer(serializers.ModelSerializer):
     - Чтения создателя, исполнителя и проекта через соответствующие сериализаторы
     - Записи создателя, исполнителя и проекта через их ID
     - Автоматического назначения текущего пользователя создателем при создании задачи
+    - Счётчика комментариев и времени последней активности (только чтение)
+    - Выборочных полей и раскрытия связей (параметры fields и expand)
     """
 
+    expandable_fields = ("creator", "assignee", "project")
+    select_related_fields = {
+        "creator": "creator",
+        "assignee": "assignee",
+        "project": "project",
+    }
+
     creator = UserSerializer(read_only=True)
     creator_id = serializers.PrimaryKeyRelatedField(
         queryset=User.objects.all(), source="creator", write_only=True, required=False
@@ -125,6 +149,7 @@ class TaskSerializer(serializers.ModelSerializer):
     status = serializers.PrimaryKeyRelatedField(queryset=Status.objects.all())
     priority = serializers.PrimaryKeyRelatedField(queryset=Priority.objects.all())
     issue_id = serializers.CharField(read_only=True)
+    archived = serializers.BooleanField(read_only=True)
 
     class Meta:
         model = Task
@@ -144,6 +169,9 @@ class TaskSerializer(serializers.ModelSerializer):
             "project_id",
             "status",
             "priority",
+            "comment_count",
+            "last_activity_at",
+            "archived",
         ]
         read_only_fields = [
             "id",
@@ -152,6 +180,8 @@ class TaskSerializer(serializers.ModelSerializer):
             "project",
             "assignee",
             "issue_id",
+            "comment_count",
+            "last_activity_at",
         ]
 
     def create(self, validated_data):
@@ -182,3 +212,65 @@ class TaskSerializer(serializers.ModelSerializer):
             Task: Обновленная задача
         """
         return super().update(instance, validated_data)
+
+
+class TaskChangeSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор для записи журнала изменений TaskChange.
+
+    Изменения передаются как {поле: [было, стало]}; для связей —
+    ID связанных объектов.
+    """
+
+    actor_username = serializers.CharField(
+        source="actor.username", read_only=True, default=None
+    )
+
+    class Meta:
+        model = TaskChange
+        fields = [
+            "id",
+            "at",
+            "task_id",
+            "comment_id",
+            "action",
+            "actor",
+            "actor_username",
+            "changes",
+        ]
+        read_only_fields = fields
+
+
+class PendingDeletionSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор для фонового удаления проекта или пользователя.
+
+    Поле percent — доля удалённых задач от количества на момент запроса.
+    """
+
+    percent = serializers.SerializerMethodField()
+
+    class Meta:
+        model = PendingDeletion
+        fields = [
+            "id",
+            "kind",
+            "object_id",
+            "label",
+            "state",
+            "total_tasks",
+            "progress",
+            "percent",
+            "requested_at",
+            "updated_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
+
+    def get_percent(self, obj):
+        if obj.state == PendingDeletion.State.DONE:
+            return 100
+        if not obj.total_tasks:
+            return 0
+        deleted = obj.progress.get("tasks", 0)
+        return min(99, deleted * 100 // obj.total_tasks)
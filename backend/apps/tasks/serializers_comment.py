@@ -1,10 +1,16 @@
 from rest_framework import serializers
 
+from django.conf import settings
+
+from config.fieldsets import SparseFieldsMixin
+from config.thumbnails import existing_thumbnails, is_image_name
+
+from .downloads import comment_download_url
 from .models import Comment, Task
 from ..users.serializers import UserSerializer
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Сериализатор для модели Comment.
 
@@ -13,15 +19,26 @@ class CommentSerializer(serializers.ModelSerializer):
     - Чтения задачи в режиме только для чтения
     - Записи задачи через ID или issue_id
     - Поддержки загрузки файлов в качестве вложений
+    - Подписанной ссылки на защищённое скачивание вложения и его превью
     - Автоматического назначения текущего пользователя автором при создании
+    - Выборочных полей и раскрытия связей (параметры fields и expand)
     """
 
+    expandable_fields = ("author",)
+    select_related_fields = {"author": "author"}
+    compiled_methods = {
+        "attachment_url": ("id", "attachment"),
+        "attachment_preview_url": ("id", "attachment", "attachment_name"),
+    }
+
     author = UserSerializer(read_only=True)
     task = serializers.PrimaryKeyRelatedField(read_only=True)
     task_id = serializers.PrimaryKeyRelatedField(
         queryset=Task.objects.all(), write_only=True, source="task", required=False
     )
     attachment = serializers.FileField(required=False, allow_null=True)
+    attachment_url = serializers.SerializerMethodField()
+    attachment_preview_url = serializers.SerializerMethodField()
     task_issue_id = serializers.CharField(write_only=True, required=False)
 
     class Meta:
@@ -33,11 +50,68 @@ class CommentSerializer(serializers.ModelSerializer):
             "author",
             "text",
             "attachment",
+            "attachment_name",
+            "attachment_url",
+            "attachment_preview_url",
             "created_at",
             "updated_at",
             "task_issue_id",
         ]
-        read_only_fields = ["id", "author", "created_at", "updated_at", "task"]
+        read_only_fields = [
+            "id",
+            "author",
+            "attachment_name",
+            "created_at",
+            "updated_at",
+            "task",
+        ]
+
+    def get_attachment_url(self, obj):
+        """
+        Возвращает подписанную ссылку на скачивание вложения.
+
+        Args:
+            obj (Comment): Комментарий
+
+        Returns:
+            str | None: URL для скачивания или None, если вложения нет
+        """
+        return self.row_attachment_url(self.context, obj.pk, obj.attachment.name)
+
+    def get_attachment_preview_url(self, obj):
+        """
+        Возвращает ссылку на уменьшенную копию вложения-изображения.
+
+        Args:
+            obj (Comment): Комментарий
+
+        Returns:
+            str | None: URL превью или None, если превью ещё не создано
+        """
+        return self.row_attachment_preview_url(
+            self.context, obj.pk, obj.attachment.name, obj.attachment_name
+        )
+
+    def row_attachment_url(self, context, pk, attachment):
+        """
+        Возвращает ссылку на скачивание по значениям столбцов id и attachment.
+        """
+        if not attachment:
+            return None
+        return comment_download_url(context.get("request"), pk)
+
+    def row_attachment_preview_url(self, context, pk, attachment, attachment_name):
+        """
+        Возвращает ссылку на превью по значениям столбцов id, attachment
+        и attachment_name.
+        """
+        if not attachment or not is_image_name(attachment_name):
+            return None
+        storage = Comment._meta.get_field("attachment").storage
+        sizes = settings.THUMBNAIL_SIZES["preview"][:1]
+        if not existing_thumbnails(storage, attachment, sizes):
+            return None
+        return comment_download_url(context.get("request"), pk, "preview")
 
     def validate(self, attrs):
         """
@@ -0,0 +1,88 @@
+import os
+
+from django.conf import settings
+from rest_framework import serializers
+
+from .models import AttachmentUpload, Task
+
+
+class AttachmentUploadSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор для модели AttachmentUpload.
+
+    Предоставляет создание возобновляемой загрузки с учетом:
+    - Указания задачи через ID или issue_id
+    - Ограничения размера файла настройкой ATTACHMENT_UPLOAD_MAX_SIZE
+    - Чтения текущего смещения для возобновления загрузки
+    """
+
+    task = serializers.PrimaryKeyRelatedField(read_only=True)
+    task_id = serializers.PrimaryKeyRelatedField(
+        queryset=Task.objects.all(), write_only=True, source="task", required=False
+    )
+    task_issue_id = serializers.SlugRelatedField(
+        queryset=Task.objects.all(),
+        slug_field="issue_id",
+        write_only=True,
+        source="task",
+        required=False,
+    )
+    chunk_size = serializers.SerializerMethodField()
+
+    class Meta:
+        model = AttachmentUpload
+        fields = [
+            "id",
+            "task",
+            "task_id",
+            "task_issue_id",
+            "filename",
+            "size",
+            "sha256",
+            "offset",
+            "chunk_size",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = ["id", "task", "offset", "created_at", "updated_at"]
+
+    def get_chunk_size(self, obj):
+        """
+        Возвращает максимальный размер одной части.
+
+        Args:
+            obj (AttachmentUpload): Загрузка
+
+        Returns:
+            int: Размер части в байтах
+        """
+        return settings.ATTACHMENT_UPLOAD_CHUNK_SIZE
+
+    def validate_filename(self, value):
+        """
+        Оставляет от имени файла только базовое имя без каталогов.
+        """
+        name = os.path.basename(value.replace("\\", "/"))
+        if not name or name in (".", ".."):
+            raise serializers.ValidationError("Некорректное имя файла")
+        return name
+
+    def validate_size(self, value):
+        """
+        Проверяет, что размер файла положителен и не превышает лимит.
+        """
+        if value <= 0:
+            raise serializers.ValidationError("Размер файла должен быть больше нуля")
+        if value > settings.ATTACHMENT_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError("Файл превышает допустимый размер")
+        return value
+
+    def validate(self, attrs):
+        """
+        Проверяет, что указан либо task_id, либо task_issue_id.
+        """
+        if not attrs.get("task"):
+            raise serializers.ValidationError(
+                "Необходимо указать task_id или task_issue_id"
+            )
+        return attrs
@@ -0,0 +1,457 @@
+"""
+Обработчики сигналов моделей приложения tasks.
+
+Подключаются в TasksConfig.ready().
+"""
+
+from django.conf import settings
+from django.db.models import QuerySet
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_init,
+    post_migrate,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+
+from config.invalidation import invalidate, membership_key, reference_key
+from config.thumbnails import schedule_thumbnails
+
+from ..users.models import Position, User
+from . import history
+from .events import comment_event, publish, task_event
+from .fragments import bump_cache_versions
+from .jobs import reconcile_project_summaries
+from .models import (
+    Comment,
+    Priority,
+    Project,
+    ProjectTaskSummary,
+    Status,
+    Task,
+    TaskChange,
+    Tombstone,
+    update_comment_stats,
+)
+from .partitions import is_partitioned, partition_table
+from .storage import change_ref_count
+from .summary import BUCKET_FIELDS, apply_summary_deltas, task_bucket, task_moved
+from .sync import record_tombstone
+
+
+def deleted_with_task(origin):
+    """
+    Проверяет, удаляется ли комментарий каскадом вместе с задачей или проектом,
+    в том числе при удалении QuerySet задач или проектов.
+    """
+    if isinstance(origin, QuerySet):
+        return origin.model in (Task, Project)
+    return isinstance(origin, (Task, Project))
+
+
+def comment_project_id(comment):
+    """
+    Возвращает проект комментария: из загруженной задачи или одним запросом
+    значения столбца, не загружая задачу целиком.
+    """
+    if Comment.task.is_cached(comment):
+        return comment.task.project_id
+    return (
+        Task.objects.filter(pk=comment.task_id)
+        .values_list("project_id", flat=True)
+        .first()
+    )
+
+
+@receiver(post_init, sender=Comment)
+def remember_comment_attachment(sender, instance, **kwargs):
+    """
+    Запоминает имя вложения загруженного комментария для учёта ссылок.
+    """
+    instance._stored_attachment = instance.__dict__.get("attachment") and str(
+        instance.__dict__["attachment"]
+    )
+
+
+@receiver(post_save, sender=Comment)
+def update_attachment_refs_on_save(sender, instance, **kwargs):
+    """
+    Обновляет счётчики ссылок блобов при создании или смене вложения
+    и планирует создание превью для изображений.
+    """
+    previous = getattr(instance, "_stored_attachment", None) or ""
+    current = instance.attachment.name or ""
+    if previous != current:
+        change_ref_count(previous, -1)
+        change_ref_count(current, +1)
+        schedule_thumbnails(
+            instance.attachment.storage,
+            current,
+            settings.THUMBNAIL_SIZES["preview"],
+            original_name=instance.attachment_name,
+        )
+    instance._stored_attachment = current
+
+
+@receiver(post_delete, sender=Comment)
+def update_attachment_refs_on_delete(sender, instance, **kwargs):
+    """
+    Уменьшает счётчик ссылок блоба при удалении комментария.
+    """
+    change_ref_count(getattr(instance, "_stored_attachment", None) or "", -1)
+
+
+@receiver(post_save, sender=Comment)
+def count_comment_created(sender, instance, created, **kwargs):
+    """
+    Увеличивает счётчик комментариев задачи и обновляет время активности.
+    """
+    if created:
+        update_comment_stats(instance.task_id, +1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_comment_deleted(sender, instance, origin=None, **kwargs):
+    """
+    Уменьшает счётчик комментариев задачи.
+
+    При каскадном удалении задачи или проекта счётчик не нужен.
+    """
+    if not deleted_with_task(origin):
+        update_comment_stats(instance.task_id, -1)
+
+
+@receiver(post_init, sender=Task)
+def remember_task_bucket(sender, instance, **kwargs):
+    """
+    Запоминает проект, статус, приоритет и исполнителя загруженной задачи,
+    чтобы при их изменении обновить сводку и версии обоих проектов.
+    """
+    values = instance.__dict__
+    loaded = instance.pk is not None and all(f in values for f in BUCKET_FIELDS)
+    instance._stored_bucket = (
+        tuple(values[field] for field in BUCKET_FIELDS) if loaded else None
+    )
+
+
+@receiver(post_save, sender=Task)
+def update_project_summary_on_save(sender, instance, created, **kwargs):
+    """
+    Делает устаревшей статистику проекта задачи (и прежнего проекта при переносе)
+    и переносит задачу между корзинами сводки.
+
+    Версия проекта увеличивается первой: UPDATE блокирует строку проекта,
+    и сверка сводки этого проекта дождётся фиксации транзакции.
+    """
+    previous = None if created else getattr(instance, "_stored_bucket", None)
+    current = task_bucket(instance)
+    Project.bump_tasks_version(instance.project_id, previous[0] if previous else None)
+    if previous is None and not created:
+        # Задача загружена без полей корзины: сводку исправит сверка
+        reconcile_project_summaries.delay([instance.project_id])
+    else:
+        apply_summary_deltas(task_moved(previous, current))
+    instance._stored_bucket = current
+
+
+@receiver(post_delete, sender=Task)
+def update_project_summary_on_delete(sender, instance, origin=None, **kwargs):
+    """
+    Делает устаревшей статистику проекта удалённой задачи и уменьшает сводку.
+
+    При каскадном удалении (проекта, пользователя) сводка не меняется
+    дельтами: строки сводки проекта удаляются каскадом, а проекты
+    удалённого пользователя сверяет фоновая задача (см. reconcile_on_delete).
+    """
+    if isinstance(origin, Project):
+        return
+    Project.bump_tasks_version(instance.project_id)
+    if isinstance(origin, Task) or (
+        isinstance(origin, QuerySet) and origin.model is Task
+    ):
+        apply_summary_deltas(task_moved(task_bucket(instance), None))
+
+
+@receiver(pre_delete, sender=Status)
+@receiver(pre_delete, sender=Priority)
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def reconcile_on_delete(sender, instance, **kwargs):
+    """
+    Ставит в очередь сверку сводок проектов, задачи которых меняются каскадом
+    при удалении статуса, приоритета или пользователя.
+
+    Каскадные SET_DEFAULT и SET_NULL выполняются UPDATE без сигналов
+    задач, поэтому сводка этих проектов пересчитывается целиком.
+    """
+    field = {Status: "status", Priority: "priority"}.get(sender, "assignee")
+    project_ids = set(
+        ProjectTaskSummary.objects.filter(**{field: instance}).values_list(
+            "project_id", flat=True
+        )
+    )
+    if field == "assignee":
+        project_ids.update(
+            Task.objects.filter(creator=instance).values_list("project_id", flat=True)
+        )
+    if project_ids:
+        reconcile_project_summaries.delay(sorted(project_ids))
+
+
+@receiver(post_save, sender=Task)
+def publish_task_saved(sender, instance, created, **kwargs):
+    """
+    Публикует событие создания или изменения задачи.
+    """
+    publish(task_event("created" if created else "updated", instance))
+
+
+@receiver(post_delete, sender=Task)
+def publish_task_deleted(sender, instance, **kwargs):
+    """
+    Публикует событие удаления задачи.
+    """
+    publish(task_event("deleted", instance))
+
+
+@receiver(post_save, sender=Comment)
+def publish_comment_created(sender, instance, created, **kwargs):
+    """
+    Публикует событие нового комментария.
+    """
+    if created:
+        publish(comment_event("created", instance))
+
+
+@receiver(post_delete, sender=Comment)
+def publish_comment_deleted(sender, instance, origin=None, **kwargs):
+    """
+    Публикует событие удаления комментария.
+
+    При каскадном удалении задачи или проекта достаточно события task.deleted.
+    """
+    if not deleted_with_task(origin):
+        publish(comment_event("deleted", instance))
+
+
+@receiver(post_delete, sender=Task)
+def record_task_tombstone(sender, instance, **kwargs):
+    """
+    Сохраняет запись об удалении задачи для синхронизации по курсору.
+    """
+    record_tombstone(Tombstone.Kind.TASK, instance.pk, instance)
+
+
+@receiver(post_delete, sender=Comment)
+def record_comment_tombstone(sender, instance, origin=None, **kwargs):
+    """
+    Сохраняет запись об удалении комментария.
+
+    При каскадном удалении задачи или проекта достаточно записи о задаче.
+    """
+    if not deleted_with_task(origin):
+        record_tombstone(Tombstone.Kind.COMMENT, instance.pk, instance.task)
+
+
+@receiver(post_migrate)
+def create_partitioned_tables(sender, **kwargs):
+    """
+    Создаёт секционированную таблицу журнала изменений после миграций tasks
+    и секционирует пустую таблицу комментариев (новая база).
+
+    Заполненную таблицу комментариев преобразует команда
+    partition_comments --convert в окно обслуживания.
+    """
+    if sender.name != "apps.tasks":
+        return
+    history.ensure_history_table()
+    table = Comment._meta.db_table
+    if not is_partitioned(table) and not Comment.objects.exists():
+        partition_table(table, "created_at", settings.COMMENT_PARTITIONS_AHEAD)
+
+
+@receiver(post_init, sender=Task)
+def remember_task_fields(sender, instance, **kwargs):
+    """
+    Запоминает отслеживаемые поля загруженной задачи для журнала изменений.
+    """
+    instance._history = (
+        history.snapshot(instance, history.TASK_FIELDS) if instance.pk else {}
+    )
+
+
+@receiver(post_save, sender=Task)
+def record_task_change(sender, instance, created, **kwargs):
+    """
+    Записывает в журнал создание задачи или изменённые поля.
+    """
+    current = history.snapshot(instance, history.TASK_FIELDS)
+    if created:
+        action = TaskChange.Action.CREATED
+        changes = {name: [None, value] for name, value in current.items()}
+    else:
+        action = TaskChange.Action.UPDATED
+        changes = history.diff(getattr(instance, "_history", {}), current)
+    if changes:
+        history.record_change(action, instance.pk, instance.project_id, changes)
+    instance._history = current
+
+
+@receiver(post_delete, sender=Task)
+def record_task_deleted(sender, instance, origin=None, **kwargs):
+    """
+    Записывает в журнал удаление задачи (кроме удаления вместе с проектом).
+    """
+    if not isinstance(origin, Project):
+        history.record_change(
+            TaskChange.Action.DELETED, instance.pk, instance.project_id, {}
+        )
+
+
+@receiver(post_init, sender=Comment)
+def remember_comment_fields(sender, instance, **kwargs):
+    """
+    Запоминает текст и вложение загруженного комментария для журнала изменений.
+    """
+    instance._history = (
+        history.snapshot(instance, history.COMMENT_FIELDS) if instance.pk else {}
+    )
+
+
+@receiver(post_save, sender=Comment)
+def record_comment_change(sender, instance, created, **kwargs):
+    """
+    Записывает в журнал правку текста или вложения комментария.
+    """
+    current = history.snapshot(instance, history.COMMENT_FIELDS)
+    changes = {} if created else history.diff(instance._history, current)
+    if changes:
+        history.record_change(
+            TaskChange.Action.UPDATED,
+            instance.task_id,
+            comment_project_id(instance),
+            changes,
+            comment_id=instance.pk,
+            actor_id=instance.author_id,
+        )
+    instance._history = current
+
+
+@receiver(post_delete, sender=Comment)
+def record_comment_deleted(sender, instance, origin=None, **kwargs):
+    """
+    Записывает в журнал удаление комментария вместе с его текстом.
+    """
+    if not deleted_with_task(origin):
+        history.record_change(
+            TaskChange.Action.DELETED,
+            instance.task_id,
+            comment_project_id(instance),
+            {"text": [instance.text, None]},
+            comment_id=instance.pk,
+        )
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_user_fragments(sender, instance, update_fields=None, **kwargs):
+    """
+    Делает устаревшими фрагменты задач с пользователем и его проектами.
+
+    Обновление только времени входа представление не меняет.
+    """
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    bump_cache_versions(user_ids=[instance.pk])
+
+
+@receiver(post_save, sender=Position)
+@receiver(pre_delete, sender=Position)
+def invalidate_position_fragments(sender, instance, **kwargs):
+    """
+    Делает устаревшими фрагменты задач пользователей с этой должностью.
+
+    При удалении должность пользователей обнуляется UPDATE без сигналов,
+    поэтому версии увеличиваются до удаления.
+    """
+    bump_cache_versions(
+        user_ids=User.all_objects.filter(position=instance).values("pk")
+    )
+
+
+@receiver(post_save, sender=Project)
+def invalidate_project_fragments(sender, instance, **kwargs):
+    """
+    Делает устаревшими фрагменты задач проекта.
+    """
+    bump_cache_versions(project_ids=[instance.pk])
+
+
+@receiver(m2m_changed, sender=Project.members.through)
+def invalidate_roster_fragments(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Делает устаревшими фрагменты задач проектов с изменённым составом участников.
+    """
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        bump_cache_versions(project_ids=[instance.pk])
+    elif action == "pre_clear":
+        bump_cache_versions(project_ids=instance.projects.values("pk"))
+    else:
+        bump_cache_versions(project_ids=pk_set)
+
+
+@receiver(post_save, sender=Status)
+@receiver(post_delete, sender=Status)
+@receiver(post_save, sender=Priority)
+@receiver(post_delete, sender=Priority)
+@receiver(post_save, sender=Position)
+@receiver(post_delete, sender=Position)
+def invalidate_reference_cache(sender, **kwargs):
+    """
+    Рассылает инвалидацию кэша списка справочника.
+    """
+    invalidate([reference_key(sender)])
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_user_memberships(sender, instance, update_fields=None, **kwargs):
+    """
+    Рассылает инвалидацию кэша проектов пользователя.
+
+    Обновление только времени входа видимость проектов не меняет.
+    """
+    if update_fields is not None and set(update_fields) <= {"last_login"}:
+        return
+    invalidate([membership_key(instance.pk)])
+
+
+@receiver(pre_delete, sender=Project)
+def invalidate_project_memberships(sender, instance, **kwargs):
+    """
+    Рассылает инвалидацию кэша проектов участников удаляемого проекта.
+
+    Связи с участниками удаляются каскадом без m2m_changed, поэтому
+    участники читаются до удаления.
+    """
+    invalidate(
+        membership_key(pk) for pk in instance.members.values_list("pk", flat=True)
+    )
+
+
+@receiver(m2m_changed, sender=Project.members.through)
+def invalidate_roster_memberships(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Рассылает инвалидацию кэша проектов пользователей с изменённым участием.
+    """
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if reverse:
+        user_ids = [instance.pk]
+    elif action == "pre_clear":
+        user_ids = instance.members.values_list("pk", flat=True)
+    else:
+        user_ids = pk_set
+    invalidate(membership_key(pk) for pk in user_ids)
@@ -0,0 +1,131 @@
+"""
+Статистика задач проектов для дашбордов.
+
+Количество задач по статусам, приоритетам и исполнителям читается из сводки
+ProjectTaskSummary (число строк равно числу корзин, а не задач), просроченные
+и недельные показатели считаются агрегатными запросами с GROUP BY сразу
+для всех запрошенных проектов. Результат кэшируется по ключу (проект, tasks_version).
+Версия увеличивается атомарным UPDATE при каждом сохранении или удалении
+задачи проекта, поэтому устаревшая запись кэша просто перестаёт читаться
+и не требует явной инвалидации во всех процессах. Отсутствующие записи
+досчитываются через get_or_set_many (config/cache.py): одновременные
+запросы одной статистики после изменения задачи считают её один раз.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.functions import TruncWeek
+from django.utils import timezone
+
+from .models import Task
+from .summary import summary_buckets
+
+CACHE_PREFIX = "tasks:project-stats"
+
+
+def _cache_key(project):
+    return f"{CACHE_PREFIX}:{project.pk}:{project.tasks_version}"
+
+
+def _empty_stats(since):
+    weeks = [
+        (since + timedelta(weeks=i)).date().isoformat()
+        for i in range(settings.PROJECT_STATS_WEEKS)
+    ]
+    return {
+        "total": 0,
+        "open": 0,
+        "closed": 0,
+        "overdue": 0,
+        "by_status": {},
+        "by_priority": {},
+        "by_assignee": {},
+        "weekly": {week: {"created": 0, "closed": 0} for week in weeks},
+    }
+
+
+def compute_project_stats(project_ids):
+    """
+    Считает статистику задач проектов по сводке и трём агрегатным запросам.
+
+    Args:
+        project_ids (list): ID проектов
+
+    Returns:
+        dict: ID проекта -> статистика
+    """
+    now = timezone.now()
+    today = timezone.localdate(now)
+    first_monday = today - timedelta(
+        days=today.weekday(), weeks=settings.PROJECT_STATS_WEEKS - 1
+    )
+    since = timezone.make_aware(datetime.combine(first_monday, time.min))
+    closed_ids = settings.TASK_CLOSED_STATUS_IDS
+    result = {pk: _empty_stats(since) for pk in project_ids}
+    tasks = Task.objects.filter(project_id__in=project_ids).order_by()
+
+    for row in summary_buckets(project_ids):
+        stats = result[row["project_id"]]
+        count = row["count"]
+        stats["total"] += count
+        stats["closed" if row["status_id"] in closed_ids else "open"] += count
+        for key, value in (
+            ("by_status", row["status_id"]),
+            ("by_priority", row["priority_id"]),
+            ("by_assignee", row["assignee_id"]),
+        ):
+            bucket = str(value) if value is not None else "none"
+            stats[key][bucket] = stats[key].get(bucket, 0) + count
+
+    overdue = (
+        tasks.filter(due_date__lt=now)
+        .exclude(status_id__in=closed_ids)
+        .values("project_id")
+        .annotate(count=Count("id"))
+    )
+    for row in overdue:
+        result[row["project_id"]]["overdue"] = row["count"]
+
+    for field, key in (("created_at", "created"), ("closed_at", "closed")):
+        weekly = (
+            tasks.filter(**{f"{field}__gte": since})
+            .annotate(week=TruncWeek(field))
+            .values("project_id", "week")
+            .annotate(count=Count("id"))
+        )
+        for row in weekly:
+            week = timezone.localtime(row["week"]).date().isoformat()
+            bucket = result[row["project_id"]]["weekly"].get(week)
+            if bucket is not None:
+                bucket[key] += row["count"]
+
+    for stats in result.values():
+        stats["weekly"] = [
+            {"week": week, **counts} for week, counts in stats["weekly"].items()
+        ]
+    return result
+
+
+def get_project_stats(projects):
+    """
+    Возвращает статистику проектов из кэша, досчитывая отсутствующие.
+
+    Args:
+        projects (list): Проекты (с актуальным tasks_version)
+
+    Returns:
+        dict: ID проекта -> статистика
+    """
+    keys = {_cache_key(project): project.pk for project in projects}
+
+    def compute(missing):
+        computed = compute_project_stats([keys[key] for key in missing])
+        return {key: computed[keys[key]] for key in missing if keys[key] in computed}
+
+    cached = cache.get_or_set_many(
+        list(keys), compute, settings.PROJECT_STATS_CACHE_SECONDS
+    )
+    return {keys[key]: value for key, value in cached.items()}
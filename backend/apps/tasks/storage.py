@@ -0,0 +1,250 @@
+"""
+Хранилище вложений с дедупликацией по содержимому.
+
+Каждый файл хэшируется (SHA-256) во время записи и сохраняется один раз
+по пути blobs/<aa>/<bb>/<digest>. Учёт ссылок ведётся в модели
+AttachmentBlob: счётчик ref_count меняется сигналами Comment, а блобы
+без ссылок удаляет сборщик мусора после периода ожидания.
+"""
+
+import hashlib
+import os
+import tempfile
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, storages
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from config.thumbnails import forget_thumbnails, thumbnail_name
+
+BLOB_PREFIX = "blobs/"
+CHUNK_SIZE = 64 * 1024
+
+
+def attachment_storage():
+    """
+    Возвращает хранилище для вложений комментариев из STORAGES["attachments"].
+
+    Returns:
+        Storage: Экземпляр хранилища
+    """
+    return storages["attachments"]
+
+
+def blob_name(digest):
+    """
+    Возвращает путь блоба относительно корня хранилища.
+
+    Args:
+        digest (str): SHA-256 содержимого в hex
+
+    Returns:
+        str: Путь вида blobs/ab/cd/<digest>
+    """
+    return f"{BLOB_PREFIX}{digest[:2]}/{digest[2:4]}/{digest}"
+
+
+def digest_from_name(name):
+    """
+    Извлекает хэш из пути блоба.
+
+    Args:
+        name (str): Имя файла в хранилище
+
+    Returns:
+        str | None: SHA-256 или None, если файл лежит вне хранилища блобов
+    """
+    if not name or not name.startswith(BLOB_PREFIX):
+        return None
+    return name.rsplit("/", 1)[-1]
+
+
+def _blob_model():
+    return apps.get_model("tasks", "AttachmentBlob")
+
+
+class DeduplicatedStorage(FileSystemStorage):
+    """
+    Файловое хранилище, сохраняющее одинаковое содержимое один раз.
+
+    Имя, переданное при сохранении, игнорируется: итоговое имя файла
+    определяется хэшем содержимого. Исходное имя хранит модель,
+    ссылающаяся на файл (Comment.attachment_name).
+    """
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        tmp_dir = self.path(f"{BLOB_PREFIX}tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        hasher = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                for chunk in content.chunks(CHUNK_SIZE):
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    fh.write(chunk)
+                    hasher.update(chunk)
+                    size += len(chunk)
+            return self.adopt_file(tmp_path, hasher.hexdigest(), size)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def adopt_file(self, path, digest=None, size=None):
+        """
+        Перемещает локальный файл в хранилище блобов.
+
+        Если блоб с таким содержимым уже есть, файл удаляется, а возвращается
+        имя существующего блоба. Файл должен находиться в той же файловой
+        системе, что и MEDIA_ROOT, чтобы перемещение было переименованием.
+
+        Args:
+            path (str): Абсолютный путь к файлу
+            digest (str): SHA-256 содержимого (считается, если не передан)
+            size (int): Размер файла в байтах
+
+        Returns:
+            str: Имя блоба в хранилище
+        """
+        if digest is None:
+            digest = file_digest(path)
+        if size is None:
+            size = os.path.getsize(path)
+        with transaction.atomic():
+            name = self.reserve_blob(digest, size)
+            full_path = self.path(name)
+            if os.path.exists(full_path):
+                os.remove(path)
+            else:
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                os.replace(path, full_path)
+        return name
+
+    def reserve_blob(self, digest, size):
+        """
+        Создаёт или блокирует запись блоба до появления файла.
+
+        Запись нужна до сохранения ссылающегося комментария, чтобы сигнал
+        увеличил ref_count существующего блоба. Вызывается в транзакции.
+
+        Args:
+            digest (str): SHA-256 содержимого
+            size (int): Размер файла в байтах
+
+        Returns:
+            str: Имя блоба в хранилище
+        """
+        blob, _ = (
+            _blob_model()
+            .objects.select_for_update()
+            .get_or_create(digest=digest, defaults={"size": size})
+        )
+        # Обновление updated_at откладывает сборку мусора для нового блоба
+        blob.save(update_fields=["updated_at"])
+        return blob_name(digest)
+
+    def delete(self, name):
+        # Блобы удаляет только сборщик мусора, когда на них не осталось ссылок
+        if digest_from_name(name):
+            return
+        super().delete(name)
+
+
+def file_digest(path):
+    """
+    Считает SHA-256 файла, читая его блоками.
+
+    Args:
+        path (str): Путь к файлу
+
+    Returns:
+        str: SHA-256 в hex
+    """
+    hasher = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(CHUNK_SIZE), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def change_ref_count(name, delta):
+    """
+    Изменяет счётчик ссылок блоба атомарным UPDATE.
+
+    Args:
+        name (str): Имя файла в хранилище
+        delta (int): Изменение счётчика (+1 или -1)
+    """
+    digest = digest_from_name(name)
+    if digest:
+        _blob_model().objects.filter(digest=digest).update(
+            ref_count=F("ref_count") + delta, updated_at=timezone.now()
+        )
+
+
+def collect_garbage(grace=None, batch_size=500):
+    """
+    Удаляет блобы без ссылок, не использовавшиеся дольше периода ожидания.
+
+    Строки блокируются через SELECT ... FOR UPDATE SKIP LOCKED, поэтому
+    одновременное сохранение такого же файла (adopt_file) либо дождётся
+    удаления и запишет файл заново, либо сборщик пропустит блоб. Перед
+    удалением наличие ссылок перепроверяется по индексам Comment.attachment
+    и ArchivedComment.attachment: архивация не меняет счётчик, и файл
+    архивного вложения нужен при восстановлении задачи.
+
+    Args:
+        grace (timedelta): Период ожидания после обнуления счётчика
+        batch_size (int): Количество блобов в одной транзакции
+
+    Returns:
+        dict: Количество удалённых блобов и освобождённых байт
+    """
+    if grace is None:
+        grace = timedelta(hours=settings.ATTACHMENT_BLOB_GC_GRACE_HOURS)
+    AttachmentBlob = _blob_model()
+    Comment = apps.get_model("tasks", "Comment")
+    ArchivedComment = apps.get_model("tasks", "ArchivedComment")
+    storage = attachment_storage()
+    deleted = 0
+    reclaimed = 0
+    while True:
+        with transaction.atomic():
+            blobs = list(
+                AttachmentBlob.objects.select_for_update(skip_locked=True).filter(
+                    ref_count__lte=0, updated_at__lt=timezone.now() - grace
+                )[:batch_size]
+            )
+            orphans = []
+            for blob in blobs:
+                name = blob_name(blob.digest)
+                referenced = (
+                    Comment.objects.filter(attachment=name).count()
+                    + ArchivedComment.objects.filter(attachment=name).count()
+                )
+                if referenced:
+                    # Счётчик разошёлся с данными: исправляем и не удаляем
+                    blob.ref_count = referenced
+                    blob.save(update_fields=["ref_count", "updated_at"])
+                    continue
+                for size in settings.THUMBNAIL_SIZES["preview"]:
+                    storage.delete(thumbnail_name(name, size))
+                forget_thumbnails(storage, name)
+                path = storage.path(name)
+                if os.path.exists(path):
+                    os.remove(path)
+                reclaimed += blob.size
+                orphans.append(blob.pk)
+            AttachmentBlob.objects.filter(pk__in=orphans).delete()
+        deleted += len(orphans)
+        if len(blobs) < batch_size:
+            break
+    return {"deleted": deleted, "reclaimed_bytes": reclaimed}
@@ -0,0 +1,168 @@
+"""
+Сводка количества задач по проектам, статусам, приоритетам и исполнителям.
+
+При создании, удалении задачи и изменении её проекта, статуса, приоритета
+или исполнителя счётчики соответствующих корзин меняются в той же транзакции
+одним INSERT ... ON CONFLICT DO UPDATE на корзину. Перед этим сигнал
+блокирует строку проекта (bump_tasks_version), поэтому изменения задач
+проекта и сверка (reconcile_project_summary) выполняются последовательно.
+Корзины обновляются в отсортированном порядке, чтобы встречные переносы
+задач не приводили к взаимным блокировкам.
+"""
+
+from django.db import connection, transaction
+from django.db.models import Count
+
+from .models import Project, ProjectTaskSummary, Task
+
+BUCKET_FIELDS = ("project_id", "status_id", "priority_id", "assignee_id")
+
+
+def task_bucket(task):
+    """
+    Возвращает корзину задачи.
+
+    Args:
+        task (Task): Задача
+
+    Returns:
+        tuple: (project_id, status_id, priority_id, assignee_id)
+    """
+    return tuple(getattr(task, field) for field in BUCKET_FIELDS)
+
+
+def apply_summary_deltas(deltas):
+    """
+    Применяет изменения счётчиков корзин.
+
+    Args:
+        deltas (dict): Корзина -> изменение количества
+    """
+    changes = sorted(
+        ((bucket, delta) for bucket, delta in deltas.items() if delta),
+        key=lambda item: tuple(-1 if v is None else v for v in item[0]),
+    )
+    if not changes:
+        return
+    table = ProjectTaskSummary._meta.db_table
+    with connection.cursor() as cursor:
+        for (project_id, status_id, priority_id, assignee_id), delta in changes:
+            cursor.execute(
+                f"INSERT INTO {table} "
+                "(project_id, status_id, priority_id, assignee_id, count) "
+                "VALUES (%s, %s, %s, %s, %s) "
+                "ON CONFLICT (project_id, status_id, priority_id, assignee_id) "
+                f"DO UPDATE SET count = {table}.count + EXCLUDED.count",
+                [project_id, status_id, priority_id, assignee_id, delta],
+            )
+
+
+def move_table_summary(task_ids, table, sign):
+    """
+    Изменяет сводку проектов на количество задач таблицы по корзинам.
+
+    Используется при переносе и удалении задач запросами без сигналов.
+
+    Args:
+        task_ids (list): ID задач
+        table (str): Таблица, в которой сейчас находятся задачи
+        sign (int): +1 — задачи добавляются в сводку, -1 — убираются
+    """
+    columns = ", ".join(BUCKET_FIELDS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT {columns}, COUNT(*) FROM {table} "
+            f"WHERE id = ANY(%s) GROUP BY {columns}",
+            [task_ids],
+        )
+        deltas = {tuple(row[:4]): sign * row[4] for row in cursor.fetchall()}
+    apply_summary_deltas(deltas)
+
+
+def task_moved(previous, current):
+    """
+    Формирует изменения счётчиков при переходе задачи между корзинами.
+
+    Args:
+        previous (tuple | None): Прежняя корзина (None — задача создана)
+        current (tuple | None): Новая корзина (None — задача удалена)
+
+    Returns:
+        dict: Корзина -> изменение количества
+    """
+    deltas = {}
+    if previous == current:
+        return deltas
+    if previous is not None:
+        deltas[previous] = deltas.get(previous, 0) - 1
+    if current is not None:
+        deltas[current] = deltas.get(current, 0) + 1
+    return deltas
+
+
+def summary_buckets(project_ids):
+    """
+    Возвращает ненулевые корзины проектов.
+
+    Args:
+        project_ids (list): ID проектов
+
+    Returns:
+        QuerySet: Словари с полями корзины и count
+    """
+    return (
+        ProjectTaskSummary.objects.filter(project_id__in=project_ids)
+        .exclude(count=0)
+        .values(*BUCKET_FIELDS, "count")
+    )
+
+
+def reconcile_project_summary(project_id):
+    """
+    Сверяет сводку проекта с задачами и исправляет расхождения.
+
+    Args:
+        project_id (int): ID проекта
+
+    Returns:
+        int: Количество исправленных корзин
+    """
+    with transaction.atomic():
+        # Блокировка проекта ждёт завершения транзакций, меняющих его задачи
+        if not Project.objects.select_for_update().filter(pk=project_id).exists():
+            return 0
+        actual = {
+            tuple(row[f] for f in BUCKET_FIELDS): row["total"]
+            for row in Task.objects.filter(project_id=project_id)
+            .order_by()
+            .values(*BUCKET_FIELDS)
+            .annotate(total=Count("id"))
+        }
+        stored = {
+            tuple(row[f] for f in BUCKET_FIELDS): row["count"]
+            for row in ProjectTaskSummary.objects.filter(project_id=project_id).values(
+                *BUCKET_FIELDS, "count"
+            )
+        }
+        deltas = {
+            bucket: actual.get(bucket, 0) - stored.get(bucket, 0)
+            for bucket in actual.keys() | stored.keys()
+        }
+        fixed = sum(1 for delta in deltas.values() if delta)
+        apply_summary_deltas(deltas)
+        ProjectTaskSummary.objects.filter(project_id=project_id, count=0).delete()
+    return fixed
+
+
+def reconcile_all_summaries():
+    """
+    Сверяет сводки всех проектов, каждый в отдельной короткой транзакции.
+
+    Returns:
+        dict: Количество проверенных проектов и исправленных корзин
+    """
+    checked = fixed = 0
+    for project_id in Project.objects.order_by("pk").values_list("pk", flat=True):
+        fixed += reconcile_project_summary(project_id)
+        checked += 1
+    return {"projects": checked, "fixed_buckets": fixed}
@@ -0,0 +1,205 @@
+"""
+Синхронизация изменений задач и комментариев по курсору.
+
+Каждое сохранение Task и Comment записывает в строку идентификатор
+транзакции (change_xid), а удаление — запись Tombstone. Курсор содержит
+снимок Postgres (pg_current_snapshot) на момент ответа. Следующий запрос
+возвращает строки, изменённые транзакциями, которые не были видны в этом
+снимке. Поэтому транзакция, начатая раньше, а зафиксированная позже ответа,
+не потеряется. Поиск — диапазон по индексу change_xid от xmin снимка.
+
+Курсор живёт не дольше срока хранения записей об удалении
+(SYNC_TOMBSTONE_RETENTION_DAYS). С устаревшим курсором клиент получает 410
+и должен загрузить данные заново с changed_since=0.
+"""
+
+import re
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, models, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+
+from .models import CurrentTransactionId, Project, Tombstone
+
+SNAPSHOT_RE = re.compile(r"^\d+:\d+:(\d+(,\d+)*)?$")
+
+
+class CursorExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = "Курсор устарел, загрузите данные заново с changed_since=0"
+    default_code = "cursor_expired"
+
+
+class VisibleInSnapshot(models.Func):
+    """
+    Проверяет, зафиксирована ли транзакция до снимка (pg_visible_in_snapshot).
+
+    Принимает столбец с идентификатором транзакции и текст снимка.
+    """
+
+    function = "pg_visible_in_snapshot"
+    arg_joiner = "::text::xid8, "
+    template = "%(function)s(%(expressions)s::pg_snapshot)"
+    output_field = models.BooleanField()
+
+
+def current_cursor():
+    """
+    Возвращает курсор для текущего момента.
+
+    Returns:
+        str: Курсор вида <unix time>-<снимок Postgres>
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_current_snapshot()::text")
+        snapshot = cursor.fetchone()[0]
+    return f"{int(time.time())}-{snapshot}"
+
+
+def parse_cursor(value):
+    """
+    Разбирает курсор из параметра changed_since.
+
+    Args:
+        value (str): Значение параметра
+
+    Returns:
+        str | None: Снимок Postgres или None для полной выгрузки (changed_since=0)
+
+    Raises:
+        ValidationError: Если курсор некорректен
+        CursorExpired: Если курсор старше срока хранения записей об удалении
+    """
+    if value == "0":
+        return None
+    issued, _, snapshot = value.partition("-")
+    if not issued.isdigit() or not SNAPSHOT_RE.match(snapshot):
+        raise ValidationError({"changed_since": "Некорректный курсор"})
+    retention = timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    if time.time() - int(issued) > retention.total_seconds():
+        raise CursorExpired()
+    return snapshot
+
+
+def changed_after(queryset, snapshot, field="change_xid"):
+    """
+    Оставляет строки, изменённые транзакциями, не видимыми в снимке.
+
+    Args:
+        queryset (QuerySet): Исходный queryset
+        snapshot (str): Снимок из курсора
+        field (str): Поле с идентификатором транзакции
+
+    Returns:
+        QuerySet: Отфильтрованный queryset
+    """
+    xmin = int(snapshot.split(":", 1)[0])
+    return (
+        queryset.filter(**{f"{field}__gte": xmin})
+        .alias(_seen=VisibleInSnapshot(field, models.Value(snapshot)))
+        .filter(_seen=False)
+    )
+
+
+def visible_tombstones(user, kind):
+    """
+    Возвращает записи об удалении, видимые пользователю.
+
+    Правило совпадает с видимостью задач: администраторы видят всё,
+    остальные — объекты своих проектов и созданных ими задач.
+    """
+    tombstones = Tombstone.objects.filter(kind=kind)
+    if user.is_superuser or user.is_staff:
+        return tombstones
+    projects = Project.objects.filter(members=user).values("id")
+    return tombstones.filter(
+        models.Q(project_id__in=projects) | models.Q(creator_id=user.pk)
+    )
+
+
+def record_tombstone(kind, object_id, task):
+    """
+    Создаёт запись об удалении в транзакции удаления.
+
+    Args:
+        kind (str): Тип объекта (Tombstone.Kind)
+        object_id (int): ID удалённого объекта
+        task (Task): Задача (удалённая или родительская)
+    """
+    Tombstone.objects.create(
+        kind=kind,
+        object_id=object_id,
+        task_id=task.pk,
+        project_id=task.project_id,
+        creator_id=task.creator_id,
+        deleted_xid=CurrentTransactionId(),
+    )
+
+
+def purge_tombstones(max_age=None, batch_size=5000):
+    """
+    Удаляет записи об удалении старше срока хранения.
+
+    Args:
+        max_age (timedelta): Срок хранения
+        batch_size (int): Количество строк в одном DELETE
+
+    Returns:
+        int: Количество удалённых записей
+    """
+    if max_age is None:
+        max_age = timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    expired = Tombstone.objects.filter(deleted_at__lt=timezone.now() - max_age)
+    total = 0
+    while True:
+        ids = list(expired.values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return total
+        total += Tombstone.objects.filter(pk__in=ids).delete()[0]
+
+
+class ChangedSinceMixin:
+    """
+    Добавляет в list() синхронизацию по параметру changed_since.
+
+    Ответ: {"cursor": ..., "results": [...], "deleted": [id, ...]}.
+    changed_since=0 возвращает все строки и начальный курсор.
+    Наследник задаёт tombstone_kind и может сузить записи об удалении
+    в filter_tombstones().
+    """
+
+    tombstone_kind = None
+
+    def filter_tombstones(self, tombstones):
+        return tombstones
+
+    def list(self, request, *args, **kwargs):
+        value = request.query_params.get("changed_since")
+        if value is None:
+            return super().list(request, *args, **kwargs)
+        snapshot = parse_cursor(value)
+        with transaction.atomic():
+            # Снимок берётся до выборки: всё, что зафиксировано позже,
+            # вернётся в следующем запросе
+            cursor = current_cursor()
+            queryset = self.filter_queryset(self.get_queryset())
+            deleted = []
+            if snapshot is not None:
+                queryset = changed_after(queryset, snapshot)
+                tombstones = self.filter_tombstones(
+                    visible_tombstones(request.user, self.tombstone_kind)
+                )
+                deleted = sorted(
+                    set(
+                        changed_after(tombstones, snapshot, "deleted_xid").values_list(
+                            "object_id", flat=True
+                        )
+                    )
+                )
+            results = self.get_serializer(queryset, many=True).data
+        return Response({"cursor": cursor, "results": results, "deleted": deleted})
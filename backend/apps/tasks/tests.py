@@ -231,7 +231,8 @@ def test_project_viewset_crud_and_permissions():
     request = factory.delete(f"/projects/{project_id}/")
     force_authenticate(request, user=admin)
     response = view(request, pk=project_id)
-    assert response.status_code == 204
+    assert response.status_code == 202
+    assert not Project.objects.filter(pk=project_id).exists()
     view = ProjectViewSet.as_view({"post": "create"})
     request = factory.post("/projects/", {"name": "P2", "code": "P2"})
     force_authenticate(request, user=user)
@@ -641,3 +642,1486 @@ def test_comment_serializer_create_request_without_user():
     assert serializer.is_valid(), serializer.errors
     with pytest.raises(IntegrityError):
         serializer.save()
+
+
+def _comment_with_attachment(settings, tmp_path, user, content=b"0123456789"):
+    from django.core.files.uploadedfile import SimpleUploadedFile
+
+    settings.MEDIA_ROOT = tmp_path
+    project = Project.objects.create(name="Test Project", code="PRJ")
+    project.members.add(user)
+    status = Status.objects.create(name="Open")
+    priority = Priority.objects.create(level="Low")
+    task = Task.objects.create(
+        title="Task", project=project, status=status, priority=priority, creator=user
+    )
+    return Comment.objects.create(
+        task=task,
+        author=user,
+        text="C",
+        attachment=SimpleUploadedFile("build.log", content),
+    )
+
+
+@pytest.mark.django_db
+def test_attachment_download_signed_url_and_range(client, settings, tmp_path):
+    settings.MEDIA_ACCEL_REDIRECT_PREFIX = ""
+    user = User.objects.create(username="user1", email="u1@test.com")
+    comment = _comment_with_attachment(settings, tmp_path, user)
+    request = APIRequestFactory().get("/comments/")
+    request.user = user
+    data = CommentSerializer(comment, context={"request": request}).data
+    url = data["attachment_url"]
+    assert "token=" in url
+    response = client.get(url)
+    assert response.status_code == 200
+    assert b"".join(response.streaming_content) == b"0123456789"
+    assert response["Accept-Ranges"] == "bytes"
+    assert "private" in response["Cache-Control"]
+    response = client.get(url, HTTP_RANGE="bytes=2-5")
+    assert response.status_code == 206
+    assert response["Content-Range"] == "bytes 2-5/10"
+    assert b"".join(response.streaming_content) == b"2345"
+    response = client.get(url, HTTP_RANGE="bytes=20-")
+    assert response.status_code == 416
+    response = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == 304
+
+
+@pytest.mark.django_db
+def test_attachment_download_accel_redirect_and_visibility(client, settings, tmp_path):
+    settings.MEDIA_ACCEL_REDIRECT_PREFIX = "/protected-media/"
+    user = User.objects.create(username="user1", email="u1@test.com")
+    outsider = User.objects.create(username="user2", email="u2@test.com")
+    comment = _comment_with_attachment(settings, tmp_path, user)
+    url = reverse("attachment-download", kwargs={"pk": comment.pk})
+    assert client.get(url).status_code == 401
+    response = client.get(url, {"token": "bad"})
+    assert response.status_code == 401
+    from apps.tasks.downloads import sign_download
+
+    response = client.get(url, {"token": sign_download(user, comment)})
+    assert response.status_code == 200
+    assert response["X-Accel-Redirect"] == (
+        f"/protected-media/{comment.attachment.name}"
+    )
+    assert "build" in response["Content-Disposition"]
+    response = client.get(url, {"token": sign_download(outsider, comment)})
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_chunked_upload_resume_and_finalize(settings, tmp_path):
+    import hashlib
+
+    settings.MEDIA_ROOT = tmp_path
+    settings.ATTACHMENT_UPLOAD_CHUNK_SIZE = 4
+    user = User.objects.create(username="user1", email="u1@test.com")
+    project = Project.objects.create(name="Test Project", code="PRJ")
+    project.members.add(user)
+    status = Status.objects.create(name="Open")
+    priority = Priority.objects.create(level="Low")
+    task = Task.objects.create(
+        title="Task", project=project, status=status, priority=priority, creator=user
+    )
+    content = b"0123456789"
+    digest = hashlib.sha256(content).hexdigest()
+    client = APIClient()
+    client.force_authenticate(user=user)
+    response = client.post(
+        "/api/tasks/uploads/",
+        {
+            "task_issue_id": task.issue_id,
+            "filename": "../build.log",
+            "size": len(content),
+            "sha256": digest,
+        },
+        format="json",
+    )
+    assert response.status_code == 201, response.data
+    assert response.data["filename"] == "build.log"
+    url = f"/api/tasks/uploads/{response.data['id']}/"
+
+    def put(offset, chunk):
+        return client.put(
+            url,
+            data=chunk,
+            content_type="application/octet-stream",
+            HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    assert put(0, content[:4]).data["offset"] == 4
+    conflict = put(0, content[:4])
+    assert conflict.status_code == 409
+    assert conflict.data["offset"] == 4
+    assert put(4, content[4:10]).status_code == 400
+    assert put(4, content[4:8]).data["offset"] == 8
+    assert client.post(url + "finalize/", {}, format="json").status_code == 400
+    assert client.get(url).data["offset"] == 8
+    assert put(8, content[8:]).data["offset"] == 10
+    response = client.post(url + "finalize/", {"text": "logs"}, format="json")
+    assert response.status_code == 201, response.data
+    comment = Comment.objects.get(pk=response.data["id"])
+    assert comment.text == "logs"
+    assert comment.attachment.name == f"blobs/{digest[:2]}/{digest[2:4]}/{digest}"
+    assert comment.attachment_name == "build.log"
+    with comment.attachment.open("rb") as fh:
+        assert fh.read() == content
+    from apps.tasks.models import AttachmentBlob
+
+    assert AttachmentBlob.objects.get(digest=digest).ref_count == 1
+    assert client.get(url).status_code == 404
+
+
+@pytest.mark.django_db
+def test_chunked_upload_checksum_mismatch_and_access(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    user = User.objects.create(username="user1", email="u1@test.com")
+    outsider = User.objects.create(username="user2", email="u2@test.com")
+    project = Project.objects.create(name="Test Project", code="PRJ")
+    status = Status.objects.create(name="Open")
+    priority = Priority.objects.create(level="Low")
+    task = Task.objects.create(
+        title="Task", project=project, status=status, priority=priority, creator=user
+    )
+    client = APIClient()
+    client.force_authenticate(user=outsider)
+    data = {"task_id": task.id, "filename": "a.txt", "size": 3, "sha256": "0" * 64}
+    response = client.post("/api/tasks/uploads/", data, format="json")
+    assert response.status_code == 403
+    client.force_authenticate(user=user)
+    response = client.post("/api/tasks/uploads/", data, format="json")
+    url = f"/api/tasks/uploads/{response.data['id']}/"
+    client.put(
+        url,
+        data=b"abc",
+        content_type="application/octet-stream",
+        HTTP_UPLOAD_OFFSET="0",
+    )
+    response = client.post(url + "finalize/", {}, format="json")
+    assert response.status_code == 400
+    assert client.delete(url).status_code == 204
+    assert not (tmp_path / "uploads").exists() or not any(
+        (tmp_path / "uploads").iterdir()
+    )
+
+
+@pytest.mark.django_db
+def test_deduplicated_attachments_refcount_and_gc(settings, tmp_path):
+    from datetime import timedelta
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from apps.tasks.models import AttachmentBlob
+    from apps.tasks.storage import collect_garbage
+
+    first = _comment_with_attachment(
+        settings, tmp_path, User.objects.create(username="user1", email="u1@test.com")
+    )
+    second = Comment.objects.create(
+        task=first.task,
+        author=first.author,
+        text="C2",
+        attachment=SimpleUploadedFile("copy.log", b"0123456789"),
+    )
+    assert first.attachment.name == second.attachment.name
+    assert second.attachment_name == "copy.log"
+    blob = AttachmentBlob.objects.get()
+    assert blob.ref_count == 2
+    blob_files = [p for p in (tmp_path / "blobs").rglob("*") if p.is_file()]
+    assert len(blob_files) == 1
+    first.delete()
+    blob.refresh_from_db()
+    assert blob.ref_count == 1
+    assert collect_garbage(grace=timedelta(0))["deleted"] == 0
+    second.delete()
+    blob.refresh_from_db()
+    assert blob.ref_count == 0
+    stats = collect_garbage(grace=timedelta(0))
+    assert stats == {"deleted": 1, "reclaimed_bytes": 10}
+    assert not AttachmentBlob.objects.exists()
+    assert not blob_files[0].exists()
+
+    # Ссылка из архива удерживает блоб, даже если счётчик разошёлся
+    from django.db import transaction
+
+    from apps.tasks.archive import archive_tasks
+    from apps.tasks.models import ArchivedComment
+
+    archived = Comment.objects.create(
+        task=first.task,
+        author=first.author,
+        text="C3",
+        attachment=SimpleUploadedFile("archived.log", b"0123456789"),
+    )
+    with transaction.atomic():
+        assert archive_tasks([first.task.pk]) == 1
+    assert ArchivedComment.objects.get().attachment == archived.attachment.name
+    AttachmentBlob.objects.update(ref_count=0)
+    assert collect_garbage(grace=timedelta(0))["deleted"] == 0
+    assert AttachmentBlob.objects.get().ref_count == 1
+    assert archived.attachment.storage.exists(archived.attachment.name)
+
+
+@pytest.mark.django_db
+def test_dedupe_attachments_command(settings, tmp_path):
+    from apps.tasks.models import AttachmentBlob
+
+    comment = _comment_with_attachment(
+        settings, tmp_path, User.objects.create(username="user1", email="u1@test.com")
+    )
+    legacy = tmp_path / "task_attachments"
+    legacy.mkdir()
+    for name in ("a.log", "b.log"):
+        (legacy / name).write_bytes(b"0123456789")
+        other = Comment.objects.create(
+            task=comment.task, author=comment.author, text=name
+        )
+        Comment.objects.filter(pk=other.pk).update(
+            attachment=f"task_attachments/{name}"
+        )
+    call_command("dedupe_attachments", "--dry-run")
+    assert (legacy / "a.log").exists()
+    call_command("dedupe_attachments")
+    assert not any(legacy.iterdir())
+    names = set(
+        Comment.objects.exclude(attachment="").values_list("attachment", flat=True)
+    )
+    assert names == {comment.attachment.name}
+    assert AttachmentBlob.objects.get().ref_count == 3
+    assert Comment.objects.get(text="b.log").attachment_name == "b.log"
+
+
+@pytest.mark.django_db
+def test_image_attachment_preview(
+    client, settings, tmp_path, django_capture_on_commit_callbacks
+):
+    import io
+    from PIL import Image
+
+    settings.MEDIA_ACCEL_REDIRECT_PREFIX = ""
+    settings.THUMBNAIL_WORKERS = 0
+    buffer = io.BytesIO()
+    Image.new("RGB", (1200, 800), "blue").save(buffer, "PNG")
+    user = User.objects.create(username="user1", email="u1@test.com")
+    with django_capture_on_commit_callbacks(execute=True):
+        comment = _comment_with_attachment(
+            settings, tmp_path, user, content=buffer.getvalue()
+        )
+    request = APIRequestFactory().get("/comments/")
+    request.user = user
+    data = CommentSerializer(comment, context={"request": request}).data
+    assert data["attachment_preview_url"] is None  # вложение build.log — не картинка
+
+    with django_capture_on_commit_callbacks(execute=True):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        image = Comment.objects.create(
+            task=comment.task,
+            author=user,
+            text="screenshot",
+            attachment=SimpleUploadedFile("shot.png", buffer.getvalue()),
+        )
+    data = CommentSerializer(image, context={"request": request}).data
+    assert "variant=preview" in data["attachment_preview_url"]
+    response = client.get(data["attachment_preview_url"])
+    assert response.status_code == 200
+    assert response["Content-Type"] == "image/webp"
+    assert response["Content-Disposition"].startswith("inline")
+    preview = b"".join(response.streaming_content)
+    assert len(preview) < len(buffer.getvalue())
+    with Image.open(io.BytesIO(preview)) as im:
+        assert max(im.size) == 320
+
+
+def _events_fixture():
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    status = Status.objects.create(name="Open")
+    priority = Priority.objects.create(level="Low")
+    user = User.objects.create(username="user1", email="u1@test.com")
+    other = User.objects.create(username="user2", email="u2@test.com")
+    visible = Project.objects.create(name="Visible", code="VIS")
+    hidden = Project.objects.create(name="Hidden", code="HID")
+    visible.members.add(user)
+
+    def create_task(project, creator=other):
+        return Task.objects.create(
+            title="Task",
+            project=project,
+            status=status,
+            priority=priority,
+            creator=creator,
+        )
+
+    return user, visible, hidden, create_task, str(AccessToken.for_user(user))
+
+
+@pytest.mark.django_db(transaction=True)
+def test_task_events_delivered_through_notify():
+    import queue
+
+    from apps.tasks.events import Subscriber, hub, visible_project_ids
+
+    user, visible, hidden, create_task, _ = _events_fixture()
+    subscriber = Subscriber(user, visible_project_ids(user))
+    hub.subscribe(subscriber)
+    try:
+        assert hub._listener.listening.wait(5)
+        create_task(hidden)
+        own = create_task(hidden, creator=user)
+        task = create_task(visible)
+        Comment.objects.create(task=task, author=user, text="hi")
+        task_pk = task.pk
+        task.delete()
+        task.pk = task_pk
+
+        events = [subscriber.queue.get(timeout=5) for _ in range(4)]
+        assert [(e["type"], e.get("task_id", e["id"])) for e in events] == [
+            ("task.created", own.pk),
+            ("task.created", task.pk),
+            ("comment.created", task.pk),
+            ("task.deleted", task.pk),
+        ]
+        with pytest.raises(queue.Empty):
+            subscriber.queue.get(timeout=0.3)
+    finally:
+        hub.unsubscribe(subscriber)
+        hub.stop()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_task_events_asgi_stream():
+    import asyncio
+
+    from asgiref.sync import async_to_sync, sync_to_async
+    from django.test import AsyncClient
+
+    from apps.tasks.events import hub
+
+    user, visible, hidden, create_task, token = _events_fixture()
+    url = reverse("task-events")
+
+    async def scenario():
+        client = AsyncClient()
+        response = await client.get(url)
+        assert response.status_code == 401
+
+        response = await client.get(url, {"token": token})
+        assert response.status_code == 401
+        response = await client.get(url, {"ticket": "forged"})
+        assert response.status_code == 401
+
+        response = await client.post(
+            reverse("task-events-ticket"),
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        assert response.status_code == 200
+        assert response.json()["expires_in"] == 60
+        response = await client.get(url, {"ticket": response.json()["ticket"]})
+        assert response.status_code == 200
+        assert response["Content-Type"] == "text/event-stream"
+        stream = aiter(response.streaming_content)
+        assert (await anext(stream)).startswith(b"retry:")
+        await sync_to_async(hub._listener.listening.wait)(5)
+        task = await sync_to_async(create_task)(visible)
+        chunk = await asyncio.wait_for(anext(stream), 5)
+        assert chunk.startswith(b"event: task.created\n")
+        assert f'"id": {task.pk}'.encode() in chunk
+        await stream.aclose()
+
+    try:
+        async_to_sync(scenario)()
+    finally:
+        hub.stop()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_changed_since_returns_changes_and_tombstones():
+    from apps.tasks.models import Tombstone
+
+    user, visible, hidden, create_task, _ = _events_fixture()
+    kept, changed, removed = (create_task(visible) for _ in range(3))
+    create_task(hidden)
+    first = Comment.objects.create(task=kept, author=user, text="first")
+    client = APIClient()
+    client.force_authenticate(user)
+
+    response = client.get("/api/tasks/tasks/", {"changed_since": "0"})
+    assert response.status_code == 200
+    assert {t["id"] for t in response.data["results"]} == {
+        kept.pk,
+        changed.pk,
+        removed.pk,
+    }
+    task_cursor = response.data["cursor"]
+    comment_cursor = client.get(
+        "/api/tasks/comments/", {"changed_since": "0", "task": kept.pk}
+    ).data["cursor"]
+
+    changed.title = "Changed"
+    changed.save()
+    removed_pk = removed.pk
+    removed.delete()
+    create_task(hidden).delete()
+    second = Comment.objects.create(task=kept, author=user, text="second")
+    first_pk = first.pk
+    first.delete()
+
+    response = client.get("/api/tasks/tasks/", {"changed_since": task_cursor})
+    # kept изменилась вместе со счётчиком комментариев
+    assert {t["id"] for t in response.data["results"]} == {changed.pk, kept.pk}
+    assert response.data["deleted"] == [removed_pk]
+    response = client.get(
+        "/api/tasks/tasks/", {"changed_since": response.data["cursor"]}
+    )
+    assert response.data["results"] == []
+    assert response.data["deleted"] == []
+
+    response = client.get(
+        "/api/tasks/comments/", {"changed_since": comment_cursor, "task": kept.pk}
+    )
+    assert [c["id"] for c in response.data["results"]] == [second.pk]
+    assert response.data["deleted"] == [first_pk]
+    assert Tombstone.objects.filter(kind="comment").count() == 1
+
+    response = client.get("/api/tasks/tasks/", {"changed_since": "1-10:20:"})
+    assert response.status_code == 410
+    response = client.get("/api/tasks/tasks/", {"changed_since": "garbage"})
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_comment_count_and_last_activity():
+    user, visible, hidden, create_task, _ = _events_fixture()
+    quiet, busy = create_task(visible), create_task(visible)
+    client = APIClient()
+    client.force_authenticate(user)
+
+    for text in ("one", "two"):
+        response = client.post(
+            "/api/tasks/comments/",
+            {"task_id": busy.pk, "text": text},
+            format="multipart",
+        )
+        assert response.status_code == 201
+    busy.refresh_from_db()
+    assert busy.comment_count == 2
+    assert busy.last_activity_at >= busy.updated_at
+
+    response = client.delete(f"/api/tasks/comments/{response.data['id']}/")
+    assert response.status_code == 204
+    busy.refresh_from_db()
+    assert busy.comment_count == 1
+
+    response = client.get("/api/tasks/tasks/", {"ordering": "-last_activity_at"})
+    assert [t["id"] for t in response.data[:2]] == [busy.pk, quiet.pk]
+    assert response.data[0]["comment_count"] == 1
+    response = client.get("/api/tasks/tasks/", {"ordering": "comment_count"})
+    assert response.data[0]["id"] == quiet.pk
+
+    Task.objects.filter(pk=busy.pk).update(comment_count=7, last_activity_at=None)
+    call_command("recount_task_activity", batch_size=1)
+    busy.refresh_from_db()
+    assert busy.comment_count == 1
+    assert busy.last_activity_at == busy.comments.get().created_at
+
+
+@pytest.mark.django_db
+def test_project_stats_cached_per_version(settings, django_assert_num_queries):
+    from datetime import timedelta
+
+    from django.core.cache import cache
+    from django.utils import timezone
+
+    settings.TASK_CLOSED_STATUS_IDS = []
+    user, visible, hidden, create_task, _ = _events_fixture()
+    closed = Status.objects.create(name="Closed")
+    settings.TASK_CLOSED_STATUS_IDS = [closed.pk]
+    first = create_task(visible)
+    first.assignee = user
+    first.due_date = timezone.now() - timedelta(days=1)
+    first.save()
+    done = create_task(visible)
+    done.status = closed
+    done.save()
+    create_task(hidden)
+    cache.clear()
+    client = APIClient()
+    client.force_authenticate(user)
+
+    url = f"/api/tasks/projects/{visible.pk}/stats/"
+    data = client.get(url).data
+    assert (data["total"], data["open"], data["closed"], data["overdue"]) == (
+        2,
+        1,
+        1,
+        1,
+    )
+    assert data["by_status"] == {str(first.status_id): 1, str(closed.pk): 1}
+    assert data["by_assignee"] == {str(user.pk): 1, "none": 1}
+    assert len(data["weekly"]) == settings.PROJECT_STATS_WEEKS
+    assert data["weekly"][-1]["created"] == 2
+    assert data["weekly"][-1]["closed"] == 1
+
+    # Повторный запрос не выполняет агрегатов: только аутентификация и проект
+    with django_assert_num_queries(1):
+        assert client.get(url).data == data
+
+    done.delete()
+    assert client.get(url).data["total"] == 1
+
+    response = client.get("/api/tasks/projects/stats/")
+    assert response.status_code == 200
+    assert set(response.data) == {str(visible.pk)}
+    assert response.data[str(visible.pk)]["closed"] == 0
+    assert client.get(f"/api/tasks/projects/{hidden.pk}/stats/").status_code == 404
+
+
+@pytest.mark.django_db
+def test_project_task_summary_deltas_and_reconcile():
+    from apps.jobs.models import Job
+    from apps.tasks.jobs import reconcile_project_summaries
+    from apps.tasks.models import ProjectTaskSummary
+    from apps.tasks.summary import reconcile_all_summaries
+
+    user, visible, hidden, create_task, _ = _events_fixture()
+
+    def summary():
+        return {
+            (row.project_id, row.status_id, row.assignee_id): row.count
+            for row in ProjectTaskSummary.objects.exclude(count=0)
+        }
+
+    first = create_task(visible)
+    second = create_task(visible)
+    status = first.status
+    assert summary() == {(visible.pk, status.pk, None): 2}
+
+    first.assignee = user
+    first.save()
+    second.project = hidden
+    second.save()
+    assert summary() == {
+        (visible.pk, status.pk, user.pk): 1,
+        (hidden.pk, status.pk, None): 1,
+    }
+    # Сохранение без изменения корзины не трогает сводку
+    first.title = "Renamed"
+    first.save()
+    Task.objects.get(pk=second.pk).delete()
+    assert summary() == {(visible.pk, status.pk, user.pk): 1}
+
+    # Массовые UPDATE обходят сигналы — расхождение исправляет сверка
+    Task.objects.filter(pk=first.pk).update(assignee=None)
+    assert reconcile_all_summaries() == {"projects": 2, "fixed_buckets": 2}
+    assert summary() == {(visible.pk, status.pk, None): 1}
+    assert reconcile_all_summaries()["fixed_buckets"] == 0
+
+    # Удаление статуса переводит задачи в статус по умолчанию без сигналов
+    default = Status.objects.create(pk=1, name="Default")
+    status.delete()
+    queued = Job.objects.get(name=reconcile_project_summaries.name)
+    assert queued.args == [[visible.pk]]
+    reconcile_project_summaries(*queued.args)
+    assert summary() == {(visible.pk, default.pk, None): 1}
+
+
+@pytest.mark.django_db
+def test_task_history_records_diffs_and_paginates():
+    from django.db import connection
+
+    from apps.tasks.history import TABLE
+    from apps.tasks.partitions import list_partitions
+
+    user, visible, hidden, create_task, _ = _events_fixture()
+    task = create_task(visible, creator=user)
+    open_status = task.status_id
+    done = Status.objects.create(name="Done")
+    client = APIClient()
+    client.force_authenticate(user)
+
+    url = f"/api/tasks/tasks/{task.pk}/"
+    edit_url = f"/api/tasks/tasks/{task.issue_id}/?by_issue_id=1"
+    for data in ({"title": "Second"}, {"title": "Third"}, {"status": done.pk}):
+        assert client.patch(edit_url, data, format="json").status_code == 200
+    comment = Comment.objects.create(task=task, author=user, text="draft")
+    comment.text = "final"
+    comment.save()
+    task.refresh_from_db()
+    task.save()  # без изменений — записи нет
+
+    response = client.get(f"{url}history/", {"page_size": 2})
+    assert response.status_code == 200
+    first_page = response.data["results"]
+    assert [row["action"] for row in first_page] == ["updated", "updated"]
+    assert first_page[0]["comment_id"] == comment.pk
+    assert first_page[0]["changes"] == {"text": ["draft", "final"]}
+    assert first_page[1]["changes"] == {"status": [open_status, done.pk]}
+    assert first_page[1]["actor_username"] == user.username
+
+    rows, next_url = list(first_page), response.data["next"]
+    while next_url:
+        page = client.get(next_url).data
+        rows += page["results"]
+        next_url = page["next"]
+    assert [row["action"] for row in rows][-1] == "created"
+    assert len(rows) == 5
+
+    status_changes = client.get(f"{url}history/", {"field": "status"}).data
+    assert len(status_changes["results"]) == 2  # создание и смена статуса
+    project_url = f"/api/tasks/projects/{visible.pk}/history/"
+    assert len(client.get(project_url).data["results"]) == 5
+    assert client.get(project_url, {"since": "bad"}).status_code == 400
+    assert client.get(f"/api/tasks/projects/{hidden.pk}/history/").status_code == 404
+
+    # Удаление QuerySet задач не пишет удаление каждого комментария
+    from django.db import connection as conn
+    from django.test.utils import CaptureQueriesContext
+
+    from apps.tasks.models import TaskChange
+
+    Comment.objects.create(task=task, author=user, text="one more")
+    Task.objects.filter(pk=task.pk).delete()
+    deleted = TaskChange.objects.filter(task_id=task.pk, action="deleted")
+    assert list(deleted.values_list("comment_id", flat=True)) == [None]
+
+    # Для журнала правки комментария задача не загружается целиком
+    other = create_task(visible, creator=user)
+    comment = Comment.objects.get(
+        pk=Comment.objects.create(task=other, author=user, text="a").pk
+    )
+    comment.text = "b"
+    with CaptureQueriesContext(conn) as queries:
+        comment.save(update_fields=["text"])
+    task_queries = [
+        q["sql"] for q in queries.captured_queries if 'FROM "tasks_task"' in q["sql"]
+    ]
+    assert len(task_queries) == 1
+    assert task_queries[0].startswith('SELECT "tasks_task"."project_id" AS')
+
+    # Журнал секционирован по месяцам
+    assert list_partitions(TABLE)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE relname = %s", [TABLE])
+        assert cursor.fetchone()[0] == "p"
+
+
+@pytest.mark.django_db
+def test_comment_partitions_created_and_detached(settings, tmp_path):
+    from datetime import timedelta
+    from io import StringIO
+
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from django.db import connection
+    from django.utils import timezone
+
+    from apps.tasks.models import AttachmentBlob, Tombstone
+    from apps.tasks.partitions import (
+        default_partition,
+        ensure_partitions,
+        is_partitioned,
+        list_partitions,
+        month_start,
+    )
+
+    settings.MEDIA_ROOT = tmp_path
+    table = Comment._meta.db_table
+    assert is_partitioned(table)
+    user, visible, hidden, create_task, _ = _events_fixture()
+    task = create_task(visible)
+    old = Comment.objects.create(
+        task=task,
+        author=user,
+        text="old build log",
+        attachment=SimpleUploadedFile("build.log", b"data"),
+    )
+    Comment.objects.create(task=task, author=user, text="fresh")
+    old_month = month_start(timezone.localdate(), -14)
+    Comment.objects.filter(pk=old.pk).update(
+        created_at=timezone.now() - timedelta(days=430)
+    )
+
+    def rows_in(name):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {name}")
+            return cursor.fetchone()[0]
+
+    # Строка без своей секции лежит в секции по умолчанию и переезжает в новую
+    assert rows_in(default_partition(table)) == 1
+    created = ensure_partitions(table, "created_at", 0, since=old_month)
+    assert rows_in(default_partition(table)) == 0
+    assert rows_in(created[0]) == 1
+    assert old_month in dict(list_partitions(table))
+
+    # Комментарии задачи читаются по индексу (task_id, created_at) каждой секции
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = str(Comment.objects.filter(task=task).explain())
+    assert "Seq Scan" not in plan
+    assert "task_id_created_at_idx" in plan
+
+    call_command(
+        "partition_comments",
+        detach_before=month_start(timezone.localdate(), -1).strftime("%Y-%m"),
+        stdout=StringIO(),
+    )
+    assert list(Comment.objects.values_list("text", flat=True)) == ["fresh"]
+    assert rows_in(created[0]) == 1
+    task.refresh_from_db()
+    assert task.comment_count == 1
+    # Блоб вложения освобождается, клиенты синхронизации узнают об удалении
+    assert AttachmentBlob.objects.get().ref_count == 0
+    tombstone = Tombstone.objects.get(kind="comment", object_id=old.pk)
+    assert (tombstone.task_id, tombstone.project_id) == (task.pk, visible.pk)
+
+
+@pytest.mark.django_db
+def test_archive_closed_tasks_and_restore(settings, monkeypatch):
+    from datetime import timedelta
+
+    from django.utils import timezone
+
+    from apps.jobs.models import Job
+    from apps.tasks.archive import archive_closed_tasks
+    from apps.tasks.jobs import archive_tasks
+    from apps.tasks.models import ArchivedTask, ProjectTaskSummary
+
+    user, visible, hidden, create_task, _ = _events_fixture()
+    done = Status.objects.create(name="Done")
+    settings.TASK_ARCHIVE_STATUS_IDS = [done.pk]
+    settings.TASK_ARCHIVE_AFTER_DAYS = 30
+    old = [create_task(visible) for _ in range(3)]
+    fresh = create_task(visible)
+    for task in old + [fresh]:
+        task.status = done
+        task.save()
+        Comment.objects.create(task=task, author=user, text=f"log {task.pk}")
+    Task.objects.filter(pk__in=[t.pk for t in old]).update(
+        updated_at=timezone.now() - timedelta(days=60)
+    )
+
+    settings.TASK_ARCHIVE_BATCH_SIZE = 2
+    settings.TASK_ARCHIVE_BATCHES_PER_JOB = 1
+    assert archive_tasks() == {"archived": 2, "batches": 1, "more": True}
+    continuation = Job.objects.get(name=archive_tasks.name, status="queued")
+    assert archive_closed_tasks() == {"archived": 1, "batches": 1, "more": False}
+    continuation.delete()
+    assert list(Task.objects.values_list("pk", flat=True)) == [fresh.pk]
+    assert ArchivedTask.objects.count() == 3
+    assert Comment.objects.count() == 1
+    total = sum(ProjectTaskSummary.objects.values_list("count", flat=True))
+    assert total == 1
+    # Новая задача не получает номер задачи из архива
+    assert create_task(visible).issue_id == f"{visible.code}-5"
+
+    client = APIClient()
+    client.force_authenticate(user)
+    archived = old[0]
+    url = f"/api/tasks/tasks/{archived.issue_id}/"
+    response = client.get(url, {"by_issue_id": 1})
+    assert response.status_code == 200
+    assert response.data["archived"] is True
+    listed = client.get("/api/tasks/tasks/", {"project": visible.pk}).data
+    assert len(listed) == 2
+    listed = client.get(
+        "/api/tasks/tasks/", {"project": visible.pk, "include_archived": "true"}
+    ).data
+    assert len(listed) == 5
+    # Рабочие и архивные задачи сортируются вместе
+    listed = client.get(
+        "/api/tasks/tasks/",
+        {"project": visible.pk, "include_archived": "true", "ordering": "created_at"},
+    ).data
+    stamps = [row["created_at"] for row in listed]
+    assert stamps == sorted(stamps)
+    assert [row["archived"] for row in listed][:3] == [True] * 3
+
+    from rest_framework.pagination import LimitOffsetPagination
+
+    from apps.tasks.views import TaskViewSet
+
+    monkeypatch.setattr(TaskViewSet, "pagination_class", LimitOffsetPagination)
+    page = client.get(
+        "/api/tasks/tasks/",
+        {
+            "project": visible.pk,
+            "include_archived": "true",
+            "ordering": "created_at",
+            "limit": 2,
+            "offset": 2,
+        },
+    ).data
+    assert page["count"] == 5
+    assert [row["id"] for row in page["results"]] == [row["id"] for row in listed[2:4]]
+    monkeypatch.undo()
+    assert client.get(f"/api/tasks/tasks/{archived.pk}/").data["archived"] is True
+
+    response = client.post(f"{url}restore/?by_issue_id=1")
+    assert response.status_code == 200
+    assert response.data["archived"] is False
+    restored = Task.objects.get(pk=archived.pk)
+    assert restored.comments.count() == 1
+    assert not ArchivedTask.objects.filter(pk=archived.pk).exists()
+    assert restored.updated_at > timezone.now() - timedelta(minutes=1)
+    actions = client.get(f"/api/tasks/tasks/{archived.pk}/history/").data["results"]
+    assert [row["action"] for row in actions[:2]] == ["restored", "archived"]
+
+
+@pytest.mark.django_db
+def test_deferred_project_and_user_deletion(settings, tmp_path):
+    from datetime import timedelta
+
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from django.utils import timezone
+
+    from apps.jobs.models import Job
+    from apps.tasks.deletion import purge_batches
+    from apps.tasks.models import (
+        AttachmentBlob,
+        PendingDeletion,
+        ProjectTaskSummary,
+        Tombstone,
+    )
+
+    settings.MEDIA_ROOT = tmp_path
+    user, visible, hidden, create_task, _ = _events_fixture()
+    admin = User.objects.create(username="admin", email="a@test.com", is_staff=True)
+    other = User.objects.get(username="user2")
+    tasks = [create_task(hidden) for _ in range(5)]
+    for task in tasks:
+        Comment.objects.create(task=task, author=user, text="c")
+    Comment.objects.create(
+        task=tasks[0],
+        author=user,
+        text="log",
+        attachment=SimpleUploadedFile("build.log", b"data"),
+    )
+    shared = Comment.objects.create(
+        task=create_task(visible, creator=user),
+        author=other,
+        text="log",
+        attachment=SimpleUploadedFile("copy.log", b"data"),
+    )
+    blob = AttachmentBlob.objects.get()
+    assert blob.ref_count == 2
+
+    client = APIClient()
+    client.force_authenticate(admin)
+    response = client.delete(f"/api/tasks/projects/{hidden.pk}/")
+    assert response.status_code == 202
+    assert response.data["total_tasks"] == 5
+    projects = client.get("/api/tasks/projects/").data
+    assert [row["id"] for row in projects] == [visible.pk]
+    assert client.get("/api/tasks/tasks/", {"project": hidden.pk}).data == []
+    assert Job.objects.filter(name__endswith="purge_pending_deletion").count() == 1
+    pending_id = response.data["id"]
+    # Удаление с задачей в очереди не возобновляется повторно
+    from apps.tasks.jobs import resume_pending_deletions
+
+    PendingDeletion.objects.filter(pk=pending_id).update(
+        updated_at=timezone.now() - timedelta(hours=1)
+    )
+    assert resume_pending_deletions() == 0
+    Job.objects.filter(name__endswith="purge_pending_deletion").update(
+        status=Job.Status.FAILED
+    )
+    assert resume_pending_deletions() == 1
+    # Код и название удаляемого проекта заняты до конца удаления
+    response = client.post(
+        "/api/tasks/projects/", {"name": "New", "code": hidden.code}, format="json"
+    )
+    assert response.status_code == 400
+    assert "code" in response.data
+    assert purge_batches(pending_id, batch_size=2, max_batches=2) is False
+    progress = client.get(f"/api/tasks/deletions/{pending_id}/").data
+    assert progress["state"] == "running"
+    assert progress["progress"]["comments"] == 4
+    assert purge_batches(pending_id, batch_size=2) is True
+    progress = client.get(f"/api/tasks/deletions/{pending_id}/").data
+    assert progress["state"] == "done"
+    assert progress["progress"]["tasks"] == 5
+    assert progress["percent"] == 100
+    assert not Project.all_objects.filter(pk=hidden.pk).exists()
+    assert Tombstone.objects.filter(project_id=hidden.pk, kind="task").count() == 5
+    blob.refresh_from_db()
+    assert blob.ref_count == 1
+
+    # Пользователь: свои задачи удаляются, чужие задачи остаются без исполнителя
+    assigned = create_task(visible)
+    assigned.assignee = user
+    assigned.save()
+    response = client.delete(f"/api/users/{user.pk}/")
+    assert response.status_code == 202
+    assert not User.objects.filter(pk=user.pk).exists()
+    assert User.all_objects.filter(pk=user.pk).exists()
+    # Сохранение устаревшего объекта не снимает отметку удаления
+    user.first_name = "Stale"
+    user.save()
+    assert not User.objects.filter(pk=user.pk).exists()
+    assert User.all_objects.get(pk=user.pk).deleting_at is not None
+    pending = PendingDeletion.objects.get(pk=response.data["id"])
+    own_client = APIClient()
+    own_client.force_authenticate(other)
+    response = own_client.patch(
+        f"/api/users/{other.pk}/", {"email": user.email}, format="json"
+    )
+    assert response.status_code == 400
+    assert "email" in response.data
+    assert purge_batches(pending.pk) is True
+    assert not User.all_objects.filter(pk=user.pk).exists()
+    assert not Task.objects.filter(creator_id=user.pk).exists()
+    assert not Comment.objects.filter(pk=shared.pk).exists()
+    assigned.refresh_from_db()
+    assert assigned.assignee_id is None
+    blob.refresh_from_db()
+    assert blob.ref_count == 0
+    summary = ProjectTaskSummary.objects.filter(project=visible).exclude(count=0)
+    assert list(summary.values_list("assignee_id", "count")) == [(None, 1)]
+
+
+@pytest.mark.django_db
+def test_admin_changelists_search_filters_and_estimated_count(
+    client, settings, django_assert_max_num_queries
+):
+    from django.db import connection
+
+    from apps.tasks.changelist import EstimatedCountPaginator, table_row_estimate
+
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+        },
+    }
+    user, visible, hidden, create_task, _ = _events_fixture()
+    admin_user = User.objects.create_superuser(
+        username="root", email="root@test.com", password="pass"
+    )
+    client.force_login(admin_user)
+    tasks = [create_task(visible) for _ in range(3)] + [create_task(hidden)]
+    for task in tasks:
+        Comment.objects.create(task=task, author=user, text="c")
+
+    with django_assert_max_num_queries(12):
+        response = client.get("/admin/tasks/task/", {"project": "vis"})
+    assert response.status_code == 200
+    assert response.context["cl"].result_count == 3
+    assert b'name="creator"' in response.content
+    response = client.get(
+        "/admin/tasks/comment/",
+        {"task": tasks[3].issue_id.lower(), "author": "u1@test.com"},
+    )
+    assert response.status_code == 200
+    assert [c.pk for c in response.context["cl"].result_list] == [
+        tasks[3].comments.get().pk
+    ]
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"ANALYZE {Task._meta.db_table}")
+    settings.ADMIN_EXACT_COUNT_LIMIT = 1
+    estimate = table_row_estimate(Task)
+    assert estimate == 4
+    assert EstimatedCountPaginator(Task.objects.all(), 2).count == estimate
+    settings.ADMIN_EXACT_COUNT_LIMIT = 1000
+    assert EstimatedCountPaginator(Task.objects.filter(project=hidden), 2).count == 1
+
+
+@pytest.mark.django_db
+def test_sparse_fields_and_expand(django_assert_num_queries):
+    user, visible, hidden, create_task, _ = _events_fixture()
+    for _ in range(3):
+        task = create_task(visible)
+        Comment.objects.create(task=task, author=user, text="c")
+    client = APIClient()
+    client.force_authenticate(user)
+    url = "/api/tasks/tasks/"
+
+    full = client.get(url, {"project": visible.pk}).data
+    assert full[0]["project"]["members"][0]["email"] == user.email
+    assert full[0]["creator"]["username"] == "user2"
+
+    # Задачи одним запросом, без пользователей и проектов
+    with django_assert_num_queries(1):
+        rows = client.get(
+            url, {"project": visible.pk, "fields": "issue_id,title,status"}
+        ).data
+    assert set(rows[0]) == {"issue_id", "title", "status"}
+
+    rows = client.get(url, {"fields": "id,creator,project", "expand": ""}).data
+    assert isinstance(rows[0]["creator"], int)
+    assert isinstance(rows[0]["project"], int)
+
+    # Раскрытый проект с участниками в виде ID: задачи + участники
+    with django_assert_num_queries(2):
+        rows = client.get(
+            url,
+            {"fields": "id,project.code,project.members", "expand": "project"},
+        ).data
+    assert rows[0]["project"] == {"code": "VIS", "members": [user.pk]}
+
+    rows = client.get(
+        "/api/tasks/comments/", {"fields": "id,author.email", "expand": "author"}
+    ).data
+    assert rows[0]["author"] == {"email": user.email}
+    me = client.get("/api/users/me/", {"fields": "id,email"}).data
+    assert me == {"id": user.pk, "email": user.email}
+
+
+@pytest.mark.django_db
+def test_fast_json_and_msgpack_renderers():
+    import json
+    from decimal import Decimal
+    from io import StringIO
+
+    from django.utils import timezone
+    from rest_framework.renderers import JSONRenderer
+
+    from config import renderers
+
+    user, visible, hidden, create_task, _ = _events_fixture()
+    create_task(visible)
+    client = APIClient()
+    client.force_authenticate(user)
+
+    response = client.get("/api/tasks/tasks/")
+    assert json.loads(response.content) == json.loads(
+        JSONRenderer().render(response.data)
+    )
+    data = {"at": timezone.now(), "amount": Decimal("1.50"), 1: "x"}
+    assert json.loads(renderers.FastJSONRenderer().render(data)) == json.loads(
+        JSONRenderer().render(data)
+    )
+    separators = {"t": "a\u2028b\u2029c"}
+    assert renderers.FastJSONRenderer().render(separators) == (
+        JSONRenderer().render(separators)
+    )
+
+    body = json.dumps(
+        {
+            "title": "Fast",
+            "project_id": visible.pk,
+            "status": Status.objects.get().pk,
+            "priority": Priority.objects.get().pk,
+        }
+    )
+    response = client.post("/api/tasks/tasks/", body, content_type="application/json")
+    assert response.status_code == 201
+    response = client.post(
+        "/api/tasks/tasks/", "{broken", content_type="application/json"
+    )
+    assert response.status_code == 400
+
+    if renderers.msgpack is not None:
+        response = client.get("/api/tasks/tasks/", HTTP_ACCEPT="application/msgpack")
+        assert response["Content-Type"] == "application/msgpack"
+        rows = renderers.msgpack.unpackb(response.content)
+        assert rows[0]["project"]["code"] == "VIS"
+
+    out = StringIO()
+    call_command("benchmark_renderers", count=50, repeat=1, stdout=out)
+    assert "FastJSONRenderer" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_compiled_serializers_match_drf(monkeypatch):
+    import random
+    from datetime import timedelta
+
+    from django.utils import timezone
+    from rest_framework.renderers import JSONRenderer
+
+    from apps.tasks.models import ArchivedTask
+    from config.compiled import CompiledSerializer
+    from apps.users.models import Position
+
+    # Подписи ссылок на вложения содержат время, фиксируем его
+    monkeypatch.setattr("django.core.signing.time.time", lambda: 1_700_000_000)
+    render = JSONRenderer().render
+    status = Status.objects.create(name="Open")
+    priority = Priority.objects.create(level="Low")
+    compiled_tasks = CompiledSerializer(TaskSerializer)
+    compiled_comments = CompiledSerializer(CommentSerializer)
+
+    for seed in range(5):
+        rnd = random.Random(seed)
+        positions = [None, Position.objects.create(name=f"Позиция {seed}")]
+        users = [
+            User.objects.create(
+                username=f"u{seed}-{i}-ё",
+                email=f"U{seed}{i}@Test.com",
+                position=rnd.choice(positions),
+                avatar=rnd.choice([None, "", f"avatars/{seed}-{i}.png"]),
+                is_superuser=rnd.random() < 0.3,
+            )
+            for i in range(4)
+        ]
+        projects = []
+        for i in range(3):
+            project = Project.objects.create(
+                name=f"P{seed}{i}", code=f"S{seed}P{i}", description='"x"\n'
+            )
+            project.members.set(rnd.sample(users, rnd.randint(0, 3)))
+            projects.append(project)
+        for i in range(15):
+            task = Task.objects.create(
+                title=rnd.choice(["Задача", "task <b>", ""]) + str(i),
+                description=rnd.choice(["", "многострочное\nописание"]),
+                project=rnd.choice(projects),
+                status=status,
+                priority=priority,
+                creator=rnd.choice(users),
+                assignee=rnd.choice(users + [None]),
+                due_date=rnd.choice(
+                    [
+                        None,
+                        timezone.now() + timedelta(microseconds=rnd.randint(0, 10**9)),
+                    ]
+                ),
+            )
+            for _ in range(rnd.randint(0, 2)):
+                Comment.objects.create(
+                    task=task,
+                    author=rnd.choice(users),
+                    text="комментарий",
+                    attachment=rnd.choice([None, "task_attachments/a.png"]),
+                    attachment_name=rnd.choice(["", "a.png", "b.txt"]),
+                )
+        user = rnd.choice(users)
+
+        def context():
+            # Отдельный запрос: у каждого своя карта идентичности
+            request = APIRequestFactory().get("/api/tasks/tasks/")
+            request.user = user
+            return {"request": request}
+
+        tz = rnd.choice(["UTC", "Europe/Moscow", "America/New_York"])
+        with timezone.override(tz):
+            for compiled, serializer_class, queryset in (
+                (compiled_tasks, TaskSerializer, Task.objects.all()),
+                (compiled_comments, CommentSerializer, Comment.objects.all()),
+            ):
+                fast = compiled.serialize(queryset, context())
+                assert fast is not None
+                expected = serializer_class(queryset, many=True, context=context()).data
+                assert render(fast) == render(expected)
+
+    archived = Task.objects.first()
+    ArchivedTask.objects.create(
+        **{
+            f.attname: getattr(archived, f.attname)
+            for f in ArchivedTask._meta.concrete_fields
+            if f.name != "archived_at"
+        }
+    )
+    queryset = ArchivedTask.objects.all()
+    fast = compiled_tasks.serialize(queryset, context())
+    assert fast[0]["archived"] is True
+    assert render(fast) == render(
+        TaskSerializer(queryset, many=True, context=context()).data
+    )
+
+
+@pytest.mark.django_db
+def test_identity_map_serializes_each_user_once(monkeypatch):
+    from rest_framework.renderers import JSONRenderer
+
+    from config.compiled import CompiledSerializer
+    from apps.users.serializers import UserSerializer
+
+    user, visible, hidden, create_task, _ = _events_fixture()
+    for _ in range(10):
+        task = create_task(visible)
+        task.assignee = user
+        task.save()
+    calls = []
+    row_avatar_urls = UserSerializer.row_avatar_urls
+    monkeypatch.setattr(
+        UserSerializer,
+        "row_avatar_urls",
+        lambda self, *args: calls.append(args) or row_avatar_urls(self, *args),
+    )
+
+    def context(method):
+        request = getattr(APIRequestFactory(), method)("/api/tasks/tasks/")
+        request.user = user
+        return {"request": request}
+
+    queryset = Task.objects.all()
+    compiled = CompiledSerializer(TaskSerializer)
+    for serialize in (
+        lambda ctx: TaskSerializer(queryset, many=True, context=ctx).data,
+        lambda ctx: compiled.serialize(queryset, ctx),
+    ):
+        calls.clear()
+        shared = serialize(context("get"))
+        # Создатель и исполнитель (он же участник проекта) — по одному разу
+        assert len(calls) == 2
+        assert shared[0]["creator"] is shared[1]["creator"]
+        assert shared[0]["project"] is shared[1]["project"]
+        assert shared[0]["assignee"] is shared[0]["project"]["members"][0]
+
+        # При изменении данных карта не используется
+        calls.clear()
+        plain = serialize(context("post"))
+        assert len(calls) > 2
+        assert JSONRenderer().render(shared) == JSONRenderer().render(plain)
+
+
+@pytest.mark.django_db
+def test_task_fragment_cache_invalidation(settings, django_assert_num_queries):
+    from django.core.cache import caches
+
+    from apps.users.models import Position
+
+    caches["fragments"].clear()
+    user, visible, hidden, create_task, _ = _events_fixture()
+    other = User.objects.get(username="user2")
+    tasks = [create_task(visible) for _ in range(3)]
+    client = APIClient()
+    client.force_authenticate(user)
+    url = "/api/tasks/tasks/"
+
+    def check():
+        cached = client.get(url).json()
+        settings.TASK_FRAGMENT_CACHE = ""
+        expected = client.get(url).json()
+        settings.TASK_FRAGMENT_CACHE = "fragments"
+        assert cached == expected
+        return cached
+
+    check()
+    # Все задачи из кэша: один запрос столбцов ключа
+    with django_assert_num_queries(1):
+        assert len(client.get(url).json()) == 3
+
+    tasks[0].title = "Новое название"
+    tasks[0].save()
+    Comment.objects.create(task=tasks[1], author=user, text="c")
+    rows = {row["id"]: row for row in check()}
+    assert rows[tasks[0].pk]["title"] == "Новое название"
+    assert rows[tasks[1].pk]["comment_count"] == 1
+
+    position = Position.objects.create(name="DevOps")
+    other.position = position
+    other.save()
+    assert check()[0]["creator"]["position"]["name"] == "DevOps"
+    position.name = "SRE"
+    position.save()
+    assert check()[0]["creator"]["position"]["name"] == "SRE"
+
+    visible.name = "Renamed"
+    visible.save()
+    assert check()[0]["project"]["name"] == "Renamed"
+    visible.members.add(other)
+    assert len(check()[0]["project"]["members"]) == 2
+    user.first_name = "Имя"
+    user.save()
+    project = check()[0]["project"]
+    assert project["name"] == "Renamed"
+    assert {m["first_name"] for m in project["members"]} >= {"Имя"}
+
+    other.projects.remove(visible)
+    assert len(check()[0]["project"]["members"]) == 1
+    position.delete()
+    rows = check()
+    assert rows[0]["creator"]["position"] is None
+    assert len(rows[0]["project"]["members"]) == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_cache_invalidation_bus_evicts_local_tiers(settings, monkeypatch):
+    import json
+    import queue
+    import time
+
+    from django.core.cache import cache, caches
+
+    from apps.tasks.events import visible_project_ids
+    from config import invalidation
+
+    user, visible, hidden, _, _ = _events_fixture()
+    client = APIClient()
+    client.force_authenticate(user)
+    cache.clear()
+
+    received = queue.Queue()
+    evict_local = invalidation.evict_local
+
+    def record(keys):
+        received.put(list(keys))
+        return evict_local(keys)
+
+    monkeypatch.setattr(invalidation, "evict_local", record)
+    settings.CACHE_INVALIDATION_LISTENER = True
+    listener = invalidation.start_invalidation_listener()
+    try:
+        assert listener.listening.wait(5)
+
+        def delivered(key):
+            while True:
+                if key in received.get(timeout=5):
+                    return
+
+        # Справочник: список из кэша, изменение удаляет его во всех процессах
+        url = "/api/tasks/statuses/"
+        assert [item["name"] for item in client.get(url).data] == ["Open"]
+        Status.objects.update(name="Stale")
+        assert [item["name"] for item in client.get(url).data] == ["Open"]
+        Status.objects.get().save()
+        delivered(invalidation.reference_key(Status))
+        assert [item["name"] for item in client.get(url).data] == ["Stale"]
+
+        # Состав участников: ключ пользователя рассылается после фиксации
+        assert visible_project_ids(user) == {visible.pk}
+        hidden.members.add(user)
+        delivered(invalidation.membership_key(user.pk))
+        assert visible_project_ids(user) == {visible.pk, hidden.pk}
+        hidden.delete()
+        delivered(invalidation.membership_key(user.pk))
+        assert visible_project_ids(user) == {visible.pk}
+
+        # Слушатель удаляет запись, которой нет в общем кэше, из локального уровня
+        key = invalidation.membership_key(user.pk)
+        caches["shared"].delete(key)
+        assert cache.get(key) == [visible.pk]
+        invalidation.handle_message(
+            invalidation.CHANNEL, json.dumps({"keys": [key], "at": time.time()})
+        )
+        assert cache.get(key) is None
+
+        metrics = invalidation.invalidation_metrics()
+        assert metrics["listening"] and metrics["messages"] >= 4
+        assert 0 <= metrics["latency_last_ms"] and metrics["latency_max_ms"] > 0
+    finally:
+        invalidation.stop_invalidation_listener()
+
+
+@pytest.mark.django_db
+def test_response_compression(settings):
+    import gzip
+
+    from django.core.cache import caches
+    from django.http import StreamingHttpResponse
+    from django.test import RequestFactory
+
+    from config.cache import cache_metrics
+    from config.compression import CompressionMiddleware
+
+    user, visible, hidden, create_task, _ = _events_fixture()
+    for _ in range(20):
+        create_task(visible)
+    client = APIClient()
+    client.force_authenticate(user)
+    caches["compressed"].clear()
+    settings.COMPRESSION_ENCODINGS = ["gzip"]
+    settings.COMPRESSION_CACHE_MIN_BYTES = 1024
+
+    url = "/api/tasks/tasks/"
+    plain = client.get(url)
+    assert "Content-Encoding" not in plain
+    assert "Accept-Encoding" in plain["Vary"]
+    assert "Content-Encoding" not in client.get(url, HTTP_ACCEPT_ENCODING="gzip;q=0")
+    # "*" не отменяет явный отказ от кодировки
+    refused = client.get(url, HTTP_ACCEPT_ENCODING="gzip;q=0, *")
+    assert "Content-Encoding" not in refused
+    for _ in range(2):
+        response = client.get(url, HTTP_ACCEPT_ENCODING="br, gzip")
+        assert response["Content-Encoding"] == "gzip"
+        assert int(response["Content-Length"]) < len(plain.content) / 3
+        assert gzip.decompress(response.content) == plain.content
+    counts = cache_metrics()["compressed"]["namespaces"]["http:compressed"]
+    assert counts["computed"] == 1 and counts["local_hits"] == 1
+
+    small = client.get("/api/tasks/statuses/", HTTP_ACCEPT_ENCODING="gzip")
+    assert "Content-Encoding" not in small
+
+    # Потоковый ответ сжимается по частям, каждая часть доступна сразу
+    request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING="gzip")
+    rows = [f"{i},task {i}\n".encode() * 50 for i in range(10)]
+    middleware = CompressionMiddleware(
+        lambda request: StreamingHttpResponse(iter(rows), content_type="text/csv")
+    )
+    response = middleware(request)
+    assert response["Content-Encoding"] == "gzip"
+    chunks = list(response.streaming_content)
+    assert len(chunks) == len(rows) + 1
+    assert gzip.decompress(b"".join(chunks)) == b"".join(rows)
+    events = CompressionMiddleware(
+        lambda request: StreamingHttpResponse(
+            iter([b"data: x\n\n"]), content_type="text/event-stream"
+        )
+    )(request)
+    assert "Content-Encoding" not in events
+
+
+@pytest.mark.django_db(transaction=True)
+def test_batch_endpoint(monkeypatch):
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+
+    user, visible, hidden, create_task, token = _events_fixture()
+    task = create_task(visible)
+    client = APIClient()
+    url = "/api/batch/"
+    reads = [
+        {"method": "GET", "path": "/tasks/statuses/"},
+        {"method": "get", "path": "/tasks/priorities"},
+        {"method": "GET", "path": "/api/tasks/projects/"},
+        {"method": "GET", "path": "/users/me/"},
+        {"method": "GET", "path": f"/tasks/tasks/{task.pk}/"},
+        {"method": "GET", "path": "/tasks/tasks/?project=999999"},
+        {"method": "GET", "path": "/tasks/missing/"},
+        {"method": "GET", "path": "/tasks/events/"},
+    ]
+    assert client.post(url, {"requests": reads}, format="json").status_code == 401
+
+    decoded = []
+    authenticate = JWTAuthentication.authenticate
+    monkeypatch.setattr(
+        JWTAuthentication,
+        "authenticate",
+        lambda self, request: decoded.append(1) or authenticate(self, request),
+    )
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    direct = [
+        client.get(f"/api{path}").json()
+        for path in (
+            "/tasks/statuses/",
+            "/tasks/priorities/",
+            "/tasks/projects/",
+            "/users/me/",
+            f"/tasks/tasks/{task.pk}/",
+        )
+    ]
+    for concurrent in (False, True):
+        decoded.clear()
+        response = client.post(
+            url, {"requests": reads, "concurrent": concurrent}, format="json"
+        )
+        assert response.status_code == 200 and len(decoded) == 1
+        items = response.json()["responses"]
+        assert [item["status"] for item in items] == [200] * 6 + [404, 400]
+        assert [item["body"] for item in items[:5]] == direct
+        assert items[5]["body"] == []
+
+    writes = [
+        {
+            "method": "POST",
+            "path": "/tasks/tasks/",
+            "body": {
+                "title": "Batched",
+                "project_id": visible.pk,
+                "status": task.status_id,
+                "priority": task.priority_id,
+            },
+        },
+        {"method": "DELETE", "path": "/tasks/statuses/1/"},
+        {"method": "GET", "path": f"/tasks/tasks/?project={visible.pk}"},
+    ]
+    items = client.post(
+        url, {"requests": writes, "concurrent": True}, format="json"
+    ).json()["responses"]
+    assert [item["status"] for item in items] == [201, 403, 200]
+    assert items[0]["body"]["title"] == "Batched"
+    assert {row["title"] for row in items[2]["body"]} == {"Task", "Batched"}
+
+    too_many = {"requests": [reads[0]] * 21}
+    assert client.post(url, too_many, format="json").status_code == 400
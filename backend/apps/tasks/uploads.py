@@ -0,0 +1,237 @@
+"""
+Возобновляемая загрузка вложений по частям.
+
+Протокол:
+1. POST /api/tasks/uploads/ — создание загрузки (имя файла, размер, задача)
+2. PUT /api/tasks/uploads/<id>/ с заголовком Upload-Offset — приём очередной части
+3. GET /api/tasks/uploads/<id>/ — текущее смещение для возобновления
+4. POST /api/tasks/uploads/<id>/finalize/ — проверка суммы и создание комментария
+
+Части дописываются прямо в файл в MEDIA_ROOT блоками фиксированного размера,
+поэтому расход памяти не зависит от размера файла. Контрольная сумма SHA-256
+считается по мере записи.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .models import AttachmentUpload, Comment
+
+READ_BLOCK_SIZE = 64 * 1024
+HASHER_CACHE_SIZE = 256
+
+_hashers = OrderedDict()
+_hashers_lock = threading.Lock()
+
+
+class UploadOffsetConflict(Exception):
+    """
+    Смещение части не совпадает с количеством уже принятых байт.
+
+    Содержит текущее смещение, с которого клиент должен продолжить загрузку.
+    """
+
+    def __init__(self, offset):
+        super().__init__(offset)
+        self.offset = offset
+
+
+def partial_path(upload):
+    """
+    Возвращает абсолютный путь к частично загруженному файлу.
+
+    Args:
+        upload (AttachmentUpload): Загрузка
+
+    Returns:
+        str: Путь к файлу в MEDIA_ROOT
+    """
+    return default_storage.path(upload.partial_name)
+
+
+def _hash_file(path, length):
+    """
+    Считает SHA-256 первых length байт файла, читая его блоками.
+    """
+    hasher = hashlib.sha256()
+    remaining = length
+    with open(path, "rb") as fh:
+        while remaining > 0:
+            block = fh.read(min(READ_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            hasher.update(block)
+            remaining -= len(block)
+    return hasher
+
+
+def _get_hasher(upload, path):
+    """
+    Возвращает объект SHA-256, соответствующий принятым байтам загрузки.
+
+    Состояние хэша хранится в памяти процесса. Если загрузка продолжается
+    в другом воркере или после перезапуска, хэш пересчитывается по уже
+    записанной части файла.
+    """
+    with _hashers_lock:
+        cached = _hashers.pop(upload.pk, None)
+    if cached and cached[0] == upload.offset:
+        return cached[1]
+    if upload.offset == 0:
+        return hashlib.sha256()
+    return _hash_file(path, upload.offset)
+
+
+def _remember_hasher(upload, hasher):
+    with _hashers_lock:
+        _hashers[upload.pk] = (upload.offset, hasher)
+        _hashers.move_to_end(upload.pk)
+        while len(_hashers) > HASHER_CACHE_SIZE:
+            _hashers.popitem(last=False)
+
+
+def append_chunk(upload, stream, offset, length):
+    """
+    Дописывает часть файла из входного потока запроса.
+
+    Файл обрезается до подтверждённого смещения, поэтому данные,
+    записанные прерванным запросом, перезаписываются при повторе.
+
+    Args:
+        upload (AttachmentUpload): Загрузка, заблокированная select_for_update
+        stream: Поток тела запроса
+        offset (int): Смещение части, указанное клиентом
+        length (int): Длина части (Content-Length)
+
+    Returns:
+        int: Новое смещение загрузки
+
+    Raises:
+        UploadOffsetConflict: Если смещение не совпадает с принятыми данными
+        ValidationError: Если часть слишком большая или оборвалась
+    """
+    if offset != upload.offset:
+        raise UploadOffsetConflict(upload.offset)
+    if length <= 0:
+        raise ValidationError({"detail": "Пустая часть файла"})
+    if length > settings.ATTACHMENT_UPLOAD_CHUNK_SIZE:
+        raise ValidationError({"detail": "Часть файла превышает допустимый размер"})
+    if upload.offset + length > upload.size:
+        raise ValidationError({"detail": "Данные превышают объявленный размер файла"})
+
+    path = partial_path(upload)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    hasher = _get_hasher(upload, path)
+    received = 0
+    with open(path, "ab") as fh:
+        fh.truncate(upload.offset)
+        while received < length:
+            block = stream.read(min(READ_BLOCK_SIZE, length - received))
+            if not block:
+                break
+            fh.write(block)
+            hasher.update(block)
+            received += len(block)
+        if received != length:
+            fh.truncate(upload.offset)
+            raise ValidationError({"detail": "Часть файла получена не полностью"})
+
+    upload.offset += received
+    upload.save(update_fields=["offset", "updated_at"])
+    transaction.on_commit(lambda: _remember_hasher(upload, hasher))
+    return upload.offset
+
+
+def finalize_upload(upload, author, text=""):
+    """
+    Завершает загрузку: проверяет размер и сумму, создаёт комментарий.
+
+    Файл перемещается в хранилище вложений переименованием, без копирования.
+
+    Args:
+        upload (AttachmentUpload): Полностью загруженный файл
+        author: Автор комментария
+        text (str): Текст комментария
+
+    Returns:
+        Comment: Комментарий с прикреплённым файлом
+
+    Raises:
+        ValidationError: Если файл загружен не полностью или сумма не совпала
+    """
+    if upload.offset != upload.size:
+        raise ValidationError(
+            {"detail": "Файл загружен не полностью", "offset": upload.offset}
+        )
+    path = partial_path(upload)
+    hasher = _get_hasher(upload, path)
+    digest = hasher.hexdigest()
+    if upload.sha256 and upload.sha256.lower() != digest:
+        raise ValidationError({"detail": "Контрольная сумма не совпадает"})
+
+    storage = Comment.attachment.field.storage
+    if hasattr(storage, "adopt_file"):
+        name = storage.reserve_blob(digest, upload.size)
+    else:
+        name = storage.get_available_name(
+            Comment.attachment.field.generate_filename(Comment(), upload.filename)
+        )
+
+    comment = Comment(
+        task=upload.task, author=author, text=text, attachment_name=upload.filename
+    )
+    comment.attachment.name = name
+    comment.save()
+    upload.delete()
+
+    # Файл перемещается последним: если сохранение комментария не удалось,
+    # транзакция откатывается, а загрузка остаётся с нетронутым файлом
+    if hasattr(storage, "adopt_file"):
+        storage.adopt_file(path, digest, upload.size)
+    else:
+        final_path = storage.path(name)
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        os.replace(path, final_path)
+    return comment
+
+
+def discard_upload(upload):
+    """
+    Отменяет загрузку и удаляет частично загруженный файл.
+
+    Args:
+        upload (AttachmentUpload): Загрузка
+    """
+    with _hashers_lock:
+        _hashers.pop(upload.pk, None)
+    default_storage.delete(upload.partial_name)
+    upload.delete()
+
+
+def purge_stale_uploads(max_age=None):
+    """
+    Удаляет загрузки, в которые давно не поступали данные.
+
+    Args:
+        max_age (timedelta): Время простоя, после которого загрузка удаляется
+
+    Returns:
+        int: Количество удалённых загрузок
+    """
+    if max_age is None:
+        max_age = timedelta(hours=settings.ATTACHMENT_UPLOAD_EXPIRE_HOURS)
+    stale = AttachmentUpload.objects.filter(updated_at__lt=timezone.now() - max_age)
+    count = 0
+    for upload in stale.iterator():
+        discard_upload(upload)
+        count += 1
+    return count
@@ -2,18 +2,23 @@
 URL-конфигурация для приложения tasks.
 
 Определяет маршруты для API эндпоинтов, связанных с задачами, проектами,
-статусами, приоритетами и комментариями.
+статусами, приоритетами, комментариями и фоновым удалением, а также
+скачивания вложений и потока событий.
 """
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
+from .downloads import attachment_download
+from .events import EventTicketView, task_events
 from .views import (
     TaskViewSet,
     StatusViewSet,
     PriorityViewSet,
     ProjectViewSet,
     CommentViewSet,
+    AttachmentUploadViewSet,
+    PendingDeletionViewSet,
 )
 
 router = DefaultRouter()
@@ -22,7 +27,16 @@ router.register(r"tasks", TaskViewSet, basename="tasks")
 router.register(r"statuses", StatusViewSet, basename="statuses")
 router.register(r"priorities", PriorityViewSet, basename="priorities")
 router.register(r"comments", CommentViewSet, basename="comments")
+router.register(r"uploads", AttachmentUploadViewSet, basename="uploads")
+router.register(r"deletions", PendingDeletionViewSet, basename="deletions")
 
 urlpatterns = [
+    path(
+        "attachments/<int:pk>/",
+        attachment_download,
+        name="attachment-download",
+    ),
+    path("events/", task_events, name="task-events"),
+    path("events/ticket/", EventTicketView.as_view(), name="task-events-ticket"),
     path("", include(router.urls)),
 ]
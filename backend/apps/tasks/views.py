@@ -1,21 +1,98 @@
-from rest_framework import viewsets, permissions, filters
-from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework import viewsets, permissions, filters, mixins
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
 from rest_framework.response import Response
 from rest_framework import status
+from django.db import transaction
+from django.db.models import Value
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 
-from .models import Task, Status, Priority, Project, Comment
-from .permissions import IsAuthorOrAdmin
+from config.compiled import CompiledListMixin, CompiledSerializer
+from config.deletion import DeferredDestroyMixin
+from config.fieldsets import SparseFieldsViewMixin
+from config.reference import ReferenceCacheMixin
+
+from .archive import restore_task
+from .deletion import hide_deleting, request_deletion
+from .fragments import TaskFragmentCache
+from .models import (
+    ArchivedTask,
+    Task,
+    Status,
+    Priority,
+    Project,
+    Comment,
+    AttachmentUpload,
+    Tombstone,
+    TaskChange,
+    PendingDeletion,
+)
+from .history import HistoryActorMixin, HistoryPagination, filter_history
+from .jobs import purge_pending_deletion
+from .permissions import IsAuthorOrAdmin, user_can_view_task
 from .serializers import (
     TaskSerializer,
     StatusSerializer,
     PrioritySerializer,
     ProjectSerializer,
+    TaskChangeSerializer,
+    PendingDeletionSerializer,
 )
 from .serializers_comment import CommentSerializer
+from .serializers_upload import AttachmentUploadSerializer
+from .stats import get_project_stats
+from .sync import ChangedSinceMixin
+from .uploads import (
+    UploadOffsetConflict,
+    append_chunk,
+    discard_upload,
+    finalize_upload,
+)
+
+
+def history_response(view, queryset):
+    """
+    Возвращает страницу журнала изменений с учётом параметров запроса.
+
+    Args:
+        view: ViewSet, обрабатывающий запрос
+        queryset (QuerySet): Записи TaskChange задачи или проекта
+
+    Returns:
+        Response: Страница записей со ссылками next и previous
+    """
+    queryset = filter_history(queryset, view.request.query_params)
+    paginator = HistoryPagination()
+    page = paginator.paginate_queryset(
+        queryset.select_related("actor"), view.request, view=view
+    )
+    return paginator.get_paginated_response(TaskChangeSerializer(page, many=True).data)
+
 
+def schedule_deletion(instance, requested_by=None):
+    """
+    Отмечает объект удаляемым и ставит фоновую задачу удаления.
+
+    Обработчик DEFERRED_DELETION_HANDLER для примесей config/deletion.py.
+
+    Args:
+        instance (Project | User): Удаляемый объект
+        requested_by (User): Пользователь, запросивший удаление
 
-class ProjectViewSet(viewsets.ModelViewSet):
+    Returns:
+        dict: Данные PendingDeletion
+    """
+    pending, created = request_deletion(instance, requested_by)
+    if created:
+        purge_pending_deletion.delay(pending.pk)
+    return PendingDeletionSerializer(pending).data
+
+
+class ProjectViewSet(
+    SparseFieldsViewMixin, DeferredDestroyMixin, viewsets.ModelViewSet
+):
     """
     ViewSet для управления проектами.
 
@@ -23,6 +100,10 @@ class ProjectViewSet(viewsets.ModelViewSet):
     - Просмотр списка проектов и деталей доступен всем аутентифицированным пользователям
     - Создание, изменение и удаление проектов доступно только администраторам
     - Пользователи видят только те проекты, в которых они являются участниками
+    - Статистика задач проекта (stats) и всех проектов пользователя (projects/stats)
+    - Журнал изменений задач проекта (history)
+    - Удаление выполняется в фоне: проект сразу скрывается, ответ 202
+    - Параметры fields и expand выбирают поля ответа и загружаемые связи
     """
 
     serializer_class = ProjectSerializer
@@ -48,12 +129,68 @@ class ProjectViewSet(viewsets.ModelViewSet):
         Returns:
             list: Список классов разрешений
         """
-        if self.action in ["list", "retrieve"]:
+        if self.action in ["list", "retrieve", "stats", "bulk_stats", "history"]:
             return [permissions.IsAuthenticated()]
         return [permissions.IsAuthenticated(), permissions.IsAdminUser()]
 
+    def _stats_queryset(self):
+        # Для статистики нужны только ID и версия задач, без участников
+        return self.get_queryset().prefetch_related(None).only("id", "tasks_version")
+
+    @action(detail=True, methods=["get"])
+    def stats(self, request, pk=None):
+        """
+        Возвращает статистику задач проекта для дашборда.
+
+        Args:
+            request: HTTP запрос
+            pk: ID проекта
+
+        Returns:
+            Response: Количество задач по статусам, приоритетам и исполнителям,
+                просроченные задачи и созданные/закрытые задачи по неделям
+        """
+        project = get_object_or_404(self._stats_queryset(), pk=pk)
+        return Response(get_project_stats([project])[project.pk])
+
+    @action(detail=True, methods=["get"])
+    def history(self, request, pk=None):
+        """
+        Возвращает журнал изменений задач и комментариев проекта.
+
+        Args:
+            request: HTTP запрос (since, until, field, action, cursor)
+            pk: ID проекта
+
+        Returns:
+            Response: Страница записей журнала от новых к старым
+        """
+        project = get_object_or_404(self._stats_queryset(), pk=pk)
+        return history_response(self, TaskChange.objects.filter(project_id=project.pk))
+
+    @action(detail=False, methods=["get"], url_path="stats")
+    def bulk_stats(self, request):
+        """
+        Возвращает статистику всех проектов пользователя одним запросом.
+
+        Args:
+            request: HTTP запрос
 
-class TaskViewSet(viewsets.ModelViewSet):
+        Returns:
+            Response: Словарь ID проекта -> статистика
+        """
+        projects = list(self.filter_queryset(self._stats_queryset()))
+        stats = get_project_stats(projects)
+        return Response({str(pk): value for pk, value in stats.items()})
+
+
+class TaskViewSet(
+    CompiledListMixin,
+    SparseFieldsViewMixin,
+    HistoryActorMixin,
+    ChangedSinceMixin,
+    viewsets.ModelViewSet,
+):
     """
     ViewSet для управления задачами.
 
@@ -62,11 +199,23 @@ class TaskViewSet(viewsets.ModelViewSet):
     - Создание задач доступно всем аутентифицированным пользователям
     - Изменение и удаление задач доступно создателю задачи
     - Пользователи видят задачи из проектов, в которых они участвуют
+    - Параметр changed_since возвращает только изменения после курсора
+    - Параметр ordering сортирует по created_at, last_activity_at или comment_count
+    - Журнал изменений задачи (history), автор изменений — пользователь запроса
+    - Задачи из архива находятся по issue_id и ID при просмотре, попадают в список
+      с параметром include_archived=true и возвращаются действием restore
+    - Параметры fields и expand выбирают поля ответа и загружаемые связи
+    - Список без fields и expand строится скомпилированным сериализатором,
+      неизменившиеся задачи берутся из кэша фрагментов
     """
 
     serializer_class = TaskSerializer
-    filter_backends = [filters.SearchFilter]
+    compiled_serializer = TaskFragmentCache(CompiledSerializer(TaskSerializer))
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ["title", "description"]
+    ordering_fields = ["created_at", "last_activity_at", "comment_count"]
+    tombstone_kind = Tombstone.Kind.TASK
+    archive_actions = ("retrieve", "history", "restore")
 
     def get_queryset(self):
         """
@@ -75,10 +224,24 @@ class TaskViewSet(viewsets.ModelViewSet):
         Returns:
             QuerySet: Список задач, доступных пользователю
         """
+        return self.filter_tasks(
+            Task.objects.select_related(
+                "creator", "assignee", "status", "priority", "project"
+            ).all()
+        )
+
+    def filter_tasks(self, qs):
+        """
+        Применяет к задачам (рабочим или из архива) права доступа
+        и фильтры из параметров запроса.
+
+        Args:
+            qs (QuerySet): Задачи Task или ArchivedTask
+
+        Returns:
+            QuerySet: Отфильтрованные задачи
+        """
         user = self.request.user
-        qs = Task.objects.select_related(
-            "creator", "assignee", "status", "priority", "project"
-        ).all()
         project_param = self.request.query_params.get("project")
         not_project_param = self.request.query_params.get("not_project")
         if project_param:
@@ -130,10 +293,30 @@ class TaskViewSet(viewsets.ModelViewSet):
         if self.request.query_params.get("unassigned") == "true":
             qs = qs.filter(assignee__isnull=True)
 
+        qs = hide_deleting(qs, "project", "creator")
+
         if not (user.is_superuser or user.is_staff):
             qs = qs.filter(project__members=user) | qs.filter(creator=user)
         return qs
 
+    def filter_tombstones(self, tombstones):
+        """
+        Ограничивает записи об удалении проектом из параметра project.
+
+        Остальные фильтры к удалённым задачам не применяются: клиент
+        игнорирует удаления задач, которых у него нет.
+
+        Args:
+            tombstones (QuerySet): Записи об удалении задач
+
+        Returns:
+            QuerySet: Отфильтрованные записи
+        """
+        project_param = self.request.query_params.get("project")
+        if project_param and project_param.isdigit():
+            return tombstones.filter(project_id=int(project_param))
+        return tombstones
+
     def get_object(self):
         """
         Получает объект задачи по ID или issue_id.
@@ -142,12 +325,117 @@ class TaskViewSet(viewsets.ModelViewSet):
             Task: Объект задачи
         """
         by_issue_id = self.request.query_params.get("by_issue_id")
-        if by_issue_id:
-            issue_id = self.kwargs.get("pk")
-            obj = get_object_or_404(Task, issue_id=issue_id)
-            self.check_object_permissions(self.request, obj)
-            return obj
-        return super().get_object()
+        try:
+            if by_issue_id:
+                issue_id = self.kwargs.get("pk")
+                obj = get_object_or_404(Task, issue_id=issue_id)
+                self.check_object_permissions(self.request, obj)
+                return obj
+            return super().get_object()
+        except Http404:
+            if self.action not in self.archive_actions:
+                raise
+            return self.get_archived_object()
+
+    def get_archived_object(self):
+        """
+        Ищет задачу в архиве по ID или issue_id (параметр by_issue_id).
+
+        Returns:
+            ArchivedTask: Задача из архива, видимая пользователю
+
+        Raises:
+            Http404: Если задачи нет в архиве или она не видна пользователю
+        """
+        lookup = self.kwargs.get("pk")
+        if self.request.query_params.get("by_issue_id"):
+            lookup_filter = {"issue_id": lookup}
+        elif str(lookup).isdigit():
+            lookup_filter = {"pk": lookup}
+        else:
+            raise Http404("Задача не найдена")
+        obj = get_object_or_404(
+            ArchivedTask.objects.select_related(
+                "creator", "assignee", "status", "priority", "project"
+            ),
+            **lookup_filter,
+        )
+        if not user_can_view_task(self.request.user, obj):
+            raise Http404("Задача не найдена")
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    def list(self, request, *args, **kwargs):
+        """
+        Возвращает список задач; с include_archived=true — вместе с задачами
+        из архива, отфильтрованными теми же параметрами.
+
+        Общий порядок (ordering или -created_at, затем -id) и страницу при
+        включённой пагинации задаёт UNION ALL ключей сортировки обеих таблиц.
+        Задачи страницы сериализуются отдельно для каждой таблицы в том же
+        порядке и расставляются по местам из UNION.
+        """
+        params = request.query_params
+        if params.get("include_archived") != "true" or "changed_since" in params:
+            return super().list(request, *args, **kwargs)
+        live = self.filter_queryset(self.get_queryset())
+        archived = self.filter_queryset(
+            self.filter_tasks(
+                ArchivedTask.objects.select_related(
+                    "creator", "assignee", "status", "priority", "project"
+                ).all()
+            )
+        )
+        ordering = [*(live.query.order_by or Task._meta.ordering), "-id"]
+        columns = list(dict.fromkeys(field.lstrip("-") for field in ordering))
+
+        def keys(queryset, in_archive):
+            return (
+                queryset.order_by()
+                .annotate(in_archive=Value(in_archive))
+                .values_list(*columns, "in_archive")
+            )
+
+        merged = (
+            keys(live, False).union(keys(archived, True), all=True).order_by(*ordering)
+        )
+        page = self.paginate_queryset(merged)
+        rows = list(merged if page is None else page)
+        id_index = columns.index("id")
+        serialized = {}
+        for in_archive, queryset in ((False, live), (True, archived)):
+            ids = [row[id_index] for row in rows if row[-1] is in_archive]
+            data = self.get_serializer(
+                queryset.filter(pk__in=ids).order_by(*ordering), many=True
+            ).data
+            serialized[in_archive] = iter(data)
+        # Задача, перенесённая в архив или из него между запросами, пропускается
+        results = [
+            item
+            for item in (next(serialized[row[-1]], None) for row in rows)
+            if item is not None
+        ]
+        if page is not None:
+            return self.get_paginated_response(results)
+        return Response(results)
+
+    @action(detail=True, methods=["post"])
+    def restore(self, request, pk=None):
+        """
+        Возвращает задачу из архива вместе с комментариями.
+
+        Args:
+            request: HTTP запрос
+            pk: ID задачи (или issue_id с параметром by_issue_id)
+
+        Returns:
+            Response: Восстановленная задача
+        """
+        task = self.get_object()
+        if task.archived:
+            task = restore_task(task)
+            task = self.get_queryset().get(pk=task.pk)
+        return Response(self.get_serializer(task).data)
 
     def update(self, request, *args, **kwargs):
         """
@@ -204,6 +492,21 @@ class TaskViewSet(viewsets.ModelViewSet):
             return [permissions.IsAuthenticated()]
         return [permissions.IsAuthenticated()]
 
+    @action(detail=True, methods=["get"])
+    def history(self, request, pk=None):
+        """
+        Возвращает журнал изменений задачи и её комментариев.
+
+        Args:
+            request: HTTP запрос (since, until, field, action, cursor)
+            pk: ID задачи
+
+        Returns:
+            Response: Страница записей журнала от новых к старым
+        """
+        task = self.get_object()
+        return history_response(self, TaskChange.objects.filter(task_id=task.pk))
+
     def perform_create(self, serializer):
         """
         Создает новую задачу.
@@ -214,7 +517,7 @@ class TaskViewSet(viewsets.ModelViewSet):
         serializer.save()
 
 
-class StatusViewSet(viewsets.ModelViewSet):
+class StatusViewSet(ReferenceCacheMixin, viewsets.ModelViewSet):
     """
     ViewSet для управления статусами задач.
 
@@ -238,7 +541,7 @@ class StatusViewSet(viewsets.ModelViewSet):
         return [permissions.IsAuthenticated(), permissions.IsAdminUser()]
 
 
-class PriorityViewSet(viewsets.ModelViewSet):
+class PriorityViewSet(ReferenceCacheMixin, viewsets.ModelViewSet):
     """
     ViewSet для управления приоритетами задач.
 
@@ -262,7 +565,13 @@ class PriorityViewSet(viewsets.ModelViewSet):
         return [permissions.IsAuthenticated(), permissions.IsAdminUser()]
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    CompiledListMixin,
+    SparseFieldsViewMixin,
+    HistoryActorMixin,
+    ChangedSinceMixin,
+    viewsets.ModelViewSet,
+):
     """
     ViewSet для управления комментариями к задачам.
 
@@ -270,13 +579,18 @@ class CommentViewSet(viewsets.ModelViewSet):
     - Просмотр списка комментариев, деталей и создание доступно всем аутентифицированным пользователям
     - Изменение и удаление комментариев доступно только автору комментария или администратору
     - Поддерживает загрузку файлов в комментариях
+    - Параметр changed_since возвращает только изменения после курсора
+    - Параметры fields и expand выбирают поля ответа и загружаемые связи
+    - Список без fields и expand строится скомпилированным сериализатором
     """
 
     queryset = Comment.objects.select_related("author", "task").all()
     serializer_class = CommentSerializer
+    compiled_serializer = CompiledSerializer(CommentSerializer)
     parser_classes = [MultiPartParser, FormParser]
     filter_backends = [filters.SearchFilter]
     search_fields = ["text"]
+    tombstone_kind = Tombstone.Kind.COMMENT
 
     def get_permissions(self):
         """
@@ -296,7 +610,9 @@ class CommentViewSet(viewsets.ModelViewSet):
         Returns:
             QuerySet: Список комментариев, отфильтрованных по параметрам запроса
         """
-        queryset = super().get_queryset()
+        queryset = hide_deleting(
+            super().get_queryset(), "author", "task__project", "task__creator"
+        )
         task_id = self.request.query_params.get("task")
         task_issue_id = self.request.query_params.get("task_issue_id")
         if task_issue_id:
@@ -308,3 +624,145 @@ class CommentViewSet(viewsets.ModelViewSet):
             except (ValueError, TypeError):
                 return queryset
         return queryset
+
+    def filter_tombstones(self, tombstones):
+        """
+        Ограничивает записи об удалении задачей из параметров task или task_issue_id.
+
+        Args:
+            tombstones (QuerySet): Записи об удалении комментариев
+
+        Returns:
+            QuerySet: Отфильтрованные записи
+        """
+        task_id = self.request.query_params.get("task")
+        task_issue_id = self.request.query_params.get("task_issue_id")
+        if task_issue_id:
+            return tombstones.filter(
+                task_id__in=Task.objects.filter(issue_id=task_issue_id).values("id")
+            )
+        if task_id and task_id.isdigit():
+            return tombstones.filter(task_id=int(task_id))
+        return tombstones
+
+
+class AttachmentUploadViewSet(
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    ViewSet для возобновляемой загрузки вложений по частям.
+
+    Предоставляет операции:
+    - Создание загрузки с указанием задачи, имени и размера файла
+    - Приём частей через PUT с заголовком Upload-Offset (тело — сырые байты)
+    - Получение текущего смещения для возобновления прерванной загрузки
+    - Завершение загрузки с созданием комментария и отмену загрузки
+    Пользователь видит только свои загрузки.
+    """
+
+    serializer_class = AttachmentUploadSerializer
+    parser_classes = [JSONParser, FormParser]
+
+    def get_queryset(self):
+        """
+        Возвращает queryset загрузок текущего пользователя.
+
+        Returns:
+            QuerySet: Незавершённые загрузки пользователя
+        """
+        return AttachmentUpload.objects.filter(owner=self.request.user)
+
+    def perform_create(self, serializer):
+        """
+        Создает загрузку, проверяя доступ пользователя к задаче.
+
+        Args:
+            serializer: Сериализатор с данными загрузки
+        """
+        task = serializer.validated_data["task"]
+        if not user_can_view_task(self.request.user, task):
+            raise PermissionDenied("Нет доступа к задаче")
+        serializer.save(owner=self.request.user)
+
+    def update(self, request, *args, **kwargs):
+        """
+        Принимает очередную часть файла.
+
+        Тело запроса читается потоком и дописывается в файл без
+        буферизации в памяти. Смещение части передаётся в заголовке
+        Upload-Offset и должно совпадать с количеством принятых байт.
+
+        Returns:
+            Response: Новое смещение загрузки или 409 с текущим смещением
+        """
+        try:
+            offset = int(request.headers.get("Upload-Offset", ""))
+            length = int(request.headers.get("Content-Length", ""))
+        except ValueError:
+            raise ValidationError(
+                {"detail": "Необходимо указать Upload-Offset и Content-Length"}
+            )
+        with transaction.atomic():
+            upload = get_object_or_404(
+                self.get_queryset().select_for_update(), pk=kwargs["pk"]
+            )
+            try:
+                new_offset = append_chunk(upload, request.stream, offset, length)
+            except UploadOffsetConflict as exc:
+                return Response(
+                    {
+                        "detail": "Смещение части не совпадает с принятыми данными",
+                        "offset": exc.offset,
+                    },
+                    status=status.HTTP_409_CONFLICT,
+                    headers={"Upload-Offset": exc.offset},
+                )
+        response = Response(
+            {"id": upload.pk, "offset": new_offset, "size": upload.size}
+        )
+        response["Upload-Offset"] = new_offset
+        return response
+
+    def destroy(self, request, *args, **kwargs):
+        """
+        Отменяет загрузку и удаляет принятые данные.
+
+        Returns:
+            Response: Пустой ответ со статусом 204
+        """
+        discard_upload(self.get_object())
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=True, methods=["post"])
+    def finalize(self, request, pk=None):
+        """
+        Завершает загрузку и создает комментарий с вложением.
+
+        Args:
+            request: HTTP запрос с необязательным полем text
+            pk: ID загрузки
+
+        Returns:
+            Response: Данные созданного комментария
+        """
+        with transaction.atomic():
+            upload = get_object_or_404(self.get_queryset().select_for_update(), pk=pk)
+            comment = finalize_upload(
+                upload, request.user, request.data.get("text", "")
+            )
+        serializer = CommentSerializer(comment, context=self.get_serializer_context())
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class PendingDeletionViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet для отслеживания фонового удаления проектов и пользователей.
+
+    Доступен только администраторам.
+    """
+
+    queryset = PendingDeletion.objects.all()
+    serializer_class = PendingDeletionSerializer
+    permission_classes = [permissions.IsAuthenticated, permissions.IsAdminUser]
@@ -9,6 +9,8 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as DjangoUserAdmin
 from django.utils.html import format_html
 
+from config.deletion import DeferredDeleteAdminMixin
+
 from .models import Position, User
 
 
@@ -27,12 +29,12 @@ class PositionAdmin(admin.ModelAdmin):
 
 
 @admin.register(User)
-class UserAdmin(DjangoUserAdmin):
+class UserAdmin(DeferredDeleteAdminMixin, DjangoUserAdmin):
     """
     Административный интерфейс для модели User.
 
     Расширяет стандартный UserAdmin дополнительными полями и
-    настройками отображения пользователей.
+    настройками отображения пользователей. Удаление выполняется в фоне.
     """
 
     model = User
@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand
+
+from ...tokens import (
+    ensure_token_indexes,
+    get_cleanup_settings,
+    purge_expired_tokens,
+    token_table_stats,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Удаляет истёкшие JWT-токены из OutstandingToken и BlacklistedToken "
+        "пакетами в коротких транзакциях.\n\n"
+        "Запуск:\n  python manage.py purge_expired_tokens --ensure-indexes\n"
+        "В Docker:\n  docker-compose exec backend python manage.py purge_expired_tokens"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Количество токенов в одном пакете",
+        )
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            default=None,
+            help="Максимальное число пакетов за запуск",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=None,
+            help="Пауза между пакетами в секундах",
+        )
+        parser.add_argument(
+            "--ensure-indexes",
+            action="store_true",
+            help="Создать индекс по expires_at перед очисткой",
+        )
+
+    def handle(self, *args, **options):
+        if options["ensure_indexes"] and ensure_token_indexes():
+            self.stdout.write("✓ Индекс по expires_at на месте")
+
+        batch_size = options["batch_size"] or get_cleanup_settings()["BATCH_SIZE"]
+        stats = purge_expired_tokens(
+            batch_size=batch_size,
+            max_batches=options["max_batches"],
+            pause=options["pause"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Удалено токенов: {stats['outstanding_deleted']}, "
+                f"записей чёрного списка: {stats['blacklisted_deleted']} "
+                f"за {stats['batches']} пакетов, {stats['duration_seconds']} с "
+                f"({stats['rows_per_second']} строк/с)"
+            )
+        )
+        for key, table in token_table_stats().items():
+            if key == "last_purge":
+                continue
+            self.stdout.write(
+                f"{table['table']}: ~{table['estimated_rows']} строк, "
+                f"{table['total_bytes']} байт"
+            )
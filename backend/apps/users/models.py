@@ -1,6 +1,11 @@
-from django.contrib.auth.models import AbstractUser
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.db import models
 
+from config.thumbnails import existing_thumbnails
+
 
 class Position(models.Model):
     """
@@ -30,6 +35,18 @@ class Position(models.Model):
         return self.name
 
 
+class ActiveUserManager(UserManager):
+    """
+    Менеджер пользователей, скрывающий пользователей, ожидающих удаления.
+
+    Через него же выполняется вход и проверка JWT, поэтому удаляемый
+    пользователь сразу теряет доступ к API.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleting_at__isnull=True)
+
+
 class User(AbstractUser):
     """
     Расширенная модель пользователя системы.
@@ -39,6 +56,11 @@ class User(AbstractUser):
     - Роль пользователя (user/admin)
     - Аватар пользователя
     - Обязательные поля: email, first_name, last_name
+
+    Удаляемый пользователь отмечается deleting_at и скрывается менеджером
+    objects, а его задачи и комментарии удаляются в фоне
+    (см. apps/tasks/deletion.py). Менеджер all_objects возвращает всех
+    пользователей.
     """
 
     ROLE_CHOICES = (
@@ -72,6 +94,21 @@ class User(AbstractUser):
     avatar = models.ImageField(
         upload_to="avatars/", null=True, blank=True, help_text="Аватар пользователя"
     )
+    cache_version = models.PositiveBigIntegerField(
+        default=0,
+        editable=False,
+        help_text="Версия данных пользователя (ключ кэша фрагментов задач)",
+    )
+    deleting_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True,
+        help_text="Время запроса удаления (пользователь скрыт и удаляется в фоне)",
+    )
+
+    objects = ActiveUserManager()
+    all_objects = UserManager()
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["username"]
@@ -89,6 +126,24 @@ class User(AbstractUser):
         """
         return self.email
 
+    def save(self, *args, **kwargs):
+        """
+        Сохраняет пользователя, не перезаписывая версию кэша и отметку
+        удаления из памяти.
+
+        cache_version и deleting_at меняются только атомарным UPDATE
+        (bump_cache_versions, request_deletion), поэтому при обновлении
+        они исключаются из сохраняемых полей.
+        """
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in ("cache_version", "deleting_at")
+            ]
+        super().save(*args, **kwargs)
+
     @property
     def avatar_url(self):
         """
@@ -100,11 +155,79 @@ class User(AbstractUser):
         Returns:
             str: URL аватара пользователя
         """
-        if self.avatar:
-            return self.avatar.url
-        import hashlib
-
-        hash_email = hashlib.sha256(
-            self.email.lower().strip().encode("utf-8")
-        ).hexdigest()
-        return f"https://www.gravatar.com/avatar/{hash_email}?s=256&d=identicon&r=PG"
+        return avatar_url_for(self.avatar.name, self.email)
+
+    @property
+    def avatar_urls(self):
+        """
+        Возвращает URL уменьшенных копий аватара по размерам.
+
+        Для загруженного аватара включаются только уже созданные копии,
+        для Gravatar размер передаётся в параметре запроса.
+
+        Returns:
+            dict: Размер в пикселях -> URL
+        """
+        return avatar_urls_for(self.avatar.name, self.email)
+
+    def gravatar_url(self, size):
+        """
+        Возвращает URL Gravatar на основе email.
+
+        Args:
+            size (int): Размер изображения в пикселях
+
+        Returns:
+            str: URL аватара Gravatar
+        """
+        return gravatar_url_for(self.email, size)
+
+
+def gravatar_url_for(email, size):
+    """
+    Возвращает URL Gravatar для email.
+
+    Args:
+        email (str): Email пользователя
+        size (int): Размер изображения в пикселях
+
+    Returns:
+        str: URL аватара Gravatar
+    """
+    hash_email = hashlib.sha256(email.lower().strip().encode("utf-8")).hexdigest()
+    return f"https://www.gravatar.com/avatar/{hash_email}?s={size}&d=identicon&r=PG"
+
+
+def avatar_url_for(name, email):
+    """
+    Возвращает URL аватара по имени файла и email без загрузки пользователя.
+
+    Args:
+        name (str | None): Имя файла аватара в хранилище
+        email (str): Email пользователя (для Gravatar)
+
+    Returns:
+        str: URL аватара
+    """
+    if name:
+        return User._meta.get_field("avatar").storage.url(name)
+    return gravatar_url_for(email, 256)
+
+
+def avatar_urls_for(name, email):
+    """
+    Возвращает URL уменьшенных копий аватара по имени файла и email.
+
+    Args:
+        name (str | None): Имя файла аватара в хранилище
+        email (str): Email пользователя (для Gravatar)
+
+    Returns:
+        dict: Размер в пикселях -> URL
+    """
+    sizes = settings.THUMBNAIL_SIZES["avatar"]
+    if not name:
+        return {size: gravatar_url_for(email, size) for size in sizes}
+    storage = User._meta.get_field("avatar").storage
+    ready = existing_thumbnails(storage, name, sizes)
+    return {size: storage.url(thumb) for size, thumb in ready.items()}
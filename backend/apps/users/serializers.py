@@ -8,7 +8,11 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
-from .models import Position
+from config.deletion import IncludeDeletingUniqueMixin
+from config.fieldsets import SparseFieldsMixin
+from config.identity import IdentityMapMixin
+
+from .models import Position, avatar_url_for, avatar_urls_for
 
 User = get_user_model()
 
@@ -25,15 +29,29 @@ class PositionSerializer(serializers.ModelSerializer):
         fields = ["id", "name"]
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(
+    IdentityMapMixin,
+    SparseFieldsMixin,
+    IncludeDeletingUniqueMixin,
+    serializers.ModelSerializer,
+):
     """
     Сериализатор для модели User.
 
     Предоставляет полную сериализацию данных пользователя, включая
-    связанную должность и аватар. Поддерживает создание и обновление
-    пользователей с хешированием пароля.
+    связанную должность, аватар и его уменьшенные копии. Поддерживает создание и обновление
+    пользователей с хешированием пароля. Поддерживает параметры fields и expand.
+    При чтении каждый пользователь сериализуется один раз на запрос.
+    Уникальность username и email проверяется и среди удаляемых пользователей.
     """
 
+    expandable_fields = ("position",)
+    select_related_fields = {"position": "position"}
+    compiled_methods = {
+        "avatar_url": ("avatar", "email"),
+        "avatar_urls": ("avatar", "email"),
+    }
+
     position = PositionSerializer(read_only=True)
     position_id = serializers.PrimaryKeyRelatedField(
         queryset=Position.objects.all(),
@@ -45,6 +63,7 @@ class UserSerializer(serializers.ModelSerializer):
         required=False, allow_null=True, help_text="Аватар пользователя"
     )
     avatar_url = serializers.SerializerMethodField()
+    avatar_urls = serializers.SerializerMethodField()
     password = serializers.CharField(
         write_only=True,
         required=False,
@@ -63,10 +82,11 @@ class UserSerializer(serializers.ModelSerializer):
             "position_id",
             "avatar",
             "avatar_url",
+            "avatar_urls",
             "is_superuser",
             "password",
         ]
-        read_only_fields = ["id", "is_superuser", "avatar_url"]
+        read_only_fields = ["id", "is_superuser", "avatar_url", "avatar_urls"]
 
     def get_avatar_url(self, obj):
         """
@@ -78,7 +98,31 @@ class UserSerializer(serializers.ModelSerializer):
         Returns:
             str: URL аватара
         """
-        return obj.avatar_url
+        return self.row_avatar_url(self.context, obj.avatar.name, obj.email)
+
+    def get_avatar_urls(self, obj):
+        """
+        Возвращает URL уменьшенных копий аватара по размерам.
+
+        Args:
+            obj: Объект пользователя
+
+        Returns:
+            dict: Размер в пикселях -> URL
+        """
+        return self.row_avatar_urls(self.context, obj.avatar.name, obj.email)
+
+    def row_avatar_url(self, context, avatar, email):
+        """
+        Возвращает URL аватара по значениям столбцов avatar и email.
+        """
+        return avatar_url_for(avatar, email)
+
+    def row_avatar_urls(self, context, avatar, email):
+        """
+        Возвращает URL копий аватара по значениям столбцов avatar и email.
+        """
+        return {str(size): url for size, url in avatar_urls_for(avatar, email).items()}
 
     def create(self, validated_data):
         """
@@ -98,7 +142,7 @@ class UserSerializer(serializers.ModelSerializer):
         return user
 
 
-class UserCreateSerializer(serializers.ModelSerializer):
+class UserCreateSerializer(IncludeDeletingUniqueMixin, serializers.ModelSerializer):
     """
     Сериализатор для создания нового пользователя.
 
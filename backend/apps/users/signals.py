@@ -0,0 +1,35 @@
+"""
+Обработчики сигналов моделей приложения users.
+
+Подключаются в UsersConfig.ready().
+"""
+
+from django.conf import settings
+from django.db.models.signals import post_init, post_save
+from django.dispatch import receiver
+
+from config.thumbnails import schedule_thumbnails
+
+from .models import User
+
+
+@receiver(post_init, sender=User)
+def remember_avatar(sender, instance, **kwargs):
+    """
+    Запоминает имя аватара загруженного пользователя.
+    """
+    value = instance.__dict__.get("avatar")
+    instance._stored_avatar = str(value) if value else ""
+
+
+@receiver(post_save, sender=User)
+def generate_avatar_thumbnails(sender, instance, **kwargs):
+    """
+    Планирует создание уменьшенных копий нового аватара.
+    """
+    current = instance.avatar.name or ""
+    if current and current != getattr(instance, "_stored_avatar", ""):
+        schedule_thumbnails(
+            instance.avatar.storage, current, settings.THUMBNAIL_SIZES["avatar"]
+        )
+    instance._stored_avatar = current
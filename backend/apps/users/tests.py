@@ -1,9 +1,24 @@
+from datetime import timedelta
+
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
 from rest_framework.test import APIRequestFactory
 from rest_framework.test import force_authenticate
 
 from apps.users.models import Position
+from apps.users.tokens import (
+    LAST_PURGE_KEY,
+    purge_expired_tokens,
+    token_table_stats,
+)
+from apps.users.views import UserViewSet
 from apps.users.serializers import (
     UserSerializer,
     UserCreateSerializer,
@@ -77,3 +92,196 @@ def test_user_create_serializer():
     user = serializer.save()
     assert user.username == "createuser"
     assert user.check_password("testpass123")
+
+
+def _make_tokens(user, count, expires_at, blacklist=False):
+    for i in range(count):
+        token = OutstandingToken.objects.create(
+            user=user,
+            jti=f"{expires_at.timestamp()}-{i}",
+            token="t",
+            expires_at=expires_at,
+        )
+        if blacklist:
+            BlacklistedToken.objects.create(token=token)
+
+
+@pytest.mark.django_db
+def test_purge_expired_tokens_in_batches():
+    user = User.objects.create(username="tok", email="tok@example.com")
+    now = timezone.now()
+    _make_tokens(user, 5, now - timedelta(days=1), blacklist=True)
+    _make_tokens(user, 2, now + timedelta(days=1), blacklist=True)
+    stats = purge_expired_tokens(batch_size=2)
+    assert stats["outstanding_deleted"] == 5
+    assert stats["blacklisted_deleted"] == 5
+    assert stats["batches"] == 3
+    assert OutstandingToken.objects.count() == 2
+    assert BlacklistedToken.objects.count() == 2
+    assert token_table_stats()["last_purge"]["outstanding_deleted"] == 5
+
+
+@pytest.mark.django_db
+def test_purge_expired_tokens_max_batches_and_command():
+    user = User.objects.create(username="tok", email="tok@example.com")
+    _make_tokens(user, 4, timezone.now() - timedelta(hours=1))
+    stats = purge_expired_tokens(batch_size=1, max_batches=2)
+    assert stats["outstanding_deleted"] == 2
+    call_command("purge_expired_tokens", "--batch-size", "10")
+    assert OutstandingToken.objects.count() == 0
+    # Результат последней очистки читается из общего кэша, а не из процесса
+    last_purge = caches["shared"].get(LAST_PURGE_KEY)
+    assert last_purge["outstanding_deleted"] == 2
+    assert token_table_stats()["last_purge"] == last_purge
+
+
+@pytest.mark.django_db
+def test_token_stats_admin_only():
+    factory = APIRequestFactory()
+    user = User.objects.create(username="user", email="user@example.com")
+    admin = User.objects.create(
+        username="admin", email="admin@example.com", is_staff=True
+    )
+    view = UserViewSet.as_view({"get": "token_stats"})
+    request = factory.get("/users/token-stats/")
+    force_authenticate(request, user=user)
+    assert view(request).status_code == 403
+    request = factory.get("/users/token-stats/")
+    force_authenticate(request, user=admin)
+    response = view(request)
+    assert response.status_code == 200
+    assert "outstanding" in response.data
+
+
+def _png_bytes(size=(400, 300)):
+    import io
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", size, "red").save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+@pytest.mark.django_db
+def test_avatar_thumbnails_generated_on_upload(
+    settings, tmp_path, monkeypatch, django_capture_on_commit_callbacks
+):
+    from django.core.files.uploadedfile import SimpleUploadedFile
+
+    settings.MEDIA_ROOT = tmp_path
+    settings.THUMBNAIL_WORKERS = 0
+    user = User.objects.create(username="ava", email="ava@example.com")
+    data = UserSerializer(user).data
+    assert data["avatar_urls"]["40"].startswith("https://www.gravatar.com/avatar/")
+    assert "s=40" in data["avatar_urls"]["40"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        user.avatar = SimpleUploadedFile("me.png", _png_bytes())
+        user.save()
+    storage = User._meta.get_field("avatar").storage
+    monkeypatch.setattr(storage, "exists", lambda name: pytest.fail(f"stat {name}"))
+    data = UserSerializer(User.objects.get(pk=user.pk)).data
+    monkeypatch.undo()
+    assert set(data["avatar_urls"]) == {"40", "80", "160"}
+    assert data["avatar_urls"]["40"].endswith("_40.webp")
+    from PIL import Image
+
+    with Image.open(
+        tmp_path / data["avatar_urls"]["160"].removeprefix("/media/")
+    ) as im:
+        assert max(im.size) == 160
+
+
+@pytest.mark.django_db
+def test_two_tier_cache_lru_single_flight_and_metrics(settings, monkeypatch):
+    import threading
+    import time
+
+    from config import cache as two_tier
+
+    settings.CACHES = {
+        **settings.CACHES,
+        "test-shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    }
+    from django.core.cache import caches
+
+    shared = caches["test-shared"]
+    shared.clear()
+    monkeypatch.setattr(two_tier, "_tiers", {})
+    monkeypatch.setattr(two_tier, "_metrics", {})
+    params = {
+        "OPTIONS": {
+            "SHARED": "test-shared",
+            "MAX_ENTRIES": 2,
+            "LOCAL_TIMEOUT": 60,
+            "LOCK_TIMEOUT": 5,
+        }
+    }
+    cache = two_tier.TwoTierCache("two-tier", params)
+
+    # LRU: третья запись вытесняет самую старую, она читается из общего уровня
+    cache.set("ns:a:1", {"a": 1})
+    cache.set("ns:b:1", 2)
+    assert cache.get("ns:a:1") == {"a": 1}
+    cache.set("ns:c:1", 3)
+    assert cache.get("ns:b:1") == 2
+    assert cache.get_many(["ns:a:1", "ns:c:1", "ns:d:1"]) == {
+        "ns:a:1": {"a": 1},
+        "ns:c:1": 3,
+    }
+    cache.delete("ns:a:1")
+    assert cache.get("ns:a:1") is None and shared.get("ns:a:1") is None
+
+    # Одновременные промахи вычисляются один раз
+    calls = []
+    barrier = threading.Barrier(6)
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return "value"
+
+    def worker(results):
+        barrier.wait()
+        results.append(
+            two_tier.TwoTierCache("two-tier", params).get_or_set("ns:hot:1", compute)
+        )
+
+    results = []
+    threads = [threading.Thread(target=worker, args=(results,)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ["value"] * 6 and len(calls) == 1
+
+    # Ключ, который вычисляет другой процесс, ждётся в общем кэше
+    shared.add("ns:other:1:lock", 1)
+
+    def other_process():
+        time.sleep(0.1)
+        shared.set("ns:other:1", "remote")
+        shared.delete("ns:other:1:lock")
+
+    threading.Thread(target=other_process).start()
+    assert cache.get_or_set("ns:other:1", lambda: "local") == "remote"
+
+    # Локальный уровень не хранит запись дольше LOCAL_TIMEOUT
+    clock = time.monotonic() + 61
+    monkeypatch.setattr(two_tier.time, "monotonic", lambda: clock)
+    shared.delete("ns:other:1")
+    assert cache.get("ns:other:1") is None
+
+    counts = two_tier.cache_metrics()["two-tier"]["namespaces"]
+    assert counts["ns:b"]["evictions"] == 2 and counts["ns:b"]["shared_hits"] == 1
+    assert counts["ns:d"]["misses"] == 1
+    assert counts["ns:hot"]["computed"] == 1 and counts["ns:hot"]["coalesced"] == 5
+    assert counts["ns:other"]["coalesced"] == 1 and counts["ns:other"]["computed"] == 0
+    assert counts["ns:other"]["expirations"] == 1
+
+    admin = User.objects.create(username="admin", is_staff=True)
+    request = APIRequestFactory().get("/users/cache-stats/")
+    force_authenticate(request, user=admin)
+    response = UserViewSet.as_view({"get": "cache_stats"})(request)
+    assert response.status_code == 200
+    assert response.data["caches"]["two-tier"]["namespaces"]["ns:hot"]["computed"] == 1
@@ -0,0 +1,235 @@
+"""
+Обслуживание таблиц чёрного списка JWT-токенов.
+
+При BLACKLIST_AFTER_ROTATION каждый вызов /api/token/refresh/ добавляет строки
+в OutstandingToken и BlacklistedToken, а SimpleJWT их никогда не удаляет.
+Модуль предоставляет:
+- Пакетное удаление истёкших токенов короткими транзакциями
+- Индекс по expires_at, по которому выбираются истёкшие токены
+- Метрики размера таблиц и скорости очистки (результат последней очистки
+  хранится в общем кэше и виден всем процессам)
+- Необязательный фоновый поток для периодической очистки внутри процесса
+"""
+
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+logger = logging.getLogger(__name__)
+
+# Ключ advisory-блокировки Postgres: очистку одновременно выполняет один процесс
+CLEANUP_LOCK_KEY = 0x4A575443
+
+EXPIRES_AT_INDEX = "token_outstanding_expires_at_idx"
+
+# Результат последней очистки в общем кэше: очистку выполняет один воркер
+# или команда управления, а метрики запрашиваются у любого процесса
+LAST_PURGE_KEY = "tokens:last-purge"
+
+_runner = None
+
+
+def get_cleanup_settings():
+    """
+    Возвращает настройки очистки токенов с подставленными значениями по умолчанию.
+
+    Returns:
+        dict: Настройки BATCH_SIZE, BATCH_PAUSE_SECONDS и INTERVAL_SECONDS
+    """
+    options = {
+        "BATCH_SIZE": 5000,
+        "BATCH_PAUSE_SECONDS": 0.0,
+        "INTERVAL_SECONDS": 0,
+    }
+    options.update(getattr(settings, "TOKEN_CLEANUP", {}))
+    return options
+
+
+def ensure_token_indexes():
+    """
+    Создаёт индекс по OutstandingToken.expires_at, если его ещё нет.
+
+    Поиск по jti уже обслуживается уникальными индексами SimpleJWT
+    (OutstandingToken.jti и BlacklistedToken.token_id), а для выборки
+    истёкших токенов без полного сканирования нужен индекс по expires_at.
+    Индекс строится через CONCURRENTLY, чтобы не блокировать запись.
+
+    Returns:
+        bool: True, если индекс был создан или уже существует
+    """
+    if connection.vendor != "postgresql":
+        return False
+    table = OutstandingToken._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {EXPIRES_AT_INDEX} "
+            f"ON {table} (expires_at)"
+        )
+    return True
+
+
+def purge_expired_tokens(batch_size=None, max_batches=None, pause=None, now=None):
+    """
+    Удаляет истёкшие токены пакетами фиксированного размера.
+
+    Каждый пакет удаляется в отдельной короткой транзакции: сначала записи
+    BlacklistedToken, затем соответствующие OutstandingToken. Блокировки
+    держатся только на время удаления одного пакета.
+
+    Args:
+        batch_size (int): Количество токенов в одном пакете
+        max_batches (int): Максимальное число пакетов за запуск (None — без ограничения)
+        pause (float): Пауза между пакетами в секундах
+        now (datetime): Момент времени, относительно которого токен считается истёкшим
+
+    Returns:
+        dict: Статистика очистки (удалённые строки, число пакетов, длительность, скорость)
+    """
+    options = get_cleanup_settings()
+    batch_size = batch_size or options["BATCH_SIZE"]
+    pause = options["BATCH_PAUSE_SECONDS"] if pause is None else pause
+    now = now or timezone.now()
+
+    outstanding_deleted = 0
+    blacklisted_deleted = 0
+    batches = 0
+    started = time.monotonic()
+    while max_batches is None or batches < max_batches:
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lte=now)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        with transaction.atomic():
+            deleted, _ = BlacklistedToken.objects.filter(token_id__in=ids).delete()
+            blacklisted_deleted += deleted
+            deleted, _ = OutstandingToken.objects.filter(id__in=ids).delete()
+            outstanding_deleted += deleted
+        batches += 1
+        if len(ids) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+
+    duration = time.monotonic() - started
+    total = outstanding_deleted + blacklisted_deleted
+    stats = {
+        "outstanding_deleted": outstanding_deleted,
+        "blacklisted_deleted": blacklisted_deleted,
+        "batches": batches,
+        "duration_seconds": round(duration, 3),
+        "rows_per_second": round(total / duration, 1) if duration else 0.0,
+        "finished_at": timezone.now().isoformat(),
+    }
+    caches["shared"].set(LAST_PURGE_KEY, stats, timeout=None)
+    return stats
+
+
+def purge_expired_tokens_locked(**kwargs):
+    """
+    Выполняет очистку, если её не выполняет другой процесс.
+
+    Используется фоновым потоком: при нескольких воркерах gunicorn
+    advisory-блокировка Postgres гарантирует, что очистка идёт в одном из них.
+
+    Returns:
+        dict | None: Статистика очистки или None, если блокировка занята
+    """
+    if connection.vendor != "postgresql":
+        return purge_expired_tokens(**kwargs)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", [CLEANUP_LOCK_KEY])
+        if not cursor.fetchone()[0]:
+            return None
+    try:
+        return purge_expired_tokens(**kwargs)
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", [CLEANUP_LOCK_KEY])
+
+
+def token_table_stats():
+    """
+    Собирает метрики таблиц чёрного списка токенов.
+
+    Количество строк берётся из статистики планировщика Postgres (reltuples),
+    чтобы не выполнять COUNT(*) по многомиллионным таблицам.
+
+    Returns:
+        dict: Размеры таблиц, оценка числа строк и результаты последней очистки
+    """
+    tables = {
+        "outstanding": OutstandingToken._meta.db_table,
+        "blacklisted": BlacklistedToken._meta.db_table,
+    }
+    result = {}
+    for key, table in tables.items():
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT GREATEST(c.reltuples, 0)::bigint, "
+                    "pg_total_relation_size(c.oid) "
+                    "FROM pg_class c WHERE c.oid = %s::regclass",
+                    [table],
+                )
+                rows, size = cursor.fetchone()
+        else:
+            model = OutstandingToken if key == "outstanding" else BlacklistedToken
+            rows, size = model.objects.count(), None
+        result[key] = {"table": table, "estimated_rows": rows, "total_bytes": size}
+    result["last_purge"] = caches["shared"].get(LAST_PURGE_KEY)
+    return result
+
+
+class TokenCleanupRunner(threading.Thread):
+    """
+    Фоновый поток, периодически очищающий истёкшие токены.
+
+    Запускается из config/wsgi.py, если TOKEN_CLEANUP["INTERVAL_SECONDS"] > 0.
+    """
+
+    def __init__(self, interval):
+        super().__init__(name="token-cleanup", daemon=True)
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                stats = purge_expired_tokens_locked()
+                if stats:
+                    logger.info("Очистка токенов: %s", stats)
+            except Exception:
+                logger.exception("Ошибка очистки истёкших токенов")
+            finally:
+                connection.close()
+
+    def stop(self):
+        self.stopped.set()
+
+
+def start_cleanup_runner():
+    """
+    Запускает фоновый поток очистки, если он включён в настройках.
+
+    Returns:
+        TokenCleanupRunner | None: Запущенный поток или None
+    """
+    global _runner
+    interval = get_cleanup_settings()["INTERVAL_SECONDS"]
+    if not interval or _runner is not None:
+        return _runner
+    _runner = TokenCleanupRunner(interval)
+    _runner.start()
+    return _runner
@@ -4,19 +4,28 @@
 Определяет ViewSet'ы для работы с пользователями и их должностями.
 """
 
+import os
+
 from django.contrib.auth import get_user_model
 from rest_framework import viewsets, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from config.cache import cache_metrics
+from config.deletion import DeferredDestroyMixin
+from config.fieldsets import SparseFieldsViewMixin
+from config.invalidation import invalidation_metrics
+from config.reference import ReferenceCacheMixin
+
 from .models import Position
 from .permissions import IsAdminOrSelf
 from .serializers import UserSerializer, UserCreateSerializer, PositionSerializer
+from .tokens import token_table_stats
 
 User = get_user_model()
 
 
-class PositionViewSet(viewsets.ModelViewSet):
+class PositionViewSet(ReferenceCacheMixin, viewsets.ModelViewSet):
     """
     ViewSet для управления должностями пользователей.
 
@@ -39,12 +48,15 @@ class PositionViewSet(viewsets.ModelViewSet):
         return [permissions.IsAuthenticated(), permissions.IsAdminUser()]
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SparseFieldsViewMixin, DeferredDestroyMixin, viewsets.ModelViewSet):
     """
     ViewSet для управления пользователями системы.
 
     Предоставляет CRUD операции для пользователей с различными
-    уровнями доступа в зависимости от роли пользователя.
+    уровнями доступа в зависимости от роли пользователя. Удаление
+    выполняется в фоне: пользователь сразу скрывается и теряет доступ,
+    его задачи и комментарии удаляются пакетами, ответ 202. Параметры
+    fields и expand выбирают поля ответа и загружаемые связи.
     """
 
     queryset = User.objects.select_related("position").all()
@@ -54,13 +66,13 @@ class UserViewSet(viewsets.ModelViewSet):
         """
         Определяет права доступа для различных действий.
 
-        - Создание, удаление и просмотр списка доступны только администраторам
+        - Создание, удаление, просмотр списка и метрики токенов доступны только администраторам
         - Остальные операции доступны администраторам и владельцам записей
 
         Returns:
             list: Список классов разрешений
         """
-        if self.action in ["create", "destroy", "list"]:
+        if self.action in ["create", "destroy", "list", "token_stats", "cache_stats"]:
             return [permissions.IsAuthenticated(), permissions.IsAdminUser()]
         return [permissions.IsAuthenticated(), IsAdminOrSelf()]
 
@@ -86,5 +98,38 @@ class UserViewSet(viewsets.ModelViewSet):
         Returns:
             Response: Данные текущего пользователя
         """
-        serializer = UserSerializer(request.user)
+        serializer = UserSerializer(request.user, context=self.get_serializer_context())
         return Response(serializer.data)
+
+    @action(detail=False, methods=["get"], url_path="token-stats")
+    def token_stats(self, request):
+        """
+        Возвращает метрики таблиц чёрного списка JWT-токенов.
+
+        Args:
+            request: HTTP запрос
+
+        Returns:
+            Response: Размеры таблиц и результаты последней очистки
+        """
+        return Response(token_table_stats())
+
+    @action(detail=False, methods=["get"], url_path="cache-stats")
+    def cache_stats(self, request):
+        """
+        Возвращает метрики кэшей процесса, обработавшего запрос.
+
+        Args:
+            request: HTTP запрос
+
+        Returns:
+            Response: Размер локального уровня и счётчики по пространствам
+                имён, счётчики и задержка шины инвалидации
+        """
+        return Response(
+            {
+                "pid": os.getpid(),
+                "caches": cache_metrics(),
+                "invalidation": invalidation_metrics(),
+            }
+        )
@@ -0,0 +1,19 @@
+"""
+ASGI конфигурация для проекта.
+
+Используется сервисом events, который держит долгие соединения потока
+событий (/api/tasks/events/). Остальные запросы обслуживает WSGI-приложение.
+Поток приёма инвалидаций кэшей запускается, как и в config/wsgi.py.
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+application = get_asgi_application()
+
+from config.invalidation import start_invalidation_listener  # noqa: E402
+
+start_invalidation_listener()
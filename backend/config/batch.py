@@ -0,0 +1,250 @@
+"""
+Пакетный эндпоинт API: несколько запросов за один HTTP-запрос.
+
+При загрузке frontend запрашивает статусы, приоритеты, проекты
+и пользователей отдельными запросами, и каждый из них заново проходит
+middleware и проверку JWT. POST /api/batch/ принимает список запросов
+(method, path, body), аутентифицирует пользователя один раз и выполняет
+их в процессе через те же ViewSet'ы DRF, что и обычные запросы.
+
+Запросы выполняются по порядку и независимо: ошибка одного не отменяет
+остальные, общего atomic нет. Если все запросы только читают данные,
+они используют общую карту идентичности (config/identity.py),
+а с параметром concurrent выполняются параллельно в пуле потоков
+(не больше BATCH_CONCURRENCY одновременно). Каждый поток открывает своё
+соединение с базой, поэтому concurrent выгоден для медленных запросов
+(статистика, большие списки), а не для коротких справочников.
+"""
+
+import asyncio
+import json
+import logging
+from io import BytesIO
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connection
+from django.urls import Resolver404, resolve
+from rest_framework import serializers, status
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+API_PREFIX = "/api/"
+
+# Заголовки исходного запроса, которые не передаются вложенным запросам
+DROPPED_HEADERS = (
+    "HTTP_AUTHORIZATION",
+    "HTTP_ACCEPT_ENCODING",
+    "HTTP_CONTENT_LENGTH",
+    "HTTP_CONTENT_TYPE",
+    "HTTP_COOKIE",
+    "HTTP_IF_MATCH",
+    "HTTP_IF_NONE_MATCH",
+    "HTTP_IF_MODIFIED_SINCE",
+    "HTTP_IF_UNMODIFIED_SINCE",
+    "HTTP_RANGE",
+)
+
+
+class BatchItemSerializer(serializers.Serializer):
+    """
+    Вложенный запрос пакета.
+    """
+
+    method = serializers.ChoiceField(
+        choices=["GET", "HEAD", "OPTIONS", "POST", "PUT", "PATCH", "DELETE"]
+    )
+    path = serializers.CharField(max_length=2048)
+    body = serializers.JSONField(required=False, allow_null=True)
+
+    def to_internal_value(self, data):
+        if isinstance(data, dict) and isinstance(data.get("method"), str):
+            data = {**data, "method": data["method"].upper()}
+        return super().to_internal_value(data)
+
+    def validate_path(self, value):
+        if not value.startswith("/"):
+            value = f"/{value}"
+        if not value.startswith(API_PREFIX):
+            value = f"{API_PREFIX.rstrip('/')}{value}"
+        return value
+
+
+class BatchSerializer(serializers.Serializer):
+    """
+    Тело пакетного запроса.
+    """
+
+    requests = BatchItemSerializer(many=True, allow_empty=False)
+    concurrent = serializers.BooleanField(default=False)
+
+    def validate_requests(self, value):
+        if len(value) > settings.BATCH_MAX_REQUESTS:
+            raise serializers.ValidationError(
+                f"Не больше {settings.BATCH_MAX_REQUESTS} запросов в пакете"
+            )
+        return value
+
+
+def error_item(code, detail):
+    return {"status": code, "headers": {}, "body": {"detail": detail}}
+
+
+class BatchView(APIView):
+    """
+    POST /api/batch/ — выполняет список запросов API и возвращает их ответы.
+
+    Тело: {"requests": [{"method": "GET", "path": "/tasks/statuses/"}, ...],
+    "concurrent": false}. path указывается относительно /api/ или полностью.
+    Ответ: {"responses": [{"status", "headers", "body"}, ...]} в порядке запросов.
+    """
+
+    def post(self, request):
+        """
+        Выполняет пакет запросов от имени текущего пользователя.
+
+        Args:
+            request: HTTP запрос с телом BatchSerializer
+
+        Returns:
+            Response: Ответы вложенных запросов
+        """
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data["requests"]
+        read_only = all(item["method"] in SAFE_METHODS for item in items)
+        # Карта идентичности общая, только если пакет не изменяет данные
+        memo = {} if read_only else None
+        if read_only and serializer.validated_data["concurrent"] and len(items) > 1:
+            responses = async_to_sync(self.execute_concurrently)(request, items, memo)
+        else:
+            responses = [self.execute(request, item, memo) for item in items]
+        return Response({"responses": responses})
+
+    async def execute_concurrently(self, request, items, memo):
+        limit = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+        execute = sync_to_async(self.execute_in_thread, thread_sensitive=False)
+
+        async def run(item):
+            async with limit:
+                return await execute(request, item, memo)
+
+        return await asyncio.gather(*(run(item) for item in items))
+
+    def execute_in_thread(self, request, item, memo):
+        try:
+            return self.execute(request, item, memo)
+        finally:
+            # Соединение с базой принадлежит потоку пула, закрываем его
+            connection.close()
+
+    def build_request(self, request, item, path, query, memo):
+        """
+        Создаёт вложенный запрос с пользователем исходного запроса.
+
+        Args:
+            request: Исходный запрос DRF
+            item (dict): method и body вложенного запроса
+            path (str): Путь с учётом APPEND_SLASH
+            query (str): Строка запроса
+            memo (dict | None): Общая карта идентичности
+
+        Returns:
+            WSGIRequest: Запрос для представления
+        """
+        body = b""
+        if item.get("body") is not None:
+            body = json.dumps(item["body"]).encode()
+        meta = request._request.META
+        environ = {
+            key: value
+            for key, value in meta.items()
+            if key.startswith("HTTP_") and key not in DROPPED_HEADERS
+        }
+        environ.update(
+            {
+                "REQUEST_METHOD": item["method"],
+                "SCRIPT_NAME": meta.get("SCRIPT_NAME", ""),
+                "PATH_INFO": path,
+                "QUERY_STRING": query,
+                "SERVER_NAME": meta.get("SERVER_NAME", "localhost"),
+                "SERVER_PORT": str(meta.get("SERVER_PORT", "80")),
+                "REMOTE_ADDR": meta.get("REMOTE_ADDR", ""),
+                "CONTENT_TYPE": "application/json",
+                "CONTENT_LENGTH": str(len(body)),
+                "HTTP_ACCEPT": "application/json",
+                "wsgi.url_scheme": request.scheme,
+                "wsgi.input": BytesIO(body),
+            }
+        )
+        sub_request = WSGIRequest(environ)
+        # Пользователь уже аутентифицирован: DRF не проверяет JWT повторно
+        sub_request._force_auth_user = request.user
+        sub_request._force_auth_token = request.auth
+        if memo is not None:
+            sub_request._identity_map = memo
+        return sub_request
+
+    def resolve(self, path):
+        """
+        Находит представление пути, добавляя слэш, как CommonMiddleware.
+
+        Returns:
+            tuple: (ResolverMatch, путь)
+        """
+        try:
+            return resolve(path), path
+        except Resolver404:
+            if settings.APPEND_SLASH and not path.endswith("/"):
+                return resolve(f"{path}/"), f"{path}/"
+            raise
+
+    def execute(self, request, item, memo):
+        """
+        Выполняет один вложенный запрос.
+
+        Returns:
+            dict: status, headers и body ответа
+        """
+        path, _, query = item["path"].partition("?")
+        try:
+            match, path = self.resolve(path)
+        except Resolver404:
+            return error_item(status.HTTP_404_NOT_FOUND, "Не найдено")
+        view_class = getattr(match.func, "cls", None)
+        if (
+            view_class is None
+            or not issubclass(view_class, APIView)
+            or issubclass(view_class, BatchView)
+        ):
+            return error_item(
+                status.HTTP_400_BAD_REQUEST, "Адрес не поддерживается в пакете"
+            )
+        sub_request = self.build_request(request, item, path, query, memo)
+        try:
+            response = match.func(sub_request, *match.args, **match.kwargs)
+        except Exception:
+            logger.exception("Ошибка вложенного запроса %s %s", item["method"], path)
+            return error_item(
+                status.HTTP_500_INTERNAL_SERVER_ERROR, "Внутренняя ошибка сервера"
+            )
+        if response.streaming:
+            return error_item(
+                status.HTTP_400_BAD_REQUEST, "Потоковые ответы не поддерживаются"
+            )
+        headers = {
+            key: value
+            for key, value in response.items()
+            if key not in ("Content-Type", "Content-Length")
+        }
+        if isinstance(response, Response):
+            body = response.data
+        elif response.get("Content-Type", "").startswith("application/json"):
+            body = json.loads(response.content or b"null")
+        else:
+            body = response.content.decode(response.charset, "replace")
+        return {"status": response.status_code, "headers": headers, "body": body}
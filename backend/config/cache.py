@@ -0,0 +1,466 @@
+"""
+Двухуровневый кэш: LRU в памяти процесса перед общим кэшем.
+
+Общий кэш (SHARED — алиас из CACHES: файловый SharedFileCache или Redis)
+виден всем воркерам gunicorn, фоновым задачам и серверу событий. Перед ним
+стоит LRU в памяти процесса с ограничением числа записей (MAX_ENTRIES)
+и времени жизни (LOCAL_TIMEOUT): повторные чтения не обращаются к общему
+кэшу и не распаковывают значение.
+
+Значения локального уровня хранятся без копирования, поэтому изменять
+полученные из кэша объекты нельзя. delete() в одном процессе не очищает
+локальный уровень других процессов: запись в них живёт не дольше
+LOCAL_TIMEOUT, поэтому ключи, которые должны обновляться сразу, включают
+версию данных (как ключи фрагментов задач и статистики проектов).
+
+get_or_set() и get_or_set_many() защищают от одновременного пересчёта
+(stampede): потоки процесса ждут уже начатое вычисление ключа, а процессы
+договариваются через блокировку в общем кэше (add с LOCK_TIMEOUT).
+
+Записи, зависящие от изменённых данных, удаляются из локальных уровней
+всех процессов шиной инвалидации (config/invalidation.py) через
+evict_local().
+
+Метрики (попадания локального и общего уровня, промахи, вытеснения,
+вычисления, инвалидации) считаются по пространствам имён — первым двум частям ключа
+через двоеточие (tasks:fragment, tasks:project-stats) — см. cache_metrics().
+"""
+
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.filebased import FileBasedCache
+
+# Уровни и метрики общие для потоков процесса: CacheHandler создаёт
+# отдельный объект кэша для каждого потока
+_tiers = {}
+_metrics = {}
+_flights = {}
+_lock = threading.Lock()
+_culled = {}
+
+METRIC_NAMES = (
+    "local_hits",
+    "shared_hits",
+    "misses",
+    "sets",
+    "evictions",
+    "expirations",
+    "computed",
+    "coalesced",
+    "invalidations",
+)
+
+
+def namespace_of(key):
+    """
+    Возвращает пространство имён ключа для метрик.
+
+    Args:
+        key (str): Ключ без префикса и версии
+
+    Returns:
+        str: Первые две части ключа через двоеточие
+    """
+    parts = str(key).split(":", 2)
+    return ":".join(parts[:2]) if len(parts) > 2 else parts[0]
+
+
+def cache_metrics():
+    """
+    Возвращает метрики двухуровневых кэшей текущего процесса.
+
+    Returns:
+        dict: Имя кэша -> размер локального уровня и счётчики
+            по пространствам имён
+    """
+    with _lock:
+        return {
+            name: {
+                "entries": len(tier.entries),
+                "max_entries": tier.max_entries,
+                "namespaces": {
+                    namespace: {metric: counts[metric] for metric in METRIC_NAMES}
+                    for namespace, counts in sorted(_metrics[name].items())
+                },
+            }
+            for name, tier in _tiers.items()
+        }
+
+
+def evict_local(keys=None):
+    """
+    Удаляет ключи из локальных уровней всех двухуровневых кэшей процесса.
+
+    Args:
+        keys (Iterable | None): Ключи (версия по умолчанию); None — все записи
+
+    Returns:
+        int: Количество удалённых записей
+    """
+    keys = None if keys is None else list(keys)
+    evicted = 0
+    with _lock:
+        tiers = list(_tiers.items())
+    for name, tier in tiers:
+        with tier.lock:
+            if keys is None:
+                evicted += len(tier.entries)
+                tier.entries.clear()
+                continue
+            removed = [
+                key
+                for key in keys
+                if tier.entries.pop(tier.make_key(key), None) is not None
+            ]
+        evicted += len(removed)
+        counts = Counter(namespace_of(key) for key in removed)
+        with _lock:
+            for namespace, amount in counts.items():
+                _metrics[name].setdefault(namespace, Counter())[
+                    "invalidations"
+                ] += amount
+    return evicted
+
+
+class LocalTier:
+    """
+    LRU-словарь ключ -> (срок, значение) с ограничением размера.
+    """
+
+    def __init__(self, max_entries, make_key):
+        self.max_entries = max_entries
+        self.make_key = make_key
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+
+class Flight:
+    """
+    Вычисление ключа, начатое одним из потоков процесса.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.ready = False
+
+
+class TwoTierCache(BaseCache):
+    """
+    Бэкенд кэша Django: LRU в памяти процесса перед общим кэшем.
+
+    LOCATION — имя локального уровня (как у LocMemCache). OPTIONS:
+    SHARED — алиас общего кэша, MAX_ENTRIES — размер LRU, LOCAL_TIMEOUT —
+    время жизни записи в LRU (секунды), LOCK_TIMEOUT — время блокировки
+    вычисления ключа в общем кэше.
+    """
+
+    def __init__(self, name, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self.name = name
+        self.shared_alias = options["SHARED"]
+        self.local_timeout = options.get("LOCAL_TIMEOUT", 60)
+        self.lock_timeout = options.get("LOCK_TIMEOUT", 30)
+        with _lock:
+            self.tier = _tiers.setdefault(
+                name, LocalTier(self._max_entries, self.make_key)
+            )
+            self.metrics = _metrics.setdefault(name, {})
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    def count(self, keys, metric):
+        counts = Counter(namespace_of(key) for key in keys)
+        with _lock:
+            for namespace, amount in counts.items():
+                self.metrics.setdefault(namespace, Counter())[metric] += amount
+
+    def local_key(self, key, version):
+        return self.make_and_validate_key(key, version=version)
+
+    def local_get(self, key, version):
+        local_key = self.local_key(key, version)
+        tier = self.tier
+        with tier.lock:
+            entry = tier.entries.get(local_key)
+            if entry is None:
+                return False, None
+            if entry[0] <= time.monotonic():
+                del tier.entries[local_key]
+                expired = True
+            else:
+                tier.entries.move_to_end(local_key)
+                expired = False
+        if expired:
+            self.count([key], "expirations")
+            return False, None
+        return True, entry[1]
+
+    def local_set(self, key, value, timeout, version):
+        timeout = self.duration(timeout)
+        if timeout is not None and timeout <= 0:
+            self.local_delete(key, version)
+            return
+        if timeout is None:
+            timeout = self.local_timeout
+        expires = time.monotonic() + min(timeout, self.local_timeout)
+        tier = self.tier
+        evicted = []
+        with tier.lock:
+            tier.entries[self.local_key(key, version)] = (expires, value, key)
+            tier.entries.move_to_end(self.local_key(key, version))
+            while len(tier.entries) > tier.max_entries:
+                evicted.append(tier.entries.popitem(last=False)[1][2])
+        if evicted:
+            self.count(evicted, "evictions")
+
+    def local_delete(self, key, version):
+        with self.tier.lock:
+            return self.tier.entries.pop(self.local_key(key, version), None) is not None
+
+    def get(self, key, default=None, version=None):
+        found, value = self.local_get(key, version)
+        if found:
+            self.count([key], "local_hits")
+            return value
+        sentinel = object()
+        value = self.shared.get(key, sentinel, version=version)
+        if value is sentinel:
+            self.count([key], "misses")
+            return default
+        self.count([key], "shared_hits")
+        self.local_set(key, value, DEFAULT_TIMEOUT, version)
+        return value
+
+    def get_many(self, keys, version=None):
+        result = {}
+        remote = []
+        for key in keys:
+            found, value = self.local_get(key, version)
+            if found:
+                result[key] = value
+            else:
+                remote.append(key)
+        self.count(result, "local_hits")
+        if remote:
+            shared = self.shared.get_many(remote, version=version)
+            for key, value in shared.items():
+                self.local_set(key, value, DEFAULT_TIMEOUT, version)
+            result.update(shared)
+            self.count(shared, "shared_hits")
+            self.count([key for key in remote if key not in shared], "misses")
+        return result
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, self.duration(timeout), version=version)
+        self.local_set(key, value, timeout, version)
+        self.count([key], "sets")
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.shared.set_many(data, self.duration(timeout), version=version)
+        stored = [key for key in data if key not in failed]
+        for key in stored:
+            self.local_set(key, data[key], timeout, version)
+        self.count(stored, "sets")
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.shared.add(key, value, self.duration(timeout), version=version)
+        if added:
+            self.local_set(key, value, timeout, version)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self.local_delete(key, version)
+        return self.shared.touch(key, self.duration(timeout), version=version)
+
+    def delete(self, key, version=None):
+        local = self.local_delete(key, version)
+        return self.shared.delete(key, version=version) or local
+
+    def delete_many(self, keys, version=None):
+        for key in keys:
+            self.local_delete(key, version)
+        self.shared.delete_many(keys, version=version)
+
+    def has_key(self, key, version=None):
+        found, _ = self.local_get(key, version)
+        return found or self.shared.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        self.local_delete(key, version)
+        return self.shared.incr(key, delta, version=version)
+
+    def clear(self):
+        with self.tier.lock:
+            self.tier.entries.clear()
+        self.shared.clear()
+
+    def duration(self, timeout):
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, version=None):
+        """
+        Возвращает значение ключа, вычисляя его один раз при промахе.
+
+        Args:
+            key (str): Ключ
+            default: Значение или функция без аргументов, которая его вычисляет
+            timeout (int | None): Время жизни записи
+            version (int | None): Версия ключа
+
+        Returns:
+            Значение из кэша или вычисленное
+        """
+        if not callable(default):
+            return super().get_or_set(key, default, timeout, version)
+        return self.get_or_set_many(
+            [key], lambda keys: {key: default()}, timeout, version
+        )[key]
+
+    def get_or_set_many(self, keys, compute, timeout=DEFAULT_TIMEOUT, version=None):
+        """
+        Возвращает значения ключей, вычисляя отсутствующие одним вызовом.
+
+        Ключ, который уже вычисляет другой поток процесса, не вычисляется
+        повторно: поток ждёт результата. Ключ, заблокированный другим
+        процессом, ожидается в общем кэше не дольше LOCK_TIMEOUT, после
+        чего вычисляется самостоятельно.
+
+        Args:
+            keys (Iterable): Ключи
+            compute: Функция (список ключей) -> dict ключ -> значение;
+                ключи, которых нет в результате, не кэшируются
+            timeout (int | None): Время жизни записей
+            version (int | None): Версия ключей
+
+        Returns:
+            dict: Ключ -> значение (без ключей, не вычисленных compute)
+        """
+        keys = list(keys)
+        result = self.get_many(keys, version=version)
+        missing = [key for key in keys if key not in result]
+        if not missing:
+            return result
+
+        owned, waiting = {}, {}
+        with _lock:
+            for key in missing:
+                flight_key = (self.name, self.local_key(key, version))
+                flight = _flights.get(flight_key)
+                if flight is None:
+                    owned[key] = _flights[flight_key] = Flight()
+                else:
+                    waiting[key] = flight
+        try:
+            locks = {
+                key: self.lock_key(key)
+                for key in owned
+                if self.shared.add(
+                    self.lock_key(key), 1, self.lock_timeout, version=version
+                )
+            }
+            contended = [key for key in owned if key not in locks]
+            try:
+                if contended:
+                    result.update(self.wait_shared(contended, version))
+                pending = [key for key in owned if key not in result]
+                if pending:
+                    computed = compute(pending)
+                    self.count(computed, "computed")
+                    self.set_many(
+                        {key: computed[key] for key in pending if key in computed},
+                        timeout,
+                        version,
+                    )
+                    result.update(
+                        {key: computed[key] for key in pending if key in computed}
+                    )
+            finally:
+                self.shared.delete_many(list(locks.values()), version=version)
+        finally:
+            with _lock:
+                for key, flight in owned.items():
+                    if key in result:
+                        flight.value, flight.ready = result[key], True
+                    _flights.pop((self.name, self.local_key(key, version)), None)
+                    flight.done.set()
+
+        retry = []
+        for key, flight in waiting.items():
+            flight.done.wait(self.lock_timeout)
+            if flight.ready:
+                result[key] = flight.value
+                self.count([key], "coalesced")
+            else:
+                retry.append(key)
+        if retry:
+            computed = compute(retry)
+            self.count(computed, "computed")
+            self.set_many(
+                {key: computed[key] for key in retry if key in computed},
+                timeout,
+                version,
+            )
+            result.update({key: computed[key] for key in retry if key in computed})
+        return result
+
+    def lock_key(self, key):
+        return f"{key}:lock"
+
+    def wait_shared(self, keys, version):
+        """
+        Ждёт значения ключей, которые вычисляет другой процесс.
+
+        Returns:
+            dict: Появившиеся значения; ожидание заканчивается, когда все
+                значения появились или блокировки сняты
+        """
+        deadline = time.monotonic() + self.lock_timeout
+        found = {}
+        keys = list(keys)
+        delay = 0.01
+        while keys and time.monotonic() < deadline:
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
+            values = self.shared.get_many(keys, version=version)
+            for key, value in values.items():
+                self.local_set(key, value, DEFAULT_TIMEOUT, version)
+            self.count(values, "coalesced")
+            found.update(values)
+            keys = [
+                key
+                for key in keys
+                if key not in values
+                and self.shared.has_key(self.lock_key(key), version=version)
+            ]
+        return found
+
+
+class SharedFileCache(FileBasedCache):
+    """
+    Файловый кэш, проверяющий размер каталога не чаще CULL_INTERVAL секунд.
+
+    FileBasedCache перед каждой записью перечисляет все файлы каталога,
+    из-за чего запись тысяч фрагментов становится квадратичной. Между
+    проверками каталог может ненадолго превысить MAX_ENTRIES.
+    """
+
+    def __init__(self, dir, params):
+        super().__init__(dir, params)
+        self.cull_interval = params.get("OPTIONS", {}).get("CULL_INTERVAL", 60)
+
+    def _cull(self):
+        now = time.monotonic()
+        with _lock:
+            if now - _culled.get(self._dir, -self.cull_interval) < self.cull_interval:
+                return
+            _culled[self._dir] = now
+        super()._cull()
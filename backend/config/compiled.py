@@ -0,0 +1,354 @@
+"""
+Скомпилированные сериализаторы только для чтения.
+
+ModelSerializer для каждого объекта и каждого поля вызывает get_attribute,
+проверки SkipField и to_representation, а вложенные сериализаторы повторяют
+это для связанных объектов. На списках из тысяч задач это основная часть
+времени ответа.
+
+CompiledSerializer один раз по объявлению сериализатора генерирует функцию
+строка -> dict с полями в том же порядке и с тем же представлением значений.
+Строки читаются через values() с путями связей (creator__email), поэтому
+объекты моделей не создаются; связи многие-ко-многим (project.members)
+загружаются одним дополнительным запросом, как prefetch_related.
+Вложенные сериализаторы с IdentityMapMixin строятся один раз на объект
+и берутся из карты идентичности запроса (identity.py).
+
+Поддерживаются поля моделей, PrimaryKeyRelatedField по внешнему ключу,
+файлы, константы класса модели (Task.archived), вложенные сериализаторы
+и SerializerMethodField, для которых сериализатор объявляет столбцы
+в compiled_methods и метод row_<поле>(context, *значения). Если сериализатор
+содержит что-то другое, компиляция не выполняется и ViewSet использует
+обычный сериализатор.
+"""
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from rest_framework.utils.serializer_helpers import ReturnList
+
+from .identity import IdentityMapMixin, identity_map, serializer_shape
+
+IDENTITY_FIELDS = {
+    serializers.CharField: (models.CharField, models.TextField),
+    serializers.EmailField: (models.CharField,),
+    serializers.IntegerField: (models.IntegerField,),
+    serializers.BooleanField: (models.BooleanField,),
+    serializers.ReadOnlyField: (models.Field,),
+}
+
+
+class NotCompilable(Exception):
+    """
+    Сериализатор содержит поле, которое нельзя вычислить по строке values().
+    """
+
+
+def iso_datetime(value, tz):
+    """
+    Форматирует дату и время как DateTimeField DRF в формате ISO 8601.
+
+    Args:
+        value (datetime | None): Значение из базы
+        tz: Текущий часовой пояс
+
+    Returns:
+        str | None: Строка ISO 8601 (UTC с суффиксом Z)
+    """
+    if value is None:
+        return None
+    value = value.astimezone(tz).isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def file_url(context, storage, name):
+    """
+    Возвращает URL файла как FileField DRF.
+
+    Args:
+        context (dict): Контекст сериализатора (request для абсолютного URL)
+        storage: Хранилище поля модели
+        name (str | None): Имя файла из базы
+
+    Returns:
+        str | None: URL файла или None, если файла нет
+    """
+    if not name:
+        return None
+    url = storage.url(name)
+    request = context.get("request")
+    if request is not None:
+        return request.build_absolute_uri(url)
+    return url
+
+
+def remember(memo, shape, pk, build, row, context, tz, prefetched):
+    """
+    Возвращает dict объекта из карты идентичности или строит его.
+    """
+    if memo is None:
+        return build(row, context, tz, prefetched, memo)
+    key = (shape, pk)
+    data = memo.get(key)
+    if data is None:
+        data = memo[key] = build(row, context, tz, prefetched, memo)
+    return data
+
+
+class CompiledRows:
+    """
+    Сгенерированная функция строка -> dict для одной модели и набор
+    столбцов values(), которые ей нужны.
+    """
+
+    def __init__(self, serializer, model):
+        self.columns = []
+        self.prefetches = []
+        self.namespace = {
+            "iso_datetime": iso_datetime,
+            "file_url": file_url,
+            "remember": remember,
+        }
+        body = self.shared_expr(
+            serializer, model, "", self.serializer_expr(serializer, model, "")
+        )
+        source = (
+            f"def to_dict(row, context, tz, prefetched, memo):\n    return {body}\n"
+        )
+        exec(
+            compile(source, f"<compiled {type(serializer).__name__}>", "exec"),
+            self.namespace,
+        )
+        self.source = source
+        self.function = self.namespace["to_dict"]
+
+    def bind(self, value):
+        name = f"_v{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+    def define(self, body):
+        name = f"_v{len(self.namespace)}"
+        exec(
+            f"{name} = lambda row, context, tz, prefetched, memo: {body}",
+            self.namespace,
+        )
+        return name
+
+    def column(self, path):
+        if path not in self.columns:
+            self.columns.append(path)
+        return f"row[{path!r}]"
+
+    def serializer_expr(self, serializer, model, prefix):
+        items = [
+            f"{field.field_name!r}: {self.field_expr(field, model, prefix)}"
+            for field in serializer._readable_fields
+        ]
+        return "{" + ", ".join(items) + "}"
+
+    def shared_expr(self, serializer, model, prefix, body):
+        if not isinstance(serializer, IdentityMapMixin):
+            return body
+        shape = self.bind(serializer_shape(serializer))
+        pk = self.column(prefix + model._meta.pk.name)
+        return (
+            f"remember(memo, {shape}, {pk}, {self.define(body)}, "
+            "row, context, tz, prefetched)"
+        )
+
+    def field_expr(self, field, model, prefix):
+        if isinstance(field, serializers.SerializerMethodField):
+            return self.method_expr(field, prefix)
+        source = field.source
+        if source == "*" or "." in source:
+            raise NotCompilable(f"{field.field_name}: source={source}")
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            value = getattr(model, source, None)
+            if value is None or not isinstance(value, (bool, int, str)):
+                raise NotCompilable(f"{field.field_name}: нет поля {source}")
+            return self.bind(field.to_representation(value))
+        path = prefix + source
+        if isinstance(field, serializers.ListSerializer):
+            return self.many_expr(field, model, model_field, prefix)
+        if isinstance(field, serializers.BaseSerializer):
+            if not (model_field.many_to_one or model_field.one_to_one):
+                raise NotCompilable(f"{field.field_name}: вложенный без FK")
+            related_model = model_field.related_model
+            inner = self.shared_expr(
+                field,
+                related_model,
+                f"{path}__",
+                self.serializer_expr(field, related_model, f"{path}__"),
+            )
+            return f"(None if {self.column(path)} is None else {inner})"
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            if field.pk_field is not None or not model_field.many_to_one:
+                raise NotCompilable(f"{field.field_name}: связь не по FK")
+            return self.column(path)
+        if model_field.is_relation:
+            raise NotCompilable(f"{field.field_name}: связь {type(field).__name__}")
+        column = self.column(path)
+        if isinstance(field, serializers.FileField):
+            if not getattr(field, "use_url", api_settings.UPLOADED_FILES_USE_URL):
+                return f"({column} or None)"
+            return f"file_url(context, {self.bind(model_field.storage)}, {column})"
+        if type(field) in IDENTITY_FIELDS and isinstance(
+            model_field, IDENTITY_FIELDS[type(field)]
+        ):
+            return column
+        if (
+            type(field) is serializers.DateTimeField
+            and settings.USE_TZ
+            and not hasattr(field, "timezone")
+            and getattr(field, "format", api_settings.DATETIME_FORMAT).lower()
+            == ISO_8601
+        ):
+            return f"iso_datetime({column}, tz)"
+        return f"(None if {column} is None else {self.bind(field.to_representation)}({column}))"
+
+    def method_expr(self, field, prefix):
+        columns = getattr(field.parent, "compiled_methods", {}).get(field.field_name)
+        if columns is None:
+            raise NotCompilable(f"{field.field_name}: нет compiled_methods")
+        method = getattr(field.parent, f"row_{field.field_name}")
+        args = ", ".join(self.column(prefix + column) for column in columns)
+        return f"{self.bind(method)}(context, {args})"
+
+    def many_expr(self, field, model, model_field, prefix):
+        if not model_field.many_to_many or model_field.auto_created:
+            raise NotCompilable(f"{field.field_name}: список не по M2M")
+        child = CompiledRows(field.child, model_field.related_model)
+        key = prefix + model._meta.pk.name
+        self.prefetches.append(
+            (model_field.related_model, model_field.related_query_name(), key, child)
+        )
+        return f"prefetched[{len(self.prefetches) - 1}].get({self.column(key)}, [])"
+
+    def render(self, rows, context, tz, memo):
+        """
+        Преобразует строки values() в словари ответа.
+
+        Args:
+            rows (list): Строки с путями из self.columns
+            context (dict): Контекст сериализатора
+            tz: Текущий часовой пояс
+            memo (dict | None): Карта идентичности запроса
+
+        Returns:
+            list: Словари в формате сериализатора
+        """
+        prefetched = []
+        for related_model, query_name, key, child in self.prefetches:
+            ids = {row[key] for row in rows} - {None}
+            groups = {}
+            if ids:
+                related = list(
+                    related_model._default_manager.filter(
+                        **{f"{query_name}__in": ids}
+                    ).values(*child.columns, _prefetch_key=F(query_name))
+                )
+                for row, data in zip(related, child.render(related, context, tz, memo)):
+                    groups.setdefault(row["_prefetch_key"], []).append(data)
+            prefetched.append(groups)
+        function = self.function
+        return [function(row, context, tz, prefetched, memo) for row in rows]
+
+
+class CompiledSerializer:
+    """
+    Быстрое представление списка для сериализатора только для чтения.
+
+    Функции генерируются один раз для каждой модели queryset (например,
+    Task и ArchivedTask для TaskSerializer) и кэшируются в объекте.
+    """
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        self.compiled = {}
+
+    def for_model(self, model):
+        """
+        Возвращает скомпилированные строки для модели или None.
+
+        Args:
+            model: Модель queryset
+
+        Returns:
+            CompiledRows | None: None, если сериализатор не компилируется
+        """
+        if model not in self.compiled:
+            try:
+                self.compiled[model] = CompiledRows(self.serializer_class(), model)
+            except NotCompilable:
+                self.compiled[model] = None
+        return self.compiled[model]
+
+    def serialize(self, queryset, context):
+        """
+        Сериализует queryset без создания объектов моделей.
+
+        Args:
+            queryset (QuerySet): Выборка (select_related и prefetch_related
+                не нужны и сбрасываются)
+            context (dict): Контекст сериализатора
+
+        Returns:
+            list | None: Данные ответа или None, если быстрый путь недоступен
+        """
+        if not isinstance(queryset, models.QuerySet):
+            return None
+        compiled = self.for_model(queryset.model)
+        if compiled is None:
+            return None
+        rows = list(queryset.prefetch_related(None).values(*compiled.columns))
+        return compiled.render(
+            rows, context, timezone.get_current_timezone(), identity_map(context)
+        )
+
+
+class CompiledListSerializer:
+    """
+    Результат быстрого пути с интерфейсом списка сериализатора (.data).
+    """
+
+    many = True
+
+    def __init__(self, rows):
+        self.data = ReturnList(rows, serializer=self)
+
+
+class CompiledListMixin:
+    """
+    Примесь ViewSet, отдающая список через CompiledSerializer.
+
+    Быстрый путь используется в действии list, если в запросе нет
+    параметров fields и expand; иначе — обычный сериализатор.
+    """
+
+    compiled_serializer = None
+
+    def get_serializer(self, *args, **kwargs):
+        params = self.request.query_params
+        if (
+            self.compiled_serializer is not None
+            and kwargs.get("many")
+            and args
+            and self.action == "list"
+            and "fields" not in params
+            and "expand" not in params
+        ):
+            rows = self.compiled_serializer.serialize(
+                args[0], self.get_serializer_context()
+            )
+            if rows is not None:
+                return CompiledListSerializer(rows)
+        return super().get_serializer(*args, **kwargs)
@@ -0,0 +1,279 @@
+"""
+Сжатие ответов API (gzip, а также br и zstd при установленных brotli
+и zstandard).
+
+Списки задач и комментариев — повторяющийся JSON, который сжимается
+в 10–20 раз. CompressionMiddleware выбирает кодировку по Accept-Encoding
+в порядке COMPRESSION_ENCODINGS и сжимает ответы сжимаемых типов
+от COMPRESSION_MIN_BYTES байт.
+
+Потоковые ответы сжимаются по частям: каждая часть сбрасывается
+в выходной поток (sync flush), поэтому клиент получает данные по мере
+формирования, без буферизации всего ответа. Поток событий (text/event-stream),
+файлы (FileResponse отдаётся через sendfile), ответы с Content-Encoding
+и ответы на запрос диапазона не сжимаются.
+
+Сжатое тело ответов от COMPRESSION_CACHE_MIN_BYTES байт хранится в кэше
+COMPRESSION_CACHE по хешу несжатого тела и кодировке: неизменившийся
+список (тело собирается из кэша фрагментов) не сжимается повторно,
+а одновременные запросы сжимают его один раз (get_or_set).
+"""
+
+import gzip
+import hashlib
+import zlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli необязателен
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard необязателен
+    zstandard = None
+
+CACHE_PREFIX = "http:compressed"
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/msgpack",
+)
+
+
+class GzipCodec:
+    name = "gzip"
+
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, data):
+        return gzip.compress(data, self.level, mtime=0)
+
+    def start(self):
+        return zlib.compressobj(self.level, zlib.DEFLATED, 31)
+
+    def chunk(self, compressor, data):
+        return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, compressor):
+        return compressor.flush()
+
+
+class BrotliCodec:
+    name = "br"
+
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, data):
+        return brotli.compress(data, quality=self.level)
+
+    def start(self):
+        return brotli.Compressor(quality=self.level)
+
+    def chunk(self, compressor, data):
+        return compressor.process(data) + compressor.flush()
+
+    def finish(self, compressor):
+        return compressor.finish()
+
+
+class ZstdCodec:
+    name = "zstd"
+
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, data):
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def start(self):
+        return zstandard.ZstdCompressor(level=self.level).compressobj()
+
+    def chunk(self, compressor, data):
+        return compressor.compress(data) + compressor.flush(
+            zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        )
+
+    def finish(self, compressor):
+        return compressor.flush()
+
+
+def available_codecs():
+    """
+    Возвращает кодеки в порядке предпочтения из настроек.
+
+    Кодировки, для которых не установлен пакет, пропускаются.
+
+    Returns:
+        list: Кодеки (name, compress, а для потоков start, chunk, finish)
+    """
+    levels = settings.COMPRESSION_LEVELS
+    factories = {"gzip": GzipCodec}
+    if brotli is not None:
+        factories["br"] = BrotliCodec
+    if zstandard is not None:
+        factories["zstd"] = ZstdCodec
+    return [
+        factories[name](levels[name])
+        for name in settings.COMPRESSION_ENCODINGS
+        if name in factories
+    ]
+
+
+def accepted_encodings(header):
+    """
+    Разбирает заголовок Accept-Encoding.
+
+    Args:
+        header (str): Значение заголовка
+
+    Returns:
+        tuple: (кодировки с q > 0, кодировки с q = 0); "*" означает любую
+            кодировку, не названную в заголовке явно
+    """
+    accepted, refused = set(), set()
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(name)
+        else:
+            refused.add(name)
+    return accepted - refused, refused
+
+
+def choose_codec(request, codecs):
+    """
+    Выбирает кодек для запроса или None, если клиент не принимает сжатие.
+
+    Кодировка с q=0 исключается, даже если в заголовке есть "*".
+    """
+    accepted, refused = accepted_encodings(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+    for codec in codecs:
+        if codec.name in refused:
+            continue
+        if codec.name in accepted or "*" in accepted:
+            return codec
+    return None
+
+
+def compress_stream(codec, chunks):
+    """
+    Сжимает поток частей, сбрасывая сжатые данные после каждой части.
+
+    Args:
+        codec: Кодек
+        chunks (Iterable): Части ответа (bytes)
+
+    Yields:
+        bytes: Сжатые данные
+    """
+    compressor = codec.start()
+    for chunk in chunks:
+        data = codec.chunk(compressor, chunk)
+        if data:
+            yield data
+    yield codec.finish(compressor)
+
+
+async def compress_async_stream(codec, chunks):
+    """
+    Асинхронный вариант compress_stream для ответов ASGI.
+    """
+    compressor = codec.start()
+    async for chunk in chunks:
+        data = codec.chunk(compressor, chunk)
+        if data:
+            yield data
+    yield codec.finish(compressor)
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Сжимает ответы выбранной по Accept-Encoding кодировкой.
+
+    Работает и в синхронном, и в асинхронном стеке (как GZipMiddleware).
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.codecs = available_codecs()
+
+    def process_response(self, request, response):
+        """
+        Сжимает ответ, если он подходит по типу, размеру и заголовкам.
+
+        Args:
+            request: HTTP запрос
+            response: HTTP ответ
+
+        Returns:
+            HttpResponse: Тот же ответ (сжатый или без изменений)
+        """
+        content_type = response.get("Content-Type", "").split(";")[0].strip()
+        if (
+            response.has_header("Content-Encoding")
+            or response.status_code in (204, 206, 304)
+            or content_type == "text/event-stream"
+            or getattr(response, "file_to_stream", None) is not None
+            or not content_type.startswith(COMPRESSIBLE_TYPES)
+        ):
+            return response
+        if not response.streaming and len(response.content) < (
+            settings.COMPRESSION_MIN_BYTES
+        ):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+        codec = choose_codec(request, self.codecs)
+        if codec is None:
+            return response
+
+        if response.streaming:
+            stream = compress_async_stream if response.is_async else compress_stream
+            response.streaming_content = stream(codec, response.streaming_content)
+            del response.headers["Content-Length"]
+        else:
+            body = response.content
+            compressed = self.compressed_body(codec, body)
+            if len(compressed) >= len(body):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = codec.name
+        return response
+
+    def compressed_body(self, codec, body):
+        """
+        Сжимает тело, беря готовый результат из кэша для больших ответов.
+        """
+        alias = settings.COMPRESSION_CACHE
+        if not alias or len(body) < settings.COMPRESSION_CACHE_MIN_BYTES:
+            return codec.compress(body)
+        digest = hashlib.blake2b(body, digest_size=20).hexdigest()
+        return caches[alias].get_or_set(
+            f"{CACHE_PREFIX}:{codec.name}:{digest}", lambda: codec.compress(body)
+        )
@@ -0,0 +1,88 @@
+"""
+Примеси фонового удаления для ViewSet'ов, админки и сериализаторов.
+
+Объект не удаляется каскадом в запросе: он отмечается удаляемым и сразу
+скрывается, а зависимые строки удаляет фоновая задача. Само удаление
+выполняет функция из настройки DEFERRED_DELETION_HANDLER (путь импорта),
+поэтому приложения подключают примеси, не импортируя модули приложения,
+которое удаляет данные (apps/tasks/deletion.py).
+"""
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.validators import UniqueValidator
+
+
+def defer_deletion(instance, requested_by=None):
+    """
+    Запрашивает фоновое удаление объекта.
+
+    Args:
+        instance (Model): Удаляемый объект
+        requested_by (User): Пользователь, запросивший удаление
+
+    Returns:
+        dict: Данные фонового удаления для ответа API
+    """
+    handler = import_string(settings.DEFERRED_DELETION_HANDLER)
+    with transaction.atomic():
+        return handler(instance, requested_by)
+
+
+class DeferredDestroyMixin:
+    """
+    Примесь ViewSet, заменяющая каскадное удаление фоновым.
+
+    Ответ 202 содержит фоновое удаление, его ход доступен
+    в /api/tasks/deletions/<id>/.
+    """
+
+    def destroy(self, request, *args, **kwargs):
+        """
+        Запрашивает фоновое удаление объекта.
+
+        Returns:
+            Response: Фоновое удаление со статусом 202
+        """
+        data = defer_deletion(self.get_object(), request.user)
+        return Response(data, status=status.HTTP_202_ACCEPTED)
+
+
+class DeferredDeleteAdminMixin:
+    """
+    Примесь ModelAdmin, заменяющая каскадное удаление фоновым.
+    """
+
+    def delete_model(self, request, obj):
+        defer_deletion(obj, request.user)
+
+    def delete_queryset(self, request, queryset):
+        for obj in queryset:
+            self.delete_model(request, obj)
+
+
+class IncludeDeletingUniqueMixin:
+    """
+    Примесь ModelSerializer: уникальность проверяется и среди объектов,
+    ожидающих удаления.
+
+    UniqueValidator ищет совпадения через менеджер по умолчанию (objects),
+    который скрывает удаляемые проекты и пользователей, а их строки
+    с уникальными значениями остаются в таблице до конца фонового удаления.
+    Без примеси повторное значение проходит проверку и INSERT падает
+    с IntegrityError.
+    """
+
+    def build_standard_field(self, field_name, model_field):
+        field_class, field_kwargs = super().build_standard_field(
+            field_name, model_field
+        )
+        manager = getattr(model_field.model, "all_objects", None)
+        if manager is not None:
+            for validator in field_kwargs.get("validators", []):
+                if isinstance(validator, UniqueValidator):
+                    validator.queryset = manager.all()
+        return field_class, field_kwargs
@@ -0,0 +1,148 @@
+"""
+Выборочные поля и раскрытие связей в ответах API.
+
+Параметры запроса:
+- fields — список полей ответа через запятую, вложенные поля через точку:
+  fields=issue_id,title,status,creator.email
+- expand — связи, которые выводятся вложенными объектами, остальные
+  связи выводятся ID: expand=project,project.members. Без параметра
+  связи раскрываются как раньше.
+
+Сериализатор (SparseFieldsMixin) убирает лишние поля при создании,
+а ViewSet (SparseFieldsViewMixin) по итоговому набору полей строит
+select_related и prefetch_related, поэтому не запрошенные связи
+не загружаются из базы.
+"""
+
+from rest_framework import serializers
+
+
+def parse_fieldset(value):
+    """
+    Разбирает список полей из параметра запроса в дерево.
+
+    Args:
+        value (str | None): Значение параметра, например "id,creator.email"
+
+    Returns:
+        dict | None: Поле -> дерево вложенных полей ({} — все поля),
+            None если параметр не передан
+    """
+    if value is None:
+        return None
+    tree = {}
+    for item in value.split(","):
+        node = tree
+        for part in item.strip().split("."):
+            if part:
+                node = node.setdefault(part, {})
+    return tree
+
+
+class SparseFieldsMixin:
+    """
+    Примесь сериализатора, поддерживающая параметры fields и expand.
+
+    Атрибуты подкласса:
+    - expandable_fields — вложенные сериализаторы, которые можно свернуть до ID
+    - select_related_fields — поле -> путь для select_related
+    - prefetch_related_fields — поле -> путь для prefetch_related
+
+    Поля только для записи не убираются, чтобы параметр fields не мешал
+    создавать и изменять объекты.
+    """
+
+    expandable_fields = ()
+    select_related_fields = {}
+    prefetch_related_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        params = getattr(self.context.get("request"), "query_params", None)
+        if params is not None:
+            self.apply_fieldset(
+                parse_fieldset(params.get("fields")),
+                parse_fieldset(params.get("expand")),
+            )
+
+    def apply_fieldset(self, fields, expand):
+        """
+        Оставляет запрошенные поля и сворачивает не раскрытые связи до ID.
+
+        Args:
+            fields (dict | None): Дерево полей (None или {} — все поля)
+            expand (dict | None): Дерево раскрываемых связей (None — все)
+        """
+        if fields:
+            for name in list(self.fields):
+                if name not in fields and not self.fields[name].write_only:
+                    del self.fields[name]
+        for name in self.expandable_fields:
+            field = self.fields.get(name)
+            if field is None or field.write_only:
+                continue
+            many = isinstance(field, serializers.ListSerializer)
+            if expand is not None and name not in expand:
+                self.fields[name] = serializers.PrimaryKeyRelatedField(
+                    read_only=True, many=many
+                )
+                continue
+            nested = field.child if many else field
+            if isinstance(nested, SparseFieldsMixin):
+                nested.apply_fieldset(
+                    fields.get(name) if fields else None,
+                    expand.get(name, {}) if expand is not None else None,
+                )
+
+    def related_paths(self):
+        """
+        Возвращает связи, которые нужно загрузить для текущего набора полей.
+
+        Returns:
+            tuple: (пути для select_related, пути для prefetch_related)
+        """
+        select, prefetch = [], []
+        for name, path in self.select_related_fields.items():
+            field = self.fields.get(name)
+            if not isinstance(field, serializers.BaseSerializer):
+                # Связь свёрнута до ID: значение берётся из <поле>_id
+                continue
+            select.append(path)
+            if isinstance(field, SparseFieldsMixin):
+                nested_select, nested_prefetch = field.related_paths()
+                select += [f"{path}__{p}" for p in nested_select]
+                prefetch += [f"{path}__{p}" for p in nested_prefetch]
+        for name, path in self.prefetch_related_fields.items():
+            field = self.fields.get(name)
+            if field is None or field.write_only:
+                continue
+            prefetch.append(path)
+            nested = getattr(field, "child", None)
+            if isinstance(nested, SparseFieldsMixin):
+                nested_select, nested_prefetch = nested.related_paths()
+                prefetch += [f"{path}__{p}" for p in nested_select + nested_prefetch]
+        return select, prefetch
+
+
+class SparseFieldsViewMixin:
+    """
+    Примесь ViewSet, загружающая только связи, нужные запрошенным полям.
+
+    Для действий из sparse_actions queryset после фильтрации получает
+    select_related и prefetch_related по набору полей сериализатора.
+    """
+
+    sparse_actions = ("list", "retrieve", "update", "partial_update")
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action not in self.sparse_actions:
+            return queryset
+        serializer = self.get_serializer()
+        if not isinstance(serializer, SparseFieldsMixin):
+            return queryset
+        select, prefetch = serializer.related_paths()
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if select:
+            queryset = queryset.select_related(*select)
+        return queryset.prefetch_related(*prefetch)
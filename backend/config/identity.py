@@ -0,0 +1,78 @@
+"""
+Карта идентичности сериализованных объектов в пределах запроса.
+
+В списке задач одни и те же пользователи встречаются сотни раз (creator,
+assignee, участники проекта), а проекты — в каждой задаче. Сериализаторы
+с IdentityMapMixin сериализуют объект один раз на запрос и возвращают
+тот же dict для повторных вхождений того же (модель, pk) с тем же набором
+полей. Скомпилированные сериализаторы (compiled.py) используют ту же карту.
+
+Карта хранится в объекте запроса и включается только для безопасных
+методов (GET, HEAD, OPTIONS): при изменении данных объект мог измениться
+между двумя сериализациями. Общие dict нельзя изменять после сериализации.
+"""
+
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+def identity_map(context):
+    """
+    Возвращает карту идентичности запроса из контекста сериализатора.
+
+    Args:
+        context (dict): Контекст сериализатора
+
+    Returns:
+        dict | None: (форма сериализатора, pk) -> dict или None,
+            если запроса нет или метод изменяет данные
+    """
+    request = context.get("request")
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    memo = getattr(request, "_identity_map", None)
+    if memo is None:
+        memo = request._identity_map = {}
+    return memo
+
+
+def serializer_shape(serializer):
+    """
+    Возвращает описание набора полей сериализатора.
+
+    Два сериализатора одной модели с одинаковой формой дают одинаковый
+    результат для одного объекта (например, creator и assignee задачи).
+
+    Args:
+        serializer: Экземпляр сериализатора
+
+    Returns:
+        tuple: Класс, модель и поля (с формой вложенных сериализаторов)
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        return ("many", serializer_shape(serializer.child))
+    fields = []
+    for field in serializer._readable_fields:
+        if isinstance(field, serializers.BaseSerializer):
+            fields.append((field.field_name, serializer_shape(field)))
+        else:
+            fields.append((field.field_name, type(field).__name__))
+    return (type(serializer), serializer.Meta.model, tuple(fields))
+
+
+class IdentityMapMixin:
+    """
+    Примесь сериализатора, сериализующая объект один раз на запрос.
+    """
+
+    def to_representation(self, instance):
+        memo = identity_map(self.context)
+        if memo is None or instance.pk is None:
+            return super().to_representation(instance)
+        if not hasattr(self, "_shape"):
+            self._shape = serializer_shape(self)
+        key = (self._shape, instance.pk)
+        data = memo.get(key)
+        if data is None:
+            data = memo[key] = super().to_representation(instance)
+        return data
@@ -0,0 +1,161 @@
+"""
+Шина инвалидации кэшей между процессами через Postgres LISTEN/NOTIFY.
+
+Локальный уровень кэшей (config/cache.py) живёт в памяти каждого воркера,
+поэтому изменение статуса или состава участников проекта в одном процессе
+оставляет устаревшие записи в остальных. Сигналы Project, Status, Priority,
+Position и User (apps/tasks/signals.py) вызывают invalidate() с ключами, которые
+зависят от изменённых данных:
+- ключ удаляется из общего кэша сразу и ещё раз после фиксации транзакции
+  (чтобы параллельный запрос не вернул туда данные до фиксации)
+- в канал cache_invalidation отправляется NOTIFY с ключами и временем
+  изменения; сообщение доставляется только после фиксации
+
+Поток InvalidationListener в каждом процессе веб-сервера (config/wsgi.py,
+config/asgi.py) удаляет полученные ключи из локальных уровней и считает
+задержку от изменения до удаления. После переподключения LISTEN, когда
+сообщения могли быть потеряны, локальные уровни очищаются целиком; в
+любом случае запись в них живёт не дольше CACHE_LOCAL_SECONDS.
+"""
+
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .cache import evict_local
+from .notify import NotifyListener, notify
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache_invalidation"
+MEMBERSHIP_PREFIX = "tasks:membership"
+REFERENCE_PREFIX = "tasks:reference"
+
+# Ключей в одном сообщении: NOTIFY ограничивает размер сообщения 8000 байт
+KEYS_PER_MESSAGE = 150
+
+_listener = None
+_lock = threading.Lock()
+_stats = {
+    "messages": 0,
+    "keys": 0,
+    "evicted": 0,
+    "resets": 0,
+    "latency_last_ms": None,
+    "latency_max_ms": None,
+    "latency_total_ms": 0.0,
+    "slow": 0,
+}
+
+
+def membership_key(user_id):
+    """
+    Возвращает ключ кэша проектов, в которых участвует пользователь.
+    """
+    return f"{MEMBERSHIP_PREFIX}:{user_id}"
+
+
+def reference_key(model):
+    """
+    Возвращает ключ кэша списка справочника (статусы, приоритеты, должности).
+    """
+    return f"{REFERENCE_PREFIX}:{model._meta.label_lower}"
+
+
+def invalidate(keys):
+    """
+    Удаляет ключи из общего кэша и рассылает их всем процессам.
+
+    Args:
+        keys (Iterable): Ключи кэша default
+    """
+    keys = sorted(set(keys))
+    if not keys:
+        return
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+    changed_at = time.time()
+    for start in range(0, len(keys), KEYS_PER_MESSAGE):
+        chunk = keys[start : start + KEYS_PER_MESSAGE]
+        notify(CHANNEL, json.dumps({"keys": chunk, "at": changed_at}))
+
+
+def handle_message(channel, payload):
+    """
+    Удаляет ключи сообщения из локальных уровней и учитывает задержку.
+
+    Args:
+        channel (str): Имя канала
+        payload (str): JSON {"keys": [...], "at": время изменения}
+    """
+    message = json.loads(payload)
+    evicted = evict_local(message["keys"])
+    latency = (time.time() - message["at"]) * 1000
+    with _lock:
+        _stats["messages"] += 1
+        _stats["keys"] += len(message["keys"])
+        _stats["evicted"] += evicted
+        _stats["latency_last_ms"] = latency
+        _stats["latency_max_ms"] = max(_stats["latency_max_ms"] or 0, latency)
+        _stats["latency_total_ms"] += latency
+        slow = latency > settings.CACHE_INVALIDATION_WARN_MS
+        if slow:
+            _stats["slow"] += 1
+    if slow:
+        logger.warning("Инвалидация кэша доставлена через %.0f мс", latency)
+
+
+def reset_local():
+    """
+    Очищает локальные уровни после переподключения LISTEN.
+    """
+    evict_local()
+    with _lock:
+        _stats["resets"] += 1
+
+
+def invalidation_metrics():
+    """
+    Возвращает счётчики и задержку инвалидации в текущем процессе.
+
+    Returns:
+        dict: Сообщения, ключи, удалённые записи, очистки после
+            переподключения и задержка (последняя, максимальная, средняя)
+    """
+    with _lock:
+        stats = dict(_stats)
+    total = stats.pop("latency_total_ms")
+    stats["latency_avg_ms"] = total / stats["messages"] if stats["messages"] else None
+    stats["listening"] = _listener is not None and _listener.listening.is_set()
+    return stats
+
+
+def start_invalidation_listener():
+    """
+    Запускает поток приёма инвалидаций, если он включён в настройках.
+
+    Returns:
+        NotifyListener | None: Запущенный поток или None
+    """
+    global _listener
+    if not settings.CACHE_INVALIDATION_LISTENER or _listener is not None:
+        return _listener
+    _listener = NotifyListener([CHANNEL], handle_message, on_reconnect=reset_local)
+    _listener.start()
+    return _listener
+
+
+def stop_invalidation_listener():
+    """
+    Останавливает поток приёма инвалидаций.
+    """
+    global _listener
+    listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+        listener.join()
@@ -0,0 +1,98 @@
+"""
+Обмен сообщениями между процессами через Postgres LISTEN/NOTIFY.
+
+NOTIFY выполняется в транзакции, которая изменила данные, и доставляется
+подписчикам только после её фиксации. Слушатель держит отдельное
+соединение в режиме autocommit и передаёт полученные сообщения в callback.
+"""
+
+import logging
+import select
+import threading
+
+from django.db import connection, connections
+
+logger = logging.getLogger(__name__)
+
+POLL_TIMEOUT_SECONDS = 1.0
+MAX_PAYLOAD_BYTES = 7900
+
+
+def notify(channel, payload):
+    """
+    Отправляет сообщение в канал в рамках текущей транзакции.
+
+    Args:
+        channel (str): Имя канала
+        payload (str): Текст сообщения (до 8000 байт)
+    """
+    if connection.vendor != "postgresql":
+        return
+    if len(payload.encode()) > MAX_PAYLOAD_BYTES:
+        logger.warning("Сообщение для канала %s слишком большое, пропущено", channel)
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_notify(%s, %s)", [channel, payload])
+
+
+class NotifyListener(threading.Thread):
+    """
+    Фоновый поток, принимающий сообщения каналов через LISTEN.
+
+    При обрыве соединения поток переподключается. Сообщения, отправленные
+    во время переподключения, теряются, поэтому callback on_reconnect
+    позволяет подписчикам сбросить состояние.
+
+    Args:
+        channels (list): Имена каналов
+        callback: Функция (channel, payload), вызывается в потоке слушателя
+        on_reconnect: Функция без аргументов, вызывается после переподключения
+    """
+
+    def __init__(self, channels, callback, on_reconnect=None, reconnect_delay=1.0):
+        super().__init__(name=f"listen-{'-'.join(channels)}", daemon=True)
+        self.channels = list(channels)
+        self.callback = callback
+        self.on_reconnect = on_reconnect
+        self.reconnect_delay = reconnect_delay
+        self.stopped = threading.Event()
+        self.listening = threading.Event()
+
+    def run(self):
+        connected_before = False
+        while not self.stopped.is_set():
+            try:
+                self._listen(connected_before)
+            except Exception:
+                logger.exception("Ошибка соединения LISTEN %s", self.channels)
+            finally:
+                self.listening.clear()
+            connected_before = True
+            self.stopped.wait(self.reconnect_delay)
+
+    def _listen(self, reconnected):
+        db = connections["default"]
+        conn = db.get_new_connection(db.get_connection_params())
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                for channel in self.channels:
+                    cursor.execute(f'LISTEN "{channel}"')
+            self.listening.set()
+            if reconnected and self.on_reconnect:
+                self.on_reconnect()
+            while not self.stopped.is_set():
+                if not select.select([conn], [], [], POLL_TIMEOUT_SECONDS)[0]:
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    message = conn.notifies.pop(0)
+                    try:
+                        self.callback(message.channel, message.payload)
+                    except Exception:
+                        logger.exception("Ошибка обработки сообщения %s", message)
+        finally:
+            conn.close()
+
+    def stop(self):
+        self.stopped.set()
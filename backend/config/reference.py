@@ -0,0 +1,36 @@
+"""
+Кэш списков справочников (статусы, приоритеты, должности).
+
+Список справочника без параметров запроса одинаков для всех пользователей,
+поэтому ViewSet с ReferenceCacheMixin отдаёт его из кэша. При изменении
+записей справочника ключ удаляет шина инвалидации (config/invalidation.py).
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from .invalidation import reference_key
+
+
+class ReferenceCacheMixin:
+    """
+    Примесь ViewSet справочника, отдающая список из кэша.
+
+    Список без параметров запроса хранится в кэше под reference_key(модели)
+    не дольше REFERENCE_CACHE_SECONDS.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params:
+            return super().list(request, *args, **kwargs)
+        data = cache.get_or_set(
+            reference_key(self.queryset.model),
+            lambda: list(
+                self.get_serializer(
+                    self.filter_queryset(self.get_queryset()), many=True
+                ).data
+            ),
+            settings.REFERENCE_CACHE_SECONDS,
+        )
+        return Response(data)
@@ -0,0 +1,114 @@
+"""
+Рендереры и парсеры DRF для JSON и MessagePack.
+
+JSON кодируется и разбирается библиотекой orjson, если она установлена:
+словари, списки, строки, числа, даты и UUID кодируются без вызова
+Python-кода для каждого значения, а остальные типы (Decimal, ленивые
+строки, timedelta) передаются кодировщику DRF. Без orjson и при запросе
+с отступами (Accept: application/json; indent=4) используется
+стандартный JSONRenderer.
+
+Тип application/msgpack (и ?format=msgpack) предназначен для клиентов
+автоматизации и доступен, если установлен msgpack.
+"""
+
+from rest_framework import renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+_encoder = JSONEncoder()
+
+
+def encode_default(value):
+    """
+    Преобразует значения, которые не кодирует orjson или msgpack.
+
+    Args:
+        value: Значение, например Decimal или ленивая строка перевода
+
+    Returns:
+        Значение встроенного типа (как в JSONEncoder DRF)
+    """
+    return _encoder.default(value)
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """
+    JSONRenderer, кодирующий ответ через orjson.
+
+    Даты в UTC записываются с суффиксом Z, как в кодировщике DRF.
+    Символы U+2028 и U+2029 экранируются, как в JSONRenderer, чтобы ответ
+    оставался корректным JavaScript.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = orjson.dumps(
+            data,
+            default=encode_default,
+            option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS,
+        )
+        return ret.replace("\u2028".encode(), b"\\u2028").replace(
+            "\u2029".encode(), b"\\u2029"
+        )
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser, разбирающий тело запроса через orjson.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    """
+    Рендерер ответа в формате MessagePack.
+
+    Даты и Decimal передаются строками, как в JSON.
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=encode_default, use_bin_type=True)
+
+
+class MessagePackParser(BaseParser):
+    """
+    Парсер тела запроса в формате MessagePack.
+    """
+
+    media_type = "application/msgpack"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False, strict_map_key=False)
+        except (ValueError, msgpack.ExtraData, msgpack.FormatError) as exc:
+            raise ParseError(f"MessagePack parse error - {exc}")
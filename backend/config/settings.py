@@ -10,6 +10,7 @@
 """
 
 import os
+from importlib.util import find_spec
 from pathlib import Path
 from datetime import timedelta
 from dotenv import load_dotenv
@@ -39,11 +40,13 @@ INSTALLED_APPS = [
     "rest_framework_simplejwt.token_blacklist",
     "apps.users.apps.UsersConfig",
     "apps.tasks.apps.TasksConfig",
+    "apps.jobs.apps.JobsConfig",
 ]
 
 # Middleware компоненты
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "config.compression.CompressionMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -116,6 +119,12 @@ USE_TZ = True
 STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "attachments": {
+        "BACKEND": "apps.tasks.storage.DeduplicatedStorage",
+    },
     "staticfiles": {
         "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
     },
@@ -125,15 +134,132 @@ STORAGES = {
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Отдача защищённых вложений: префикс internal-локации nginx для X-Accel-Redirect.
+# Пустое значение — файл отдаёт сам Django (FileResponse + sendfile в gunicorn)
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv("MEDIA_ACCEL_REDIRECT_PREFIX", "")
+MEDIA_DOWNLOAD_TOKEN_MAX_AGE = int(os.getenv("MEDIA_DOWNLOAD_TOKEN_MAX_AGE", "3600"))
+MEDIA_CACHE_MAX_AGE = int(os.getenv("MEDIA_CACHE_MAX_AGE", "86400"))
+
+# Возобновляемая загрузка вложений по частям (размер части меньше client_max_body_size nginx)
+ATTACHMENT_UPLOAD_CHUNK_SIZE = int(
+    os.getenv("ATTACHMENT_UPLOAD_CHUNK_SIZE", str(8 * 1024 * 1024))
+)
+ATTACHMENT_UPLOAD_MAX_SIZE = int(
+    os.getenv("ATTACHMENT_UPLOAD_MAX_SIZE", str(2 * 1024 * 1024 * 1024))
+)
+ATTACHMENT_UPLOAD_EXPIRE_HOURS = int(os.getenv("ATTACHMENT_UPLOAD_EXPIRE_HOURS", "24"))
+
+# Уменьшенные копии аватаров и изображений-вложений (THUMBNAIL_WORKERS=0 — без пула процессов)
+THUMBNAIL_SIZES = {
+    "avatar": [40, 80, 160],
+    "preview": [320],
+}
+THUMBNAIL_FORMAT = os.getenv("THUMBNAIL_FORMAT", "WEBP")
+THUMBNAIL_WORKERS = int(os.getenv("THUMBNAIL_WORKERS", "2"))
+
+# Период, после которого блоб вложения без ссылок удаляется сборщиком мусора
+ATTACHMENT_BLOB_GC_GRACE_HOURS = int(os.getenv("ATTACHMENT_BLOB_GC_GRACE_HOURS", "24"))
+
 # Модель пользователя
 AUTH_USER_MODEL = "users.User"
 
+# Кэши (config/cache.py): LRU в памяти процесса (MAX_ENTRIES записей, не дольше
+# CACHE_LOCAL_SECONDS) перед общим кэшем воркеров shared. По умолчанию общий
+# кэш файловый (каталог CACHE_SHARED_LOCATION общий для контейнеров backend,
+# events и worker); Redis: CACHE_SHARED_BACKEND=django.core.cache.backends.redis.RedisCache
+# и CACHE_SHARED_LOCATION=redis://redis:6379/0 (нужен пакет redis).
+# fragments — сериализованные задачи для списков (apps/tasks/fragments.py),
+# compressed — сжатые тела больших ответов (config/compression.py)
+CACHE_LOCAL_SECONDS = int(os.getenv("CACHE_LOCAL_SECONDS", "60"))
+CACHES = {
+    "shared": {
+        "BACKEND": os.getenv("CACHE_SHARED_BACKEND", "config.cache.SharedFileCache"),
+        "LOCATION": os.getenv("CACHE_SHARED_LOCATION", str(BASE_DIR / "cache")),
+        "TIMEOUT": None,
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.getenv("CACHE_SHARED_MAX_ENTRIES", "200000"))
+        },
+    },
+    "default": {
+        "BACKEND": "config.cache.TwoTierCache",
+        "LOCATION": "default",
+        "OPTIONS": {
+            "SHARED": "shared",
+            "MAX_ENTRIES": int(os.getenv("CACHE_LOCAL_MAX_ENTRIES", "5000")),
+            "LOCAL_TIMEOUT": CACHE_LOCAL_SECONDS,
+        },
+    },
+    "compressed": {
+        "BACKEND": "config.cache.TwoTierCache",
+        "LOCATION": "compressed",
+        "TIMEOUT": int(os.getenv("COMPRESSION_CACHE_SECONDS", "3600")),
+        "OPTIONS": {
+            "SHARED": "shared",
+            "MAX_ENTRIES": int(os.getenv("COMPRESSION_CACHE_MAX_ENTRIES", "256")),
+            "LOCAL_TIMEOUT": CACHE_LOCAL_SECONDS,
+        },
+    },
+    "fragments": {
+        "BACKEND": "config.cache.TwoTierCache",
+        "LOCATION": "fragments",
+        "TIMEOUT": int(os.getenv("FRAGMENT_CACHE_SECONDS", "86400")),
+        "OPTIONS": {
+            "SHARED": "shared",
+            "MAX_ENTRIES": int(os.getenv("FRAGMENT_CACHE_MAX_ENTRIES", "50000")),
+            "LOCAL_TIMEOUT": CACHE_LOCAL_SECONDS,
+        },
+    },
+}
+
+# Поток приёма инвалидаций кэшей других процессов (config/invalidation.py)
+# и порог задержки доставки, после которого пишется предупреждение
+CACHE_INVALIDATION_LISTENER = os.getenv("CACHE_INVALIDATION_LISTENER", "True") == "True"
+CACHE_INVALIDATION_WARN_MS = int(os.getenv("CACHE_INVALIDATION_WARN_MS", "1000"))
+
+# Время жизни кэша списков справочников (статусы, приоритеты, должности)
+REFERENCE_CACHE_SECONDS = int(os.getenv("REFERENCE_CACHE_SECONDS", "3600"))
+
+# Сжатие ответов (config/compression.py): кодировки в порядке предпочтения
+# (br и zstd — при установленных brotli и zstandard), уровни, минимальный
+# размер ответа и размер, начиная с которого сжатое тело берётся из кэша
+# COMPRESSION_CACHE (пустое значение отключает кэш)
+COMPRESSION_ENCODINGS = os.getenv("COMPRESSION_ENCODINGS", "zstd,br,gzip").split(",")
+COMPRESSION_LEVELS = {
+    "gzip": int(os.getenv("COMPRESSION_GZIP_LEVEL", "6")),
+    "br": int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5")),
+    "zstd": int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3")),
+}
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+COMPRESSION_CACHE_MIN_BYTES = int(os.getenv("COMPRESSION_CACHE_MIN_BYTES", "65536"))
+COMPRESSION_CACHE = os.getenv("COMPRESSION_CACHE", "compressed")
+
+# Пакетные запросы /api/batch/ (config/batch.py): максимум запросов в пакете
+# и одновременно выполняемых при concurrent
+BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", "20"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+
+# Алиас кэша фрагментов задач (пустое значение отключает кэш)
+TASK_FRAGMENT_CACHE = os.getenv("TASK_FRAGMENT_CACHE", "fragments")
+
 # Настройки REST framework
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
+    # JSON кодируется через orjson (если установлен), application/msgpack
+    # доступен при установленном msgpack
+    "DEFAULT_RENDERER_CLASSES": [
+        "config.renderers.FastJSONRenderer",
+        *(["config.renderers.MessagePackRenderer"] if find_spec("msgpack") else []),
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "config.renderers.FastJSONParser",
+        *(["config.renderers.MessagePackParser"] if find_spec("msgpack") else []),
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
 # Настройки JWT токенов
@@ -149,5 +275,85 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
 
+# Очистка истёкших токенов из чёрного списка (INTERVAL_SECONDS=0 отключает фоновый поток)
+TOKEN_CLEANUP = {
+    "BATCH_SIZE": int(os.getenv("TOKEN_CLEANUP_BATCH_SIZE", "5000")),
+    "BATCH_PAUSE_SECONDS": float(os.getenv("TOKEN_CLEANUP_BATCH_PAUSE_SECONDS", "0")),
+    "INTERVAL_SECONDS": int(os.getenv("TOKEN_CLEANUP_INTERVAL_SECONDS", "0")),
+}
+
+# Поток событий задач (SSE): пустые сообщения для поддержания соединения,
+# размер очереди клиента, период обновления списка его проектов
+# и срок действия билета подключения (секунды)
+TASK_EVENTS_HEARTBEAT_SECONDS = int(os.getenv("TASK_EVENTS_HEARTBEAT_SECONDS", "15"))
+TASK_EVENTS_QUEUE_SIZE = 200
+TASK_EVENTS_RETRY_MILLISECONDS = 3000
+TASK_EVENTS_PROJECTS_REFRESH_SECONDS = 300
+TASK_EVENTS_TICKET_MAX_AGE = int(os.getenv("TASK_EVENTS_TICKET_MAX_AGE", "60"))
+
+# Статусы, считающиеся закрытыми, и параметры статистики проектов
+TASK_CLOSED_STATUS_IDS = [
+    int(pk) for pk in os.getenv("TASK_CLOSED_STATUS_IDS", "4").split(",") if pk
+]
+PROJECT_STATS_WEEKS = 12
+PROJECT_STATS_CACHE_SECONDS = int(os.getenv("PROJECT_STATS_CACHE_SECONDS", "300"))
+
+# Период сверки сводки задач проектов фоновой задачей (секунды)
+TASK_SUMMARY_RECONCILE_SECONDS = int(
+    os.getenv("TASK_SUMMARY_RECONCILE_SECONDS", "3600")
+)
+
+# Журнал изменений задач: сколько месячных секций создавать заранее
+# и сколько месяцев хранить (0 — хранить всё)
+TASK_HISTORY_PARTITIONS_AHEAD = int(os.getenv("TASK_HISTORY_PARTITIONS_AHEAD", "2"))
+TASK_HISTORY_RETENTION_MONTHS = int(os.getenv("TASK_HISTORY_RETENTION_MONTHS", "0"))
+TASK_HISTORY_PAGE_SIZE = 50
+
+# Архивация закрытых задач: статусы, срок без изменений (0 — не архивировать),
+# размер пакета, пакетов за один запуск и период фоновой задачи
+TASK_ARCHIVE_STATUS_IDS = [
+    int(pk)
+    for pk in os.getenv(
+        "TASK_ARCHIVE_STATUS_IDS", ",".join(map(str, TASK_CLOSED_STATUS_IDS))
+    ).split(",")
+    if pk
+]
+TASK_ARCHIVE_AFTER_DAYS = int(os.getenv("TASK_ARCHIVE_AFTER_DAYS", "180"))
+TASK_ARCHIVE_BATCH_SIZE = 500
+TASK_ARCHIVE_BATCHES_PER_JOB = 20
+TASK_ARCHIVE_INTERVAL_SECONDS = int(os.getenv("TASK_ARCHIVE_INTERVAL_SECONDS", "3600"))
+
+# Сколько месячных секций таблицы комментариев создавать заранее
+COMMENT_PARTITIONS_AHEAD = int(os.getenv("COMMENT_PARTITIONS_AHEAD", "2"))
+
+# Фоновое удаление проектов и пользователей: строк в одном пакете
+# и пакетов за один запуск фоновой задачи
+DELETION_BATCH_SIZE = int(os.getenv("DELETION_BATCH_SIZE", "500"))
+DELETION_BATCHES_PER_JOB = 20
+# Функция, которая отмечает объект удаляемым и ставит фоновую задачу
+# (примеси config/deletion.py)
+DEFERRED_DELETION_HANDLER = "apps.tasks.views.schedule_deletion"
+
+# Выборки меньше этой оценки админка считает точным COUNT(*),
+# большие — по оценке планировщика Postgres
+ADMIN_EXACT_COUNT_LIMIT = int(os.getenv("ADMIN_EXACT_COUNT_LIMIT", "10000"))
+
+# Срок хранения записей об удалении для синхронизации по курсору (changed_since)
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.getenv("SYNC_TOMBSTONE_RETENTION_DAYS", "30"))
+
+# Очередь фоновых задач в Postgres (воркер: python manage.py run_worker)
+JOB_QUEUE = {
+    "CONCURRENCY": int(os.getenv("JOB_WORKER_CONCURRENCY", "4")),
+    "POOL": os.getenv("JOB_WORKER_POOL", "thread"),
+    "BATCH_SIZE": int(os.getenv("JOB_WORKER_BATCH_SIZE", "100")),
+    "POLL_INTERVAL_SECONDS": float(os.getenv("JOB_WORKER_POLL_INTERVAL", "1")),
+    "MAX_ATTEMPTS": int(os.getenv("JOB_MAX_ATTEMPTS", "5")),
+    "RETRY_BACKOFF_SECONDS": 10,
+    "RETRY_BACKOFF_MAX_SECONDS": 3600,
+    "LOCK_TIMEOUT_SECONDS": int(os.getenv("JOB_LOCK_TIMEOUT_SECONDS", "600")),
+    "HEARTBEAT_SECONDS": int(os.getenv("JOB_HEARTBEAT_SECONDS", "30")),
+    "KEEP_FINISHED_HOURS": int(os.getenv("JOB_KEEP_FINISHED_HOURS", "168")),
+}
+
 # Тип поля по умолчанию для первичных ключей
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
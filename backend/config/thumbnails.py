@@ -0,0 +1,230 @@
+"""
+Генерация уменьшенных копий изображений (аватаров и вложений).
+
+Уменьшенные копии создаются один раз после загрузки файла в пуле процессов,
+чтобы ресайз не занимал воркеры, обрабатывающие запросы. Готовые файлы
+хранятся на диске рядом с медиа-файлами: thumbs/<путь исходника>_<размер>.<формат>.
+Пока копия не готова, вместо неё используется исходный файл.
+
+Готовые размеры записываются в кэш по окончании генерации, поэтому
+сериализаторы не проверяют наличие файлов на диске при каждом запросе.
+Файлы проверяются только при промахе кэша, результат сохраняется.
+Локальный уровень кэша других процессов видит новые размеры не позже
+чем через CACHE_LOCAL_SECONDS.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+THUMBS_PREFIX = "thumbs/"
+CACHE_PREFIX = "thumbs:ready"
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".bmp"}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def thumbnail_name(source_name, size):
+    """
+    Возвращает путь уменьшенной копии относительно MEDIA_ROOT.
+
+    Args:
+        source_name (str): Путь исходного файла относительно MEDIA_ROOT
+        size (int): Размер стороны квадрата в пикселях
+
+    Returns:
+        str: Путь уменьшенной копии
+    """
+    extension = settings.THUMBNAIL_FORMAT.lower()
+    return f"{THUMBS_PREFIX}{source_name}_{size}.{extension}"
+
+
+def is_image_name(name):
+    """
+    Проверяет по расширению, является ли файл изображением.
+
+    Args:
+        name (str): Имя файла
+
+    Returns:
+        bool: True для поддерживаемых форматов изображений
+    """
+    return os.path.splitext(name or "")[1].lower() in IMAGE_EXTENSIONS
+
+
+def ready_key(storage, source_name):
+    """
+    Возвращает ключ кэша готовых размеров файла в хранилище.
+    """
+    location = f"{storage.location}:{source_name}".encode()
+    return f"{CACHE_PREFIX}:{hashlib.blake2b(location, digest_size=16).hexdigest()}"
+
+
+def _stat_thumbnails(storage, source_name):
+    """
+    Проверяет на диске, какие уменьшенные копии файла уже созданы.
+    """
+    sizes = set()
+    for group in settings.THUMBNAIL_SIZES.values():
+        sizes.update(group)
+    return sorted(
+        size for size in sizes if storage.exists(thumbnail_name(source_name, size))
+    )
+
+
+def mark_thumbnails(storage, source_name, sizes=None):
+    """
+    Запоминает готовые размеры файла.
+
+    Args:
+        storage: Хранилище исходного файла
+        source_name (str): Путь исходного файла
+        sizes (list | None): Готовые размеры или None, чтобы проверить файлы
+    """
+    if sizes is None:
+        sizes = _stat_thumbnails(storage, source_name)
+    cache.set(ready_key(storage, source_name), sorted(sizes), None)
+
+
+def forget_thumbnails(storage, source_name):
+    """
+    Удаляет сведения о готовых копиях (вызывается при удалении файлов).
+    """
+    cache.delete(ready_key(storage, source_name))
+
+
+def existing_thumbnails(storage, source_name, sizes):
+    """
+    Возвращает готовые уменьшенные копии файла.
+
+    Args:
+        storage: Хранилище, в котором лежит исходный файл
+        source_name (str): Путь исходного файла
+        sizes (list): Запрошенные размеры
+
+    Returns:
+        dict: Размер -> имя готовой копии в хранилище
+    """
+    key = ready_key(storage, source_name)
+    ready = cache.get(key)
+    if ready is None:
+        ready = _stat_thumbnails(storage, source_name)
+        cache.set(key, ready, None)
+    return {size: thumbnail_name(source_name, size) for size in sizes if size in ready}
+
+
+def render_thumbnails(source_path, targets, image_format):
+    """
+    Создаёт уменьшенные копии изображения.
+
+    Функция выполняется в дочернем процессе и не обращается к Django,
+    поэтому принимает только абсолютные пути.
+
+    Args:
+        source_path (str): Путь исходного изображения
+        targets (list): Пары (размер, путь результата)
+        image_format (str): Формат результата (например, WEBP)
+
+    Returns:
+        list: Пути созданных файлов
+    """
+    from PIL import Image, ImageOps
+
+    created = []
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+        for size, target_path in sorted(targets, reverse=True):
+            variant = image.copy()
+            variant.thumbnail((size, size), Image.Resampling.LANCZOS)
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            tmp_path = f"{target_path}.tmp{os.getpid()}"
+            variant.save(tmp_path, image_format, quality=82)
+            os.replace(tmp_path, target_path)
+            created.append(target_path)
+    return created
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            import multiprocessing
+
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.THUMBNAIL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def _finish(storage, source_name, future):
+    exc = future.exception()
+    if exc is not None:
+        logger.warning("Не удалось создать уменьшенные копии: %s", exc)
+    mark_thumbnails(storage, source_name)
+
+
+def generate_thumbnails(storage, source_name, sizes):
+    """
+    Создаёт недостающие уменьшенные копии файла.
+
+    При THUMBNAIL_WORKERS > 0 работа отправляется в пул процессов и функция
+    сразу возвращает управление, иначе копии создаются в текущем процессе.
+    Готовые размеры записываются в кэш после завершения.
+
+    Args:
+        storage: Хранилище исходного файла (файловое)
+        source_name (str): Путь исходного файла
+        sizes (list): Требуемые размеры
+
+    Returns:
+        Future | list | None: Future пула, список созданных файлов или None
+    """
+    ready = _stat_thumbnails(storage, source_name)
+    targets = [
+        (size, storage.path(thumbnail_name(source_name, size)))
+        for size in sizes
+        if size not in ready
+    ]
+    if not targets:
+        mark_thumbnails(storage, source_name, ready)
+        return None
+    args = (storage.path(source_name), targets, settings.THUMBNAIL_FORMAT)
+    if settings.THUMBNAIL_WORKERS <= 0:
+        try:
+            return render_thumbnails(*args)
+        except Exception as exc:
+            logger.warning("Не удалось создать уменьшенные копии: %s", exc)
+            return None
+        finally:
+            mark_thumbnails(storage, source_name)
+    future = _get_executor().submit(render_thumbnails, *args)
+    future.add_done_callback(lambda done: _finish(storage, source_name, done))
+    return future
+
+
+def schedule_thumbnails(storage, source_name, sizes, original_name=None):
+    """
+    Планирует создание уменьшенных копий после фиксации транзакции.
+
+    Args:
+        storage: Хранилище исходного файла
+        source_name (str): Путь исходного файла
+        sizes (list): Требуемые размеры
+        original_name (str): Исходное имя файла, по которому определяется тип
+            (для файлов, сохранённых под хэшем без расширения)
+    """
+    if not source_name or not is_image_name(original_name or source_name):
+        return
+    transaction.on_commit(lambda: generate_thumbnails(storage, source_name, sizes))
@@ -5,7 +5,8 @@
 - Административного интерфейса
 - JWT аутентификации
 - API эндпоинтов пользователей и задач
-- Статических и медиа файлов
+- Пакетного выполнения запросов API (/api/batch/)
+- Статических файлов и аватаров (вложения отдаются через защищённое скачивание)
 """
 
 from django.conf import settings
@@ -22,6 +23,8 @@ from rest_framework_simplejwt.views import (
     TokenRefreshView,
 )
 
+from .batch import BatchView
+
 admin.site.site_url = "/tasks"
 
 
@@ -59,8 +62,16 @@ urlpatterns = (
         # API эндпоинты
         path("api/users/", include("apps.users.urls")),
         path("api/tasks/", include("apps.tasks.urls")),
+        # Несколько запросов API за один HTTP-запрос
+        path("api/batch/", BatchView.as_view(), name="api_batch"),
     ]
-    # Статические и медиа файлы
+    # Статические файлы и аватары (в режиме отладки; в продакшене их отдаёт nginx)
     + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
-    + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    + static(
+        f"{settings.MEDIA_URL}avatars/", document_root=settings.MEDIA_ROOT / "avatars"
+    )
+    + static(
+        f"{settings.MEDIA_URL}thumbs/avatars/",
+        document_root=settings.MEDIA_ROOT / "thumbs" / "avatars",
+    )
 )
@@ -2,7 +2,8 @@
 WSGI конфигурация для проекта.
 
 Этот модуль содержит WSGI приложение, которое используется для
-запуска проекта на WSGI-совместимых веб-серверах.
+запуска проекта на WSGI-совместимых веб-серверах. Здесь же запускаются
+фоновые потоки обслуживания, которые нужны только процессам веб-сервера.
 """
 
 import os
@@ -12,3 +13,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
 application = get_wsgi_application()
+
+from config.invalidation import start_invalidation_listener  # noqa: E402
+from apps.users.tokens import start_cleanup_runner  # noqa: E402
+
+start_cleanup_runner()
+start_invalidation_listener()
@@ -0,0 +1,53 @@
+import apiClient from "./api";
+
+const API_URL = import.meta.env.VUE_APP_API_URL || "/api";
+
+const EVENT_TYPES = [
+    "task.created",
+    "task.updated",
+    "task.deleted",
+    "comment.created",
+    "comment.deleted",
+    "resync",
+];
+
+// Подписка на поток событий задач (Server-Sent Events).
+// EventSource не передаёт заголовки, поэтому перед подключением
+// запрашивается короткоживущий билет, который идёт в параметре ticket.
+// Возвращает функцию отписки.
+export function subscribeTaskEvents(handler) {
+    let source = null;
+    let closed = false;
+
+    async function connect() {
+        if (closed || !localStorage.getItem("access_token")) return;
+        let ticket;
+        try {
+            ticket = (await apiClient.post("/tasks/events/ticket/")).data.ticket;
+        } catch (error) {
+            setTimeout(connect, 3000);
+            return;
+        }
+        if (closed) return;
+        source = new EventSource(
+            `${API_URL}/tasks/events/?ticket=${encodeURIComponent(ticket)}`
+        );
+        EVENT_TYPES.forEach((type) =>
+            source.addEventListener(type, (message) =>
+                handler(JSON.parse(message.data))
+            )
+        );
+        source.onerror = () => {
+            // Билет мог истечь: переподключаемся с новым билетом
+            if (source.readyState === EventSource.CLOSED) {
+                setTimeout(connect, 3000);
+            }
+        };
+    }
+
+    connect();
+    return () => {
+        closed = true;
+        if (source) source.close();
+    };
+}
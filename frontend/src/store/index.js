@@ -96,16 +96,34 @@ export const useTaskStore = defineStore("tasks", {
     }),
     actions: {
         async fetchInitialData() {
-            const [statusesRes, prioritiesRes, projectsRes] = await Promise.all(
-                [
-                    apiClient.get("/tasks/statuses/"),
-                    apiClient.get("/tasks/priorities"),
-                    apiClient.get("/tasks/projects/"),
-                ]
+            // Текущий пользователь, справочники и проекты одним пакетным
+            // запросом (/api/batch/)
+            const response = await apiClient.post("/batch/", {
+                requests: [
+                    { method: "GET", path: "/users/me/" },
+                    { method: "GET", path: "/tasks/statuses/" },
+                    { method: "GET", path: "/tasks/priorities/" },
+                    { method: "GET", path: "/tasks/projects/" },
+                ],
+            });
+            const [meRes, statusesRes, prioritiesRes, projectsRes] =
+                response.data.responses;
+            const authStore = useAuthStore();
+            if (meRes.status >= 400) {
+                // Как и fetchUser: без текущего пользователя сессия недействительна
+                await authStore.logout();
+                throw new Error(meRes.body?.detail || "Ошибка загрузки пользователя");
+            }
+            const failed = response.data.responses.find(
+                (item) => item.status >= 400
             );
-            this.statuses = statusesRes.data;
-            this.priorities = prioritiesRes.data;
-            this.projects = projectsRes.data;
+            if (failed) {
+                throw new Error(failed.body?.detail || "Ошибка загрузки данных");
+            }
+            authStore.user = meRes.body;
+            this.statuses = statusesRes.body;
+            this.priorities = prioritiesRes.body;
+            this.projects = projectsRes.body;
         },
         async fetchTasks(projectId = "all", assigneeId = null) {
             const params = `project=${projectId}${assigneeId ? `&assignee=${assigneeId}` : ""}`;
@@ -24,5 +24,7 @@ export const useUiStyleStore = defineStore('uiStyles', {
     getters: {
         getStatusStyle: (state) => (name) => state.statusStyles[name] || { label: name },
         getPriorityStyle: (state) => (name) => state.priorityStyles[name] || { label: name },
+        // Уменьшенная копия аватара нужного размера, если она уже сгенерирована
+        getAvatar: () => (user, size = 80) => user?.avatar_urls?.[size] || user?.avatar_url,
     }
 })
\ No newline at end of file